@@ -1,17 +1,24 @@
 #/app/__init__.py
 import sys
 sys.path.insert(0, "libs")
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_session import Session
 from app.extensions import db, login_manager
 from app.config import Config
 from app.models import User
-from werkzeug.exceptions import HTTPException
+from app.json_provider import FastJSONProvider
+from app.migrations import upgrade_database
+from app.resume_sections import sync_section_storage
+from app.search import create_search_index
+from app.uploads import MAX_PDF_REQUEST, UploadRequest
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.json = FastJSONProvider(app)
     app.config.from_object(config_class)
 
     # Initialize extensions
@@ -38,6 +45,20 @@ def create_app(config_class=Config):
 
     Session(app)
 
+    # Create tables added since the database was initialized
+    with app.app_context():
+        try:
+            upgrade_database()
+            sync_section_storage()
+        except Exception as e:
+            print(f"[DB] Schema upgrade skipped: {e}", file=sys.stderr)
+        # Separate from the upgrade, so one failing does not leave the other undone
+        try:
+            create_search_index()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[SEARCH] Search index setup failed, will look for it again on use: {e}", file=sys.stderr)
+
     app.config['PERMANENT_SESSION_LIFETIME'] = 86400
 
     # CORS configuration
@@ -47,8 +68,9 @@ def create_app(config_class=Config):
     CORS(app, 
          origins=allowed_origins,
          supports_credentials=True,
-         allow_headers=["Content-Type", "Authorization"],
-         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+         allow_headers=["Content-Type", "Authorization", "If-Match", "If-None-Match"],
+         expose_headers=["ETag"],
+         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
 
     # Configure login manager
     @login_manager.user_loader
@@ -62,6 +84,13 @@ def create_app(config_class=Config):
     def unauthorized():
         return jsonify({"error": "Unauthorized", "message": "Please log in to access this resource"}), 401
     
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(e):
+        if request.max_content_length == MAX_PDF_REQUEST:
+            return jsonify({"error": "File too large (max 5MB)"}), 413
+        max_mb = (request.max_content_length or 0) // (1024 * 1024)
+        return jsonify({"error": f"Request too large (max {max_mb}MB)"}), 413
+
     # Error handler
     @app.errorhandler(Exception)
     def handle_exception(e):
@@ -90,6 +119,9 @@ def create_app(config_class=Config):
     from app.routes.cover_letter import bp as cover_letter_bp
     from app.routes.profile import bp as profile_bp
     from app.routes.subscription import bp as subscription_bp
+    from app.routes.search import bp as search_bp
+    from app.routes.export import bp as export_bp
+    from app.routes.applications import bp as applications_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
@@ -98,5 +130,8 @@ def create_app(config_class=Config):
     app.register_blueprint(cover_letter_bp)
     app.register_blueprint(profile_bp)
     app.register_blueprint(subscription_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(applications_bp)
 
     return app
@@ -0,0 +1,146 @@
+"""
+Application status history and rollups.
+
+Every status an application moves through is appended to
+application_events (its creation is recorded as an event from NULL), so
+funnels and time-to-response can be computed from the transitions instead of
+the current status alone. Two per-user rollups are kept up to date in the
+same transaction:
+
+- application_status_counts: applications currently in each status
+- application_month_counts: applications created in each month (YYYY-MM)
+
+so the dashboard reads a handful of rows instead of counting applications.
+
+An after_flush hook covers ORM writes. Bulk statements skip it, so the bulk
+routes call applications_created(), statuses_changed() and
+applications_deleted() themselves. An application's events are removed with
+it, like the revisions of a deleted document.
+"""
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session, attributes
+from app.extensions import db
+from app.models import Application, ApplicationEvent, ApplicationMonthCount, ApplicationStatusCount
+
+_events = ApplicationEvent.__table__
+_status_counts = ApplicationStatusCount.__table__
+_month_counts = ApplicationMonthCount.__table__
+
+
+def _month(created_at):
+    return created_at.strftime("%Y-%m") if created_at else None
+
+
+def _bump(connection, table, key_column, changes):
+    """Add the deltas of `changes` ({(user_id, key): delta}) to a rollup table"""
+    for (user_id, key), delta in changes.items():
+        if not delta or key is None:
+            continue
+        where = (table.c.user_id == user_id) & (table.c[key_column] == key)
+        updated = connection.execute(table.update().where(where).values(count=table.c.count + delta))
+        if not updated.rowcount:
+            connection.execute(table.insert().values(user_id=user_id, **{key_column: key}, count=delta))
+
+
+def applications_created(connection, applications):
+    """Record new applications. `applications` are (app_id, user_id, status, created_at) tuples."""
+    if not applications:
+        return
+    now = datetime.utcnow()
+    events = [
+        {"user_id": user_id, "app_id": app_id, "from_status": None, "to_status": status, "created_at": created_at or now}
+        for app_id, user_id, status, created_at in applications if status
+    ]
+    if events:
+        connection.execute(_events.insert(), events)
+    _bump(connection, _status_counts, "status", Counter((a[1], a[2]) for a in applications))
+    _bump(connection, _month_counts, "month", Counter((a[1], _month(a[3])) for a in applications))
+
+
+def statuses_changed(connection, user_id, changes, status):
+    """Record status changes of a user's applications. `changes` are (app_id, previous status) pairs."""
+    changes = [(app_id, previous) for app_id, previous in changes if previous != status]
+    if not changes:
+        return
+    now = datetime.utcnow()
+    connection.execute(_events.insert(), [
+        {"user_id": user_id, "app_id": app_id, "from_status": previous, "to_status": status, "created_at": now}
+        for app_id, previous in changes
+    ])
+    deltas = Counter()
+    for _, previous in changes:
+        deltas[(user_id, previous)] -= 1
+        deltas[(user_id, status)] += 1
+    _bump(connection, _status_counts, "status", deltas)
+
+
+def applications_deleted(connection, applications):
+    """Record deleted applications. `applications` are (app_id, user_id, status, created_at) tuples."""
+    if not applications:
+        return
+    connection.execute(delete(_events).where(_events.c.app_id.in_([a[0] for a in applications])))
+    statuses, months = Counter(), Counter()
+    for _, user_id, status, created_at in applications:
+        statuses[(user_id, status)] -= 1
+        months[(user_id, _month(created_at))] -= 1
+    _bump(connection, _status_counts, "status", statuses)
+    _bump(connection, _month_counts, "month", months)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_events(session, flush_context):
+    created, deleted = [], []
+    changed = {}  # (user_id, status) -> [(app_id, previous status)]
+    for application in session.new:
+        if type(application) is Application:
+            created.append((application.app_id, application.user_id, application.status, application.created_at))
+    for application in session.dirty:
+        if type(application) is not Application:
+            continue
+        history = attributes.get_history(application, "status")
+        if history.has_changes() and history.deleted:
+            changed.setdefault((application.user_id, application.status), []).append(
+                (application.app_id, history.deleted[0])
+            )
+    for application in session.deleted:
+        if type(application) is Application:
+            # The status before any unflushed change is what the rollups counted
+            history = attributes.get_history(application, "status")
+            status = history.deleted[0] if history.deleted else application.status
+            deleted.append((application.app_id, application.user_id, status, application.created_at))
+    if not (created or changed or deleted):
+        return
+    connection = session.connection()
+    applications_created(connection, created)
+    for (user_id, status), changes in changed.items():
+        statuses_changed(connection, user_id, changes, status)
+    applications_deleted(connection, deleted)
+
+
+# === Reads ===
+def status_counts(user_id):
+    """{status: number of the user's applications in it}"""
+    return dict(db.session.execute(
+        select(_status_counts.c.status, _status_counts.c.count).where(_status_counts.c.user_id == user_id)
+    ).all())
+
+
+def month_counts(user_id, first_month):
+    """{YYYY-MM: applications created that month} for the months from `first_month` on"""
+    return dict(db.session.execute(
+        select(_month_counts.c.month, _month_counts.c.count).where(
+            (_month_counts.c.user_id == user_id) & (_month_counts.c.month >= first_month)
+        )
+    ).all())
+
+
+def application_events(app_id):
+    """The status history of an application, oldest first"""
+    return db.session.execute(
+        select(_events.c.from_status, _events.c.to_status, _events.c.created_at)
+        .where(_events.c.app_id == app_id)
+        .order_by(_events.c.created_at, _events.c.id)
+    ).all()
+
@@ -0,0 +1,143 @@
+"""
+Custom column types.
+
+CompressedJSON stores JSON documents as compressed binary. Resume and cover
+letter content is verbose (long descriptions, HTML-ish bodies, the same style
+and visibility keys in every row), so it is compressed against a preset
+dictionary of those common keys and values: zstd when the zstandard package
+is installed, zlib otherwise. Every value starts with a two-byte header
+(codec, dictionary version), so values written by either codec, or with an
+older dictionary, stay readable. Documents under COMPRESS_MIN_BYTES are
+stored uncompressed, and plain JSON text written before compression was
+introduced is still read (the 0002_compress_content data migration rewrites
+it).
+"""
+import json
+import zlib
+from sqlalchemy.types import LargeBinary, TypeDecorator
+from app.config import RESUME_SECTION_STORAGE
+from utils.resume_validation import RESUME_LIST_SECTIONS
+
+try:
+    import zstandard
+except ImportError:  # zlib is used instead
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESS_MIN_BYTES = 256  # smaller documents are stored as plain JSON
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+RAW = 0
+ZLIB = 1
+ZSTD = 2
+
+# Preset dictionaries by version: keys and values common to resume and cover
+# letter content. A dictionary must never change once rows were written with
+# it; add a new version instead and point DICTIONARY_VERSION at it.
+DICTIONARIES = {
+    1: (
+        b'{"style":{"fontFamily":"font-sans","fontSize":11,"fontColor":"#1e293b","headerFontColor":"#1e293b",'
+        b'"contentFontColor":"#334155","lineSpacing":1.5,"margins":8,"paperSize":"a4","headerAlignment":"left"},'
+        b'"visibility":{"personalInfo":{},"summary":true,"workExperience":{},"education":{},"skills":true,'
+        b'"certifications":{},"links":true,"others":true},'
+        b'"contact":{"name":"","email":"","phone":"","address":"","visibility":{"name":true,"email":true,'
+        b'"phone":true,"address":true}},"company":"","jobTitle":"","date":"","hiringManagerName":"",'
+        b'"jobDescription":"","aiPrompt":"","body":"Dear Hiring Manager,\\n\\nI am writing to express my interest in the '
+        b'position. Sincerely,\\n","templateId":"default","title":"Resume title",'
+        b'"sectionOrder":["summary","workExperience","education","skills","certifications","links","others"],'
+        b'"personalInfo":{"firstName":"","lastName":"","title":"","email":"","phone":"","address":"","city":"",'
+        b'"country":"","postalCode":"","linkedIn":"","website":""},"summary":"",'
+        b'"workExperience":[{"id":"","title":"","company":"","location":"","startDate":"","endDate":"Present",'
+        b'"current":false,"description":""}],'
+        b'"education":[{"id":"","school":"","degree":"","field":"","location":"","startDate":"","endDate":"",'
+        b'"current":false,"description":""}],'
+        b'"skills":[{"id":"","name":"","level":"intermediate"},{"id":"","name":"","level":"advanced"}],'
+        b'"certifications":[{"id":"","name":"","issuer":"","date":"","link":"","description":""}],'
+        b'"links":[{"id":"","label":"","service":"LinkedIn","url":"","linkUrl":"https://www.linkedin.com/in/"},'
+        b'{"id":"","service":"GitHub","linkUrl":"https://github.com/"}],'
+        b'"others":[{"id":"","title":"","description":"","content":""}]}'
+    ),
+}
+DICTIONARY_VERSION = 1
+
+_zstd_dictionaries = {}
+
+
+def _zstd_dictionary(version):
+    if version not in _zstd_dictionaries:
+        _zstd_dictionaries[version] = zstandard.ZstdCompressionDict(
+            DICTIONARIES[version], dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+    return _zstd_dictionaries[version]
+
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def compress_json(value):
+    """Header + (possibly compressed) JSON bytes for `value`"""
+    data = _dumps(value)
+    if len(data) < COMPRESS_MIN_BYTES:
+        return bytes((RAW, 0)) + data
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=_zstd_dictionary(DICTIONARY_VERSION))
+        return bytes((ZSTD, DICTIONARY_VERSION)) + compressor.compress(data)
+    compressor = zlib.compressobj(ZLIB_LEVEL, zdict=DICTIONARIES[DICTIONARY_VERSION])
+    return bytes((ZLIB, DICTIONARY_VERSION)) + compressor.compress(data) + compressor.flush()
+
+
+def decompress_json(value):
+    """The document stored by compress_json (or as plain JSON text)"""
+    if isinstance(value, str):
+        return json.loads(value)
+    value = bytes(value)
+    if not value or value[0] > ZSTD:
+        return json.loads(value)  # JSON text stored before compression
+    codec, version, data = value[0], value[1], value[2:]
+    if codec == ZLIB:
+        decompressor = zlib.decompressobj(zdict=DICTIONARIES[version])
+        data = decompressor.decompress(data) + decompressor.flush()
+    elif codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Content is zstd-compressed but the zstandard package is not installed")
+        data = zstandard.ZstdDecompressor(dict_data=_zstd_dictionary(version)).decompress(data)
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON document stored compressed (see module docstring)"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_json(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_json(value)
+
+
+class ResumeContentJSON(CompressedJSON):
+    """
+    Compressed JSON column for resume content. With section storage on (see
+    app/resume_sections.py) the item sections are stored as rows of their own
+    and left out of the column; profile.content in memory is always the whole
+    document.
+    """
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if RESUME_SECTION_STORAGE and isinstance(value, dict):
+            value = {key: item for key, item in value.items() if key not in RESUME_LIST_SECTIONS}
+        return super().process_bind_param(value, dialect)
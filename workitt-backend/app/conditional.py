@@ -0,0 +1,61 @@
+"""
+Conditional GET support (ETag / Last-Modified).
+
+Validators are computed from cheap column queries (a row's updated_at, or the
+row count and newest updated_at of a user's list) before the document is
+loaded. When the client's cached copy is still current the request is answered
+with 304 Not Modified and the JSON content is never read or serialized.
+
+Responses are marked "private, no-cache", so browsers keep them but revalidate
+on every use, which axios requests get for free.
+"""
+import hashlib
+from datetime import timezone
+from flask import Response, request
+from sqlalchemy import func
+from app.extensions import db
+
+
+def make_etag(*parts):
+    """Strong ETag value from the parts identifying one version of a representation"""
+    raw = "\x1f".join("" if p is None else str(p) for p in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def list_version(model, updated_column, user_id):
+    """(row count, newest updated_at) of a user's rows; changes on any create, update or delete"""
+    return db.session.query(func.count(), func.max(updated_column)).filter(
+        model.user_id == user_id
+    ).one()
+
+
+def is_fresh(etag, last_modified=None):
+    """True if the request's If-None-Match (or, without it, If-Modified-Since) matches"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        # HTTP dates have one second resolution
+        stamp = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return stamp <= request.if_modified_since
+    return False
+
+
+def add_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Cookie")
+    return response
+
+
+def conditional_get(etag, last_modified, build):
+    """
+    Answer a GET with 304 if the client's copy is current, otherwise with build().
+
+    `last_modified` is a naive UTC datetime (or None). `build` is only called
+    when the full response is needed and returns a Flask response.
+    """
+    if is_fresh(etag, last_modified):
+        return add_validators(Response(status=304), etag, last_modified)
+    return add_validators(build(), etag, last_modified)
@@ -6,11 +6,18 @@ from pathlib import Path
 DATA_DIR = Path("data").resolve()
 DB_FILE = DATA_DIR / "workitt.db"
 
+# Store resume item sections as rows of resume_section_items (see app/resume_sections.py)
+RESUME_SECTION_STORAGE = os.environ.get("RESUME_SECTION_STORAGE", "false").lower() == "true"
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY") or secrets.token_hex(32)
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or f"sqlite:///{DB_FILE}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Request bodies above this are rejected while streaming; PDF uploads lower it to
+    # MAX_PDF_REQUEST (app/uploads.py)
+    MAX_CONTENT_LENGTH = 32 * 1024 * 1024
+
     #session config
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SECURE = os.environ.get("PRODUCTION", "false").lower() == "true"
@@ -0,0 +1,227 @@
+"""
+Full-account data export.
+
+An export holds the user's account, subscription, resumes (profiles), cover
+letters, applications and their status history, as either:
+
+- zip: account.json, subscription.json, profiles.ndjson, cover_letters.ndjson,
+  applications.ndjson, application_events.ndjson and manifest.json (export
+  date and record counts)
+- ndjson: one {"section": ..., "data": ...} record per line, between an
+  "export" header line and a "manifest" line
+
+export_chunks() produces the archive as a stream of byte chunks. Each section
+is read with yield_per (a server-side cursor where the database supports
+one) and every row is written straight into the zip member, which is deflated
+into a write-only sink the generator drains as it goes. Memory therefore stays
+at one batch of rows plus one chunk, whatever the account size.
+
+Very large accounts can export through a background job instead: the same
+stream is written to a file under EXPORT_DIR, which the user downloads once
+the job is done. Finished exports are deleted after EXPORT_TTL_HOURS.
+
+Secrets (password hash, verification and reset tokens) are never exported.
+"""
+import os
+import threading
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from flask import current_app
+from sqlalchemy import select
+from app.config import DATA_DIR
+from app.extensions import db
+from app.json_provider import dump_json_bytes
+from app.models import Application, ApplicationEvent, CoverLetter, ExportJob, Profile, Subscription, User
+from app.resume_sections import with_sections
+
+EXPORT_FORMATS = {
+    "zip": "application/zip",
+    "ndjson": "application/x-ndjson",
+}
+EXPORT_VERSION = 1
+EXPORT_BATCH = 200  # rows per database fetch
+EXPORT_CHUNK = 64 * 1024  # bytes buffered before a chunk is sent
+EXPORT_DIR = Path(os.environ.get("EXPORT_DIR") or DATA_DIR / "exports")
+EXPORT_TTL_HOURS = 24
+EXPORT_JOB_TIMEOUT_HOURS = 2  # running jobs older than this were interrupted
+
+# Columns that are never exported
+_PRIVATE = {"password", "verify_token", "expires_at", "reset_token", "reset_expires_at", "is_admin", "content_hash"}
+
+# (section, model, owner column, key column, single record)
+SECTIONS = (
+    ("account", User, User.id, User.id, True),
+    ("subscription", Subscription, Subscription.user_id, Subscription.sub_id, True),
+    ("profiles", Profile, Profile.user_id, Profile.id, False),
+    ("cover_letters", CoverLetter, CoverLetter.user_id, CoverLetter.cover_id, False),
+    ("applications", Application, Application.user_id, Application.app_id, False),
+    ("application_events", ApplicationEvent, ApplicationEvent.user_id, ApplicationEvent.id, False),
+)
+
+
+def _rows(model, owner_column, key_column, user_id):
+    """The user's rows of `model` as dicts, fetched EXPORT_BATCH at a time"""
+    columns = [c for c in model.__table__.columns if c.name not in _PRIVATE]
+    statement = (
+        select(*columns)
+        .where(owner_column == user_id)
+        .order_by(key_column)
+        .execution_options(yield_per=EXPORT_BATCH)
+    )
+    for row in db.session.execute(statement):
+        record = dict(row._mapping)
+        if model is Profile:
+            record["content"] = with_sections(db.session.connection(), record["id"], record["content"])
+        yield record
+
+
+class _Sink:
+    """Write-only, unseekable file collecting the zip writer's output for the generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+def _manifest(user_id, counts):
+    return {"version": EXPORT_VERSION, "user_id": user_id, "exported_at": datetime.utcnow(), "counts": counts}
+
+
+def _zip_chunks(user_id):
+    sink = _Sink()
+    counts = {}
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for section, model, owner_column, key_column, single in SECTIONS:
+            rows = _rows(model, owner_column, key_column, user_id)
+            if single:
+                record = next(rows, None)
+                rows.close()
+                archive.writestr(f"{section}.json", dump_json_bytes(record))
+                counts[section] = int(record is not None)
+                continue
+            count = 0
+            with archive.open(f"{section}.ndjson", "w", force_zip64=True) as member:
+                for record in rows:
+                    member.write(dump_json_bytes(record) + b"\n")
+                    count += 1
+                    if sink.size >= EXPORT_CHUNK:
+                        yield sink.drain()
+            counts[section] = count
+            yield sink.drain()
+        archive.writestr("manifest.json", dump_json_bytes(_manifest(user_id, counts)))
+    yield sink.drain()
+
+
+def _ndjson_chunks(user_id):
+    yield dump_json_bytes({"section": "export", "data": {"version": EXPORT_VERSION, "user_id": user_id}}) + b"\n"
+    counts = {}
+    buffer = []
+    size = 0
+    for section, model, owner_column, key_column, single in SECTIONS:
+        count = 0
+        for record in _rows(model, owner_column, key_column, user_id):
+            line = dump_json_bytes({"section": section, "data": record}) + b"\n"
+            buffer.append(line)
+            size += len(line)
+            count += 1
+            if size >= EXPORT_CHUNK:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        counts[section] = count
+    buffer.append(dump_json_bytes({"section": "manifest", "data": _manifest(user_id, counts)}) + b"\n")
+    yield b"".join(buffer)
+
+
+def export_chunks(user_id, export_format):
+    """The user's export in `export_format` ("zip" or "ndjson") as an iterator of byte chunks"""
+    if export_format == "zip":
+        return _zip_chunks(user_id)
+    return _ndjson_chunks(user_id)
+
+
+def export_filename(export_format, when=None):
+    return f"workitt-export-{(when or datetime.utcnow()).strftime('%Y%m%d')}.{export_format}"
+
+
+# === Background jobs ===
+def job_path(job):
+    return EXPORT_DIR / f"{job.id}.{job.format}"
+
+
+def _run_job(app, job_id):
+    with app.app_context():
+        job = db.session.get(ExportJob, job_id)
+        job.status = "running"
+        db.session.commit()
+        path = job_path(job)
+        partial = path.with_name(path.name + ".part")
+        try:
+            EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+            with open(partial, "wb") as f:
+                for chunk in export_chunks(job.user_id, job.format):
+                    f.write(chunk)
+            os.replace(partial, path)
+            job.status = "done"
+            job.size = path.stat().st_size
+        except Exception as e:
+            print(f"[EXPORT] Job {job_id} failed: {e}")
+            db.session.rollback()
+            job = db.session.get(ExportJob, job_id)
+            job.status = "failed"
+            job.error = "Export failed"
+            if partial.exists():
+                partial.unlink()
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        db.session.remove()
+
+
+def _expire_jobs(user_id):
+    """Delete the user's exports past EXPORT_TTL_HOURS and fail jobs that were interrupted"""
+    now = datetime.utcnow()
+    for job in ExportJob.query.filter_by(user_id=user_id).all():
+        if job.status in ("pending", "running") and job.created_at < now - timedelta(hours=EXPORT_JOB_TIMEOUT_HOURS):
+            job.status = "failed"
+            job.error = "Export was interrupted"
+            job.finished_at = now
+        elif job.finished_at and job.finished_at < now - timedelta(hours=EXPORT_TTL_HOURS):
+            job_path(job).unlink(missing_ok=True)
+            db.session.delete(job)
+    db.session.commit()
+
+
+def start_export_job(user_id, export_format):
+    """
+    Start a background export for the user, or return the one already in
+    progress. The job runs in a thread of this worker; its status is kept in
+    the database so any worker can report it.
+    """
+    _expire_jobs(user_id)
+    active = ExportJob.query.filter(
+        ExportJob.user_id == user_id, ExportJob.status.in_(("pending", "running"))
+    ).first()
+    if active:
+        return active
+    job = ExportJob(user_id=user_id, format=export_format)
+    db.session.add(job)
+    db.session.commit()
+    threading.Thread(
+        target=_run_job, args=(current_app._get_current_object(), job.id), daemon=True
+    ).start()
+    return job
@@ -0,0 +1,227 @@
+"""
+Revision history for resumes and cover letters.
+
+Every flush that changes a Profile's or CoverLetter's content also stores a
+DocumentRevision, in the same transaction, from an after_flush hook, so no
+write path can skip it. Most revisions are stored as a JSON Patch from the
+previous stored revision; a full snapshot is stored every SNAPSHOT_INTERVAL
+entries (or when the patch would be larger than half the content), so
+rebuilding any revision applies at most SNAPSHOT_INTERVAL - 1 patches.
+
+Retention: the newest KEEP_RECENT revisions are all kept. Older revisions are
+thinned by age: at an age of KEEP_RECENT * 2^k to KEEP_RECENT * 2^(k+1) edits
+only revision numbers divisible by 2^k survive, so a document edited n times
+keeps about KEEP_RECENT * (1 + log2(n / KEEP_RECENT)) revisions. Once
+COMPACT_SLACK revisions have fallen out of the policy the document's history
+is rewritten with only the kept revisions, re-encoded as snapshots and deltas.
+"""
+import json
+import math
+from datetime import datetime
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, attributes
+from app.extensions import db
+from app.models import CoverLetter, DocumentRevision, Profile, generate_uuid
+from utils.json_patch import apply_patch, make_patch
+
+SNAPSHOT_INTERVAL = 10  # stored entries per snapshot (bounds reconstruction to 9 patches)
+KEEP_RECENT = 20  # newest revisions that are always kept
+COMPACT_SLACK = 10  # revisions past the retention policy before the history is compacted
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+# Model -> (document_type, primary key attribute)
+DOCUMENTS = {
+    Profile: ("resume", "id"),
+    CoverLetter: ("cover_letter", "cover_id"),
+}
+
+_table = DocumentRevision.__table__
+
+
+def _size(data):
+    return len(json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str))
+
+
+def _retained(revision, latest):
+    """Retention policy: keep recent revisions, thin older ones exponentially with age"""
+    age = latest - revision
+    if age < KEEP_RECENT:
+        return True
+    step = 2 ** int(math.log2(age / KEEP_RECENT))
+    return revision % step == 0
+
+
+def _encode(previous, content, deltas_since_snapshot):
+    """(kind, data, size) for storing `content` after `previous`"""
+    snapshot_size = _size(content)
+    if previous is not None and deltas_since_snapshot + 1 < SNAPSHOT_INTERVAL:
+        patch = make_patch(previous, content)
+        patch_size = _size(patch)
+        if patch_size * 2 < snapshot_size:
+            return DELTA, patch, patch_size
+    return SNAPSHOT, content, snapshot_size
+
+
+def _where(document_type, document_id):
+    return (_table.c.document_type == document_type) & (_table.c.document_id == document_id)
+
+
+def _chain(connection, document_type, document_id, revision=None):
+    """Stored entries from the newest snapshot up to `revision` (default latest), oldest first"""
+    where = _where(document_type, document_id)
+    if revision is not None:
+        where = where & (_table.c.revision <= revision)
+    rows = connection.execute(
+        select(_table.c.revision, _table.c.kind, _table.c.data)
+        .where(where)
+        .order_by(_table.c.revision.desc())
+        .limit(SNAPSHOT_INTERVAL)
+    ).all()
+    for index, row in enumerate(rows):
+        if row.kind == SNAPSHOT:
+            return list(reversed(rows[: index + 1]))
+    return []
+
+
+def _replay(chain):
+    content = None
+    for row in chain:
+        content = row.data if row.kind == SNAPSHOT else apply_patch(content, row.data)
+    return content
+
+
+def _insert(connection, user_id, document_type, document_id, revision, kind, data, size, created_at=None):
+    connection.execute(
+        _table.insert().values(
+            id=generate_uuid(),
+            user_id=user_id,
+            document_type=document_type,
+            document_id=document_id,
+            revision=revision,
+            kind=kind,
+            data=data,
+            size=size,
+            created_at=created_at or datetime.utcnow(),
+        )
+    )
+
+
+def _record(connection, document_type, document_id, user_id, revision, content, previous_content=None):
+    chain = _chain(connection, document_type, document_id)
+    if chain and chain[-1].revision >= revision:
+        return
+    if not chain and previous_content is not None and revision > 1:
+        # First edit since history was introduced: keep the content it replaced
+        kind, data, size = _encode(None, previous_content, 0)
+        _insert(connection, user_id, document_type, document_id, revision - 1, kind, data, size)
+        chain = _chain(connection, document_type, document_id)
+
+    kind, data, size = _encode(_replay(chain) if chain else None, content, len(chain) - 1)
+    _insert(connection, user_id, document_type, document_id, revision, kind, data, size)
+
+    count = connection.execute(
+        select(func.count()).select_from(_table).where(_where(document_type, document_id))
+    ).scalar()
+    if count > KEEP_RECENT + COMPACT_SLACK:
+        revisions = connection.execute(
+            select(_table.c.revision).where(_where(document_type, document_id))
+        ).scalars().all()
+        latest = max(revisions)
+        if sum(1 for r in revisions if not _retained(r, latest)) >= COMPACT_SLACK:
+            _compact(connection, document_type, document_id, user_id)
+
+
+def _compact(connection, document_type, document_id, user_id):
+    """Rewrite a document's history with only the revisions the retention policy keeps"""
+    rows = connection.execute(
+        select(_table.c.revision, _table.c.kind, _table.c.data, _table.c.created_at)
+        .where(_where(document_type, document_id))
+        .order_by(_table.c.revision)
+    ).all()
+    latest = rows[-1].revision
+    kept = []
+    content = None
+    for row in rows:
+        content = row.data if row.kind == SNAPSHOT else apply_patch(content, row.data)
+        if _retained(row.revision, latest):
+            kept.append((row.revision, row.created_at, content))
+
+    connection.execute(_table.delete().where(_where(document_type, document_id)))
+    previous = None
+    deltas = 0
+    for revision, created_at, content in kept:
+        kind, data, size = _encode(previous, content, deltas)
+        deltas = 0 if kind == SNAPSHOT else deltas + 1
+        _insert(connection, user_id, document_type, document_id, revision, kind, data, size, created_at)
+        previous = content
+
+
+def record_created(connection, document_type, documents):
+    """
+    Store the first revision of documents inserted in bulk, which bypasses the
+    after_flush hook. `documents` are (document_id, user_id, content) tuples.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": generate_uuid(),
+            "user_id": user_id,
+            "document_type": document_type,
+            "document_id": document_id,
+            "revision": 1,
+            "kind": SNAPSHOT,
+            "data": content,
+            "size": _size(content),
+            "created_at": now,
+        }
+        for document_id, user_id, content in documents
+    ]
+    if rows:
+        connection.execute(_table.insert(), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_history(session, flush_context):
+    for document in list(session.new) + list(session.dirty):
+        if type(document) not in DOCUMENTS:
+            continue
+        history = attributes.get_history(document, "content")
+        if document not in session.new and not history.has_changes():
+            continue
+        document_type, key = DOCUMENTS[type(document)]
+        previous = history.deleted[0] if history.deleted else None
+        _record(
+            session.connection(),
+            document_type,
+            getattr(document, key),
+            document.user_id,
+            document.revision,
+            dict(document.content or {}),
+            dict(previous) if previous is not None else None,
+        )
+    for document in session.deleted:
+        if type(document) in DOCUMENTS:
+            document_type, key = DOCUMENTS[type(document)]
+            session.connection().execute(_table.delete().where(_where(document_type, getattr(document, key))))
+
+
+def list_revisions(document_type, document_id):
+    """Stored revisions of a document, newest first"""
+    return (
+        DocumentRevision.query.filter_by(document_type=document_type, document_id=document_id)
+        .with_entities(
+            DocumentRevision.revision, DocumentRevision.kind, DocumentRevision.size, DocumentRevision.created_at
+        )
+        .order_by(DocumentRevision.revision.desc())
+        .all()
+    )
+
+
+def load_revision(document_type, document_id, revision):
+    """Content of a stored revision, or None if it is not (or no longer) stored"""
+    chain = _chain(db.session.connection(), document_type, document_id, revision)
+    if not chain or chain[-1].revision != revision:
+        return None
+    return _replay(chain)
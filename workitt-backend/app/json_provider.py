@@ -0,0 +1,106 @@
+"""
+JSON encoding for API responses.
+
+FastJSONProvider replaces Flask's standard library encoder with orjson, which
+serializes the large nested `content` documents several times faster and
+handles datetimes natively. Datetimes are written as ISO 8601
+("2026-01-31T12:00:00.123456", naive values stay naive), so routes put
+datetime objects in their responses as they are. Without orjson installed the
+provider falls back to the standard library encoder with the same output.
+
+stream_json() writes a large list response incrementally (chunked transfer
+encoding), one item at a time, so the whole body never exists in memory.
+"""
+import sys
+sys.path.insert(0, "libs")
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+# Items serialized per chunk when streaming
+STREAM_BATCH = 50
+# Lists longer than this are streamed rather than built in memory
+STREAM_LIST_THRESHOLD = 100
+
+
+def _default(value):
+    """Types orjson (or the standard library) cannot serialize on its own"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    default = staticmethod(_default)
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dump_bytes(self, obj):
+        if orjson is None:
+            return super().dumps(obj).encode()
+        return orjson.dumps(obj, default=_default, option=self.option)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dump_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dump_bytes(obj), mimetype=self.mimetype)
+
+
+def dump_json_bytes(obj):
+    provider = current_app.json
+    if isinstance(provider, FastJSONProvider):
+        return provider.dump_bytes(obj)
+    return provider.dumps(obj).encode()
+
+
+def stream_json(envelope, key, items):
+    """
+    Streamed response for `envelope` (a dict) with the list `items` under `key`.
+
+    `items` may be any iterable, e.g. a generator over a query with
+    yield_per(); it is consumed while the response is sent, inside the
+    request context.
+    """
+    # '{"success":true,' + '"key":[' ... ']}'
+    head = dump_json_bytes({k: v for k, v in envelope.items() if k != key})
+    opening = head[:-1] + (b"," if len(head) > 2 else b"") + dump_json_bytes(key) + b":["
+
+    def generate():
+        yield opening
+        batch = []
+        first = True
+        for item in items:
+            batch.append(dump_json_bytes(item))
+            if len(batch) >= STREAM_BATCH:
+                yield (b"" if first else b",") + b",".join(batch)
+                first = False
+                batch = []
+        if batch:
+            yield (b"" if first else b",") + b",".join(batch)
+        yield b"]}"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype="application/json")
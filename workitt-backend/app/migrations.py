@@ -0,0 +1,234 @@
+"""
+Startup schema upgrade.
+
+The database is created with db.create_all(), which only adds missing tables.
+Running it on startup makes tables introduced by new models available on
+existing installs without a manual reset. Columns and indexes added to existing
+tables are created separately, since create_all() skips tables that already
+exist. New columns must be nullable or have a server_default.
+
+Data that has to be rewritten for a new release is handled by one-time data
+migrations (DATA_MIGRATIONS), run after the schema upgrade and recorded in
+data_migrations so each one runs once per database. They run before
+sync_section_storage() and write resume content as a whole (CompressedJSON
+rather than the column's ResumeContentJSON, which leaves the item sections
+out when section storage is on), so no section is dropped before it has been
+moved to resume_section_items.
+"""
+from datetime import datetime
+from sqlalchemy import bindparam, delete, func, inspect, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.column_types import CompressedJSON
+from app.config import RESUME_SECTION_STORAGE
+from app.extensions import db
+from app.application_events import applications_created
+from app.models import (
+    Application, ApplicationEvent, ApplicationMonthCount, ApplicationStatusCount, CoverLetter, DataMigration, Profile,
+)
+from app.resume_facts import remove_facts, store_facts
+from app.resume_sections import load_sections
+from app.revisions import content_hash
+from utils.resume_validation import normalize_resume_content
+
+MIGRATION_BATCH = 200  # rows per batch in data migrations
+
+def _ignore_exists(create):
+    try:
+        create()
+    except OperationalError as e:
+        # Another worker created the table, column or index between the existence check and CREATE
+        if "already exists" not in str(e) and "duplicate column" not in str(e):
+            raise
+        db.session.rollback()
+
+def _column_ddl(table, column):
+    ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(db.engine.dialect)}'
+    if column.server_default is not None:
+        default = column.server_default.arg
+        if isinstance(default, str):
+            default = "'" + default.replace("'", "''") + "'"
+        else:
+            default = default.text
+        if not column.nullable:
+            ddl += " NOT NULL"
+        ddl += f" DEFAULT {default}"
+    return ddl
+
+def _add_missing_columns():
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present:
+                print(f"[DB] Adding column {table.name}.{column.name}")
+                ddl = _column_ddl(table, column)
+
+                def add(ddl=ddl):
+                    with db.engine.begin() as connection:
+                        connection.execute(text(ddl))
+                _ignore_exists(add)
+
+def _normalize_resume_content():
+    """Store every resume's content normalized, so reads no longer fill in defaults"""
+    profiles = Profile.__table__
+    update = (
+        profiles.update()
+        .where(profiles.c.id == bindparam("_id"))
+        # Keep updated_at and the revision: the content a client sees does not change
+        .values(
+            content=bindparam("_content", type_=CompressedJSON()),
+            content_hash=bindparam("_content_hash"),
+            updated_at=bindparam("_updated_at"),
+        )
+    )
+    last_id = ""
+    count = 0
+    while True:
+        rows = db.session.execute(
+            select(profiles).where(profiles.c.id > last_id).order_by(profiles.c.id).limit(MIGRATION_BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        changes = []
+        for row in rows:
+            content = row.content if isinstance(row.content, dict) else {}
+            normalized = normalize_resume_content(content, row)
+            if normalized != row.content:
+                changes.append({
+                    "_id": row.id,
+                    "_content": normalized,
+                    "_content_hash": content_hash(normalized),
+                    "_updated_at": row.updated_at,
+                })
+        if changes:
+            db.session.execute(update, changes)
+            count += len(changes)
+    print(f"[DB] Normalized the content of {count} resumes")
+
+def _compress_content():
+    """Rewrite resume and cover letter content written as JSON text in the compressed format"""
+    for model, key in ((Profile, "id"), (CoverLetter, "cover_id")):
+        table = model.__table__
+        key_column = table.c[key]
+        update = (
+            table.update()
+            .where(key_column == bindparam("_id"))
+            .values(content=bindparam("_content", type_=CompressedJSON()), updated_at=bindparam("_updated_at"))
+        )
+        last_id = ""
+        count = 0
+        while True:
+            rows = db.session.execute(
+                select(key_column, table.c.content, table.c.updated_at)
+                .where(key_column > last_id)
+                .order_by(key_column)
+                .limit(MIGRATION_BATCH)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            db.session.execute(
+                update, [{"_id": row[0], "_content": row.content or {}, "_updated_at": row.updated_at} for row in rows]
+            )
+            count += len(rows)
+        print(f"[DB] Compressed the content of {count} {table.name} rows")
+
+def _store_resume_facts():
+    """Fill profile_skills and profile_experience from the existing resumes"""
+    profiles = Profile.__table__
+    last_id = ""
+    count = 0
+    while True:
+        rows = db.session.execute(
+            select(profiles.c.id, profiles.c.user_id, profiles.c.content)
+            .where((profiles.c.id > last_id) & profiles.c.deleted_at.is_(None))
+            .order_by(profiles.c.id)
+            .limit(MIGRATION_BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        connection = db.session.connection()
+        sections = load_sections(connection, [row.id for row in rows]) if RESUME_SECTION_STORAGE else {}
+        documents = []
+        for row in rows:
+            content = dict(row.content or {})
+            # Sections stored as rows (sections still in the column have no rows yet)
+            content.update({key: items for key, items in sections.get(row.id, {}).items() if items})
+            documents.append((row.id, row.user_id, content))
+        remove_facts(connection, [row.id for row in rows])
+        store_facts(connection, documents)
+        count += len(rows)
+    print(f"[DB] Stored the skills and experience of {count} resumes")
+
+def _application_rollups():
+    """
+    Record a creation event for every existing application and count them in
+    the rollups. Earlier status changes were never stored, so each
+    application's history starts at its current status.
+    """
+    for model in (ApplicationEvent, ApplicationStatusCount, ApplicationMonthCount):
+        db.session.execute(delete(model.__table__))
+    applications = Application.__table__
+    last_id = ""
+    count = 0
+    while True:
+        rows = db.session.execute(
+            select(applications.c.app_id, applications.c.user_id, applications.c.status, applications.c.created_at)
+            .where(applications.c.app_id > last_id)
+            .order_by(applications.c.app_id)
+            .limit(MIGRATION_BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].app_id
+        applications_created(db.session.connection(), [tuple(row) for row in rows])
+        count += len(rows)
+    print(f"[DB] Recorded the status of {count} applications")
+
+def _fill_updated_at():
+    """Give rows written without updated_at their creation time, so list pages can use the updated_at indexes"""
+    for model in (Profile, Application):
+        table = model.__table__
+        result = db.session.execute(
+            table.update()
+            .where(table.c.updated_at.is_(None))
+            .values(updated_at=func.coalesce(table.c.created_at, datetime.utcnow()))
+        )
+        print(f"[DB] Filled in updated_at for {result.rowcount} {table.name} rows")
+
+# One-time data migrations, in the order they run. Names must never change.
+DATA_MIGRATIONS = (
+    ("0001_normalize_resume_content", _normalize_resume_content),
+    ("0002_compress_content", _compress_content),
+    ("0003_resume_facts", _store_resume_facts),
+    ("0004_application_rollups", _application_rollups),
+    ("0005_fill_updated_at", _fill_updated_at),
+)
+
+def _run_data_migrations():
+    applied = set(db.session.execute(select(DataMigration.name)).scalars())
+    for name, migrate in DATA_MIGRATIONS:
+        if name in applied:
+            continue
+        print(f"[DB] Running data migration {name}")
+        try:
+            migrate()
+            db.session.add(DataMigration(name=name))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker applied it at the same time
+            db.session.rollback()
+
+def upgrade_database():
+    """Create any missing tables, columns and indexes. Safe to run from several workers at once."""
+    _ignore_exists(db.create_all)
+    _add_missing_columns()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            _ignore_exists(lambda: index.create(db.engine, checkfirst=True))
+    _run_data_migrations()
@@ -2,8 +2,12 @@ from datetime import datetime
 import uuid
 from pathlib import Path
 from flask_login import UserMixin
+from sqlalchemy import event
 from sqlalchemy.ext.mutable import MutableDict
+from sqlalchemy.orm import attributes, deferred
+from app.column_types import CompressedJSON, ResumeContentJSON
 from app.extensions import db
+from app.revisions import content_hash
 
 DATA_DIR = Path("data").resolve()
 DB_FILE = DATA_DIR / "workitt.db"
@@ -51,6 +55,12 @@ class User(db.Model, BaseModel, UserMixin):
     profiles = db.relationship(
         "Profile", backref="user", lazy=True, cascade="all, delete-orphan"
     )
+    upload_cache = db.relationship(
+        "ResumeUploadCache", lazy=True, cascade="all, delete-orphan"
+    )
+    export_jobs = db.relationship(
+        "ExportJob", lazy=True, cascade="all, delete-orphan"
+    )
     
     # Soft delete helper methods
     def soft_delete(self):
@@ -69,6 +79,8 @@ class User(db.Model, BaseModel, UserMixin):
 
 class Profile(db.Model, BaseModel):
     __tablename__ = "profile"
+    # Serves the newest-first keyset pagination of a user's profiles
+    __table_args__ = (db.Index("ix_profile_user_updated", "user_id", "updated_at", "id"),)
     id = db.Column(db.String, primary_key=True, default=generate_uuid)
     user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
     first_name = db.Column(db.String(120))
@@ -81,7 +93,14 @@ class Profile(db.Model, BaseModel):
     country = db.Column(db.String(100))
     summary = db.Column(db.Text)
     # All resume data (work experience, education, skills, etc.) is stored in content as JSON
-    content = db.Column(MutableDict.as_mutable(db.JSON), nullable=False, default=dict)
+    # (compressed, and only loaded and decompressed when accessed)
+    content = deferred(
+        db.Column(MutableDict.as_mutable(ResumeContentJSON), nullable=False, default=dict), active_history=True
+    )
+    # Bumped on every UPDATE; stale writes fail (see app/revisions.py)
+    revision = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    content_hash = db.Column(db.String(64))  # SHA-256 of the canonical content JSON
+    __mapper_args__ = {"version_id_col": revision}
 
 
 class CoverLetter(db.Model, BaseModel):
@@ -89,11 +108,116 @@ class CoverLetter(db.Model, BaseModel):
     cover_id = db.Column(db.String, primary_key=True, default=generate_uuid)
     user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
     title = db.Column(db.String, nullable=False)
-    content = db.Column(MutableDict.as_mutable(db.JSON), nullable=False, default=dict)
+    content = deferred(
+        db.Column(MutableDict.as_mutable(CompressedJSON), nullable=False, default=dict), active_history=True
+    )
     c_template_name = db.Column(db.String, default="default")
+    # Bumped on every UPDATE; stale writes fail (see app/revisions.py)
+    revision = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    content_hash = db.Column(db.String(64))  # SHA-256 of the canonical content JSON
+    __mapper_args__ = {"version_id_col": revision}
+
+class ResumeUploadCache(db.Model):
+    __tablename__ = "resume_upload_cache"
+    __table_args__ = (db.UniqueConstraint("user_id", "digest"),)
+    id = db.Column(db.String, primary_key=True, default=generate_uuid)
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False, index=True)
+    digest = db.Column(db.String(64), nullable=False)  # SHA-256 of the uploaded PDF
+    text = db.Column(db.Text)  # Extracted text
+    parsed = db.Column(db.JSON, nullable=True)  # Parsed resume data (set once parsing succeeds)
+    size = db.Column(db.Integer, nullable=False, default=0)  # Approximate stored bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class ResumeSectionItem(db.Model):
+    """One item of a resume section, when sections are stored as rows (see app/resume_sections.py)"""
+    __tablename__ = "resume_section_items"
+    profile_id = db.Column(db.String, db.ForeignKey("profile.id"), primary_key=True)
+    section = db.Column(db.String(30), primary_key=True)  # workExperience, education, skills, ...
+    item_id = db.Column(db.String, primary_key=True)  # The item's id (or ~position for items without one)
+    position = db.Column(db.Integer, nullable=False)  # Index of the item in the section
+    data = db.Column(db.JSON, nullable=False)  # The item as stored in the content
+
+class ProfileSkill(db.Model):
+    """A skill listed on a resume, kept in step with its content (see app/resume_facts.py)"""
+    __tablename__ = "profile_skills"
+    __table_args__ = (
+        db.Index("ix_profile_skills_user_name", "user_id", "normalized_name"),
+        db.Index("ix_profile_skills_name", "normalized_name"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.String, db.ForeignKey("profile.id"), nullable=False, index=True)
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
+    name = db.Column(db.String(200), nullable=False)  # As written on the resume
+    normalized_name = db.Column(db.String(200), nullable=False)  # Lowercased, whitespace collapsed
+    level = db.Column(db.String(100))
+
+class ProfileExperience(db.Model):
+    """A work experience entry of a resume, kept in step with its content (see app/resume_facts.py)"""
+    __tablename__ = "profile_experience"
+    __table_args__ = (
+        db.Index("ix_profile_experience_user_start", "user_id", "start_date"),
+        db.Index("ix_profile_experience_company", "normalized_company"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.String, db.ForeignKey("profile.id"), nullable=False, index=True)
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Index of the entry in workExperience
+    title = db.Column(db.String(200))
+    company = db.Column(db.String(200))
+    normalized_company = db.Column(db.String(200))
+    start_date = db.Column(db.String(7))  # YYYY-MM, or NULL when missing or unreadable
+    end_date = db.Column(db.String(7))  # YYYY-MM, or NULL for current positions
+    current = db.Column(db.Boolean, nullable=False, default=False)
+
+class DocumentRevision(db.Model):
+    """One stored revision of a resume or cover letter's content (see app/history.py)"""
+    __tablename__ = "document_revisions"
+    __table_args__ = (db.UniqueConstraint("document_type", "document_id", "revision"),)
+    id = db.Column(db.String, primary_key=True, default=generate_uuid)
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False, index=True)
+    document_type = db.Column(db.String(20), nullable=False)  # resume, cover_letter
+    document_id = db.Column(db.String, nullable=False)
+    revision = db.Column(db.Integer, nullable=False)  # The document's revision number
+    kind = db.Column(db.String(10), nullable=False)  # snapshot (full content) or delta
+    data = db.Column(db.JSON, nullable=False)  # Content, or JSON Patch from the previous stored revision
+    size = db.Column(db.Integer, nullable=False, default=0)  # Bytes of data as JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SearchDocument(db.Model):
+    """A document's row in the full-text search index (see app/search.py)"""
+    __tablename__ = "search_documents"
+    __table_args__ = (db.UniqueConstraint("document_type", "document_id"),)
+    id = db.Column(db.Integer, primary_key=True)  # rowid of the document in search_index
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
+    document_type = db.Column(db.String(20), nullable=False)  # resume, cover_letter, application
+    document_id = db.Column(db.String, nullable=False)
+
+class ExportJob(db.Model):
+    """A data export built in the background (see app/export.py)"""
+    __tablename__ = "export_jobs"
+    id = db.Column(db.String, primary_key=True, default=generate_uuid)
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False, index=True)
+    format = db.Column(db.String(10), nullable=False)  # zip, ndjson
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, done, failed
+    size = db.Column(db.Integer)  # Bytes of the finished export
+    error = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+class DataMigration(db.Model):
+    """A one-time data migration that has been applied (see app/migrations.py)"""
+    __tablename__ = "data_migrations"
+    name = db.Column(db.String, primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Application(db.Model, BaseModel):
     __tablename__ = "applications"
+    # Serve the newest-first keyset pagination of a user's applications and the status filter
+    __table_args__ = (
+        db.Index("ix_applications_user_updated", "user_id", "updated_at", "app_id"),
+        db.Index("ix_applications_user_status", "user_id", "status"),
+    )
     app_id = db.Column(db.String, primary_key=True, default=generate_uuid)
     user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
     job_title = db.Column(db.String, nullable=False)
@@ -110,6 +234,34 @@ class Application(db.Model, BaseModel):
     profile = db.relationship("Profile")  # Resume relationship
     cover_letter = db.relationship("CoverLetter")  # Cover letter relationship
 
+class ApplicationEvent(db.Model):
+    """A status change of an application, appended on every transition (see app/application_events.py)"""
+    __tablename__ = "application_events"
+    __table_args__ = (
+        db.Index("ix_application_events_app", "app_id", "created_at"),
+        db.Index("ix_application_events_user", "user_id", "created_at"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), nullable=False)
+    app_id = db.Column(db.String, nullable=False)
+    from_status = db.Column(db.String)  # NULL for the event recording the application's creation
+    to_status = db.Column(db.String, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class ApplicationStatusCount(db.Model):
+    """Number of a user's applications currently in each status (see app/application_events.py)"""
+    __tablename__ = "application_status_counts"
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), primary_key=True)
+    status = db.Column(db.String, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class ApplicationMonthCount(db.Model):
+    """Number of a user's applications created in each month (see app/application_events.py)"""
+    __tablename__ = "application_month_counts"
+    user_id = db.Column(db.String, db.ForeignKey("users.id"), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM of created_at
+    count = db.Column(db.Integer, nullable=False, default=0)
+
 class Subscription(db.Model, BaseModel):
     __tablename__ = "subscriptions"
     sub_id = db.Column(db.String, primary_key=True, default=generate_uuid)
@@ -140,3 +292,14 @@ class Subscription(db.Model, BaseModel):
     
     # Deprecated - use plan_type instead (kept for backwards compatibility)
     plan = db.Column(db.String, nullable=True)
+
+
+@event.listens_for(Profile, "before_insert")
+@event.listens_for(Profile, "before_update")
+@event.listens_for(CoverLetter, "before_insert")
+@event.listens_for(CoverLetter, "before_update")
+def _store_content_hash(mapper, connection, target):
+    """Keep content_hash in step with content on every write"""
+    # Updates that leave content alone do not load (and decompress) it
+    if target.content_hash is None or attributes.get_history(target, "content").has_changes():
+        target.content_hash = content_hash(target.content)
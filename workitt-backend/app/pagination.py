@@ -0,0 +1,89 @@
+"""
+List endpoint helpers: sparse fieldsets and keyset pagination.
+
+Lists are ordered newest first by (updated_at, id) and paged with an opaque
+cursor holding the last row's sort key, so each page is an index range scan
+instead of an OFFSET that re-reads every earlier row. The order and the
+cursor filter use exactly the (user_id, updated_at, id) indexes' columns,
+which is why updated_at is never NULL (data migration 0005 fills it in).
+"""
+import base64
+from datetime import datetime
+from flask import request
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+class ListArgumentError(ValueError):
+    """Invalid fields, limit or cursor query argument"""
+
+
+def parse_fields(allowed, default):
+    """
+    Read the `fields` query argument (comma separated) into a tuple of field names.
+
+    Returns `default` when the argument is absent.
+    Raises ListArgumentError for unknown fields.
+    """
+    raw = request.args.get("fields")
+    if not raw:
+        return tuple(default)
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ListArgumentError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit():
+    """Read the `limit` query argument, clamped to MAX_PAGE_SIZE"""
+    raw = request.args.get("limit")
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ListArgumentError("limit must be an integer")
+    if limit < 1:
+        raise ListArgumentError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(updated_at, key):
+    raw = f"{updated_at.isoformat()}|{key}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (updated_at, key) from a cursor made by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        stamp, key = raw.split("|", 1)
+        return datetime.fromisoformat(stamp), key
+    except ValueError:
+        raise ListArgumentError("Invalid cursor")
+
+
+def parse_cursor():
+    """Read the `cursor` query argument into (updated_at, key), or None for the first page"""
+    cursor = request.args.get("cursor")
+    return decode_cursor(cursor) if cursor else None
+
+
+def keyset_page(query, updated_column, key_column, limit, after=None):
+    """
+    Fetch one page of `query`, newest first, starting after the `after` key
+    (from parse_cursor).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if after:
+        query = query.filter(tuple_(updated_column, key_column) < tuple_(*after))
+    rows = query.order_by(updated_column.desc(), key_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, updated_column.key), getattr(last, key_column.key))
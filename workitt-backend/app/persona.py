@@ -0,0 +1,129 @@
+"""
+The applicant persona in cover letter generation prompts.
+
+The prompt describes the applicant as a YAML `persona` mapping: name, contact
+details, work experience, skills, certifications and custom content. For a
+stored resume it is built here from the resume's content, so clients only
+send the profile_id. The rendered YAML fragment is cached per profile and
+keyed by its revision, so it is formatted once per edit of the resume rather
+than once per generation. Up to PERSONA_CACHE_SIZE fragments are kept per
+process, least recently used first out.
+"""
+import os
+import threading
+from collections import OrderedDict
+import yaml
+
+PERSONA_CACHE_SIZE = int(os.environ.get("PERSONA_CACHE_SIZE", 512))
+
+_cache = OrderedDict()  # profile_id -> (revision, fragment)
+_lock = threading.Lock()
+
+
+def format_persona(first_name="", last_name="", email="", phone="", address="", work_experience=(), skills=(),
+                   certifications=(), custom_content=()):
+    """
+    Persona mapping with only the fields and entries that carry data.
+    Entries use the generation API's field names (start_date, authority, details, ...).
+    """
+    persona = {}
+    for key, value in (
+        ("first_name", first_name), ("last_name", last_name), ("email", email), ("phone", phone), ("address", address)
+    ):
+        if value:
+            persona[key] = value
+
+    # Work experience - only entries with actual data
+    formatted_we = []
+    for we in work_experience or []:
+        if we.get("title") or we.get("company") or we.get("description"):
+            formatted_we.append({
+                key: we[key]
+                for key in ("title", "company", "location", "start_date", "end_date", "description")
+                if we.get(key)
+            })
+    if formatted_we:
+        persona["work_experience"] = formatted_we
+
+    # Skills and certifications - only entries with names
+    formatted_skills = [
+        {"name": skill["name"], **({"level": skill["level"]} if skill.get("level") else {})}
+        for skill in skills or []
+        if skill.get("name")
+    ]
+    if formatted_skills:
+        persona["skills"] = formatted_skills
+    formatted_certs = [
+        {"name": cert["name"], **({"authority": cert["authority"]} if cert.get("authority") else {})}
+        for cert in certifications or []
+        if cert.get("name")
+    ]
+    if formatted_certs:
+        persona["certifications"] = formatted_certs
+
+    # Custom content - only entries with both title and details
+    formatted_content = [
+        {"title": content["title"], "details": content["details"]}
+        for content in custom_content or []
+        if content.get("title") and content.get("details")
+    ]
+    if formatted_content:
+        persona["custom_content"] = formatted_content
+    return persona
+
+
+def _items(content, section):
+    return [item for item in content.get(section) or [] if isinstance(item, dict)]
+
+
+def resume_persona(profile):
+    """Persona mapping for a stored resume (loads its content)"""
+    content = profile.content or {}
+    info = content.get("personalInfo") or {}
+    return format_persona(
+        first_name=info.get("firstName") or profile.first_name,
+        last_name=info.get("lastName") or profile.last_name,
+        email=info.get("email") or profile.profile_email,
+        phone=info.get("phone") or profile.phone,
+        address=info.get("address") or profile.address,
+        work_experience=[
+            {
+                "title": item.get("title"),
+                "company": item.get("company"),
+                "location": item.get("location"),
+                "start_date": item.get("startDate"),
+                "end_date": "Present" if item.get("current") else item.get("endDate"),
+                "description": item.get("description"),
+            }
+            for item in _items(content, "workExperience")
+        ],
+        skills=_items(content, "skills"),
+        certifications=[
+            {"name": item.get("name"), "authority": item.get("issuer")} for item in _items(content, "certifications")
+        ],
+        custom_content=[
+            {"title": item.get("title"), "details": item.get("content") or item.get("description")}
+            for item in _items(content, "others")
+        ],
+    )
+
+
+def persona_yaml(persona):
+    """The prompt's `persona:` YAML block (empty for an empty persona)"""
+    return yaml.dump({"persona": persona}) if persona else ""
+
+
+def resume_persona_yaml(profile):
+    """persona_yaml() for a stored resume, from the cache while its revision is unchanged"""
+    with _lock:
+        cached = _cache.get(profile.id)
+        if cached is not None and cached[0] == profile.revision:
+            _cache.move_to_end(profile.id)
+            return cached[1]
+    fragment = persona_yaml(resume_persona(profile))
+    with _lock:
+        _cache[profile.id] = (profile.revision, fragment)
+        _cache.move_to_end(profile.id)
+        while len(_cache) > PERSONA_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return fragment
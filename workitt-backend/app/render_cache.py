@@ -0,0 +1,100 @@
+"""
+Disk cache of rendered PDFs, keyed by what the PDF is rendered from.
+
+The key is the SHA-256 of the document kind, the renderer's TEMPLATE_VERSION
+and the stored content hash (the content includes `style` and `templateId`),
+so it is known from one column query, before any content is loaded. A cover
+letter without a date shows the day it was rendered, so its file is keyed by
+that day too. Downloading an unchanged document therefore costs two stat()
+calls and a streamed file, or a 304 when the client already has it.
+
+Files are written by the render pool and moved into place atomically. The
+cache is trimmed least-recently-used first (by mtime, refreshed on every hit)
+once it grows past RENDER_CACHE_MAX_MB.
+"""
+import hashlib
+import os
+from pathlib import Path
+from flask import send_file
+from app.config import DATA_DIR
+from utils.pdf_render import TEMPLATE_VERSION, render_pdf
+
+RENDER_CACHE_DIR = Path(os.environ.get("RENDER_CACHE_DIR") or DATA_DIR / "render_cache")
+RENDER_CACHE_MAX_MB = int(os.environ.get("RENDER_CACHE_MAX_MB", 256))
+
+
+def render_key(kind, digest):
+    return hashlib.sha256(f"{kind}\x1f{TEMPLATE_VERSION}\x1f{digest}".encode()).hexdigest()
+
+
+def _path(key, today=None):
+    name = f"{key}-{today}.pdf" if today else f"{key}.pdf"
+    return RENDER_CACHE_DIR / key[:2] / name
+
+
+def _dated(kind, content):
+    """True if the rendered document shows today's date"""
+    if kind != "cover_letter" or content.get("date"):
+        return False
+    return (content.get("visibility") or {}).get("date", True) is not False
+
+
+def _lookup(key, today):
+    for path in (_path(key), _path(key, today)):
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def _trim():
+    """Delete least recently used renders beyond RENDER_CACHE_MAX_MB"""
+    files = []
+    for path in RENDER_CACHE_DIR.glob("*/*.pdf"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    limit = RENDER_CACHE_MAX_MB * 1024 * 1024
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def cached_pdf(kind, digest, load_content, today):
+    """
+    Path of the rendered PDF for a document whose stored content hash is
+    `digest`; load_content() is only called if it has to be rendered.
+    Raises PdfRenderError if rendering fails.
+    """
+    key = render_key(kind, digest)
+    path = _lookup(key, today)
+    if path:
+        return path
+    content = load_content() or {}
+    path = _path(key, today if _dated(kind, content) else None)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    render_pdf(kind, content, path, today)
+    _trim()
+    return path
+
+
+def pdf_response(kind, digest, load_content, filename, today):
+    """Stream the document's PDF as a download, rendering it on a cache miss (304 if the client has it)"""
+    path = cached_pdf(kind, digest, load_content, today)
+    # The file name identifies the rendered version, so it doubles as a strong ETag
+    response = send_file(
+        path, mimetype="application/pdf", as_attachment=True, download_name=filename, etag=path.stem
+    )
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Cookie")
+    return response
@@ -0,0 +1,159 @@
+"""
+Queryable facts derived from resume content.
+
+Skills and work experience live inside Profile.content, so a question like
+"what are this user's top skills" would otherwise load and decode every
+resume. profile_skills and profile_experience hold those facts as plain,
+indexed rows:
+
+- profile_skills: one row per skill, with the name normalized (lowercased,
+  whitespace collapsed) so "Python" and " python" count as one skill
+- profile_experience: one row per workExperience entry, with the dates
+  normalized to YYYY-MM so they sort
+
+The rows are derived data, rewritten from the content by an after_flush hook
+whenever a resume's content changes, in the same transaction as the write.
+Bulk inserts bypass the hook and call store_facts() themselves.
+"""
+import re
+from sqlalchemy import case, delete, event, func, select
+from sqlalchemy.orm import Session, attributes
+from app.extensions import db
+from app.models import Profile, ProfileExperience, ProfileSkill
+from utils.resume_preparser import normalize_date
+
+MAX_TEXT = 200  # characters kept of names, titles and companies
+
+_skills = ProfileSkill.__table__
+_experience = ProfileExperience.__table__
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _clean(value):
+    return _SPACE_RE.sub(" ", value).strip()[:MAX_TEXT] if isinstance(value, str) else ""
+
+
+def normalize_name(value):
+    """Key under which names that differ only in case or spacing are counted together"""
+    return _clean(value).lower()
+
+
+def _month(value):
+    month = normalize_date(value) if isinstance(value, str) and value.strip() else ""
+    return month if month and month != "Present" else None
+
+
+def _facts(profile_id, user_id, content):
+    """(skill rows, experience rows) for a resume's content"""
+    content = content or {}
+    skills = []
+    seen = set()
+    for item in content.get("skills") or []:
+        if not isinstance(item, dict):
+            continue
+        name = _clean(item.get("name"))
+        normalized = name.lower()
+        if not name or normalized in seen:
+            continue
+        seen.add(normalized)
+        level = item.get("level") if isinstance(item.get("level"), str) else None
+        skills.append({
+            "profile_id": profile_id, "user_id": user_id, "name": name, "normalized_name": normalized, "level": level,
+        })
+
+    experience = []
+    for position, item in enumerate(content.get("workExperience") or []):
+        if not isinstance(item, dict):
+            continue
+        end = item.get("endDate")
+        current = bool(item.get("current")) or (isinstance(end, str) and normalize_date(end) == "Present")
+        company = _clean(item.get("company"))
+        experience.append({
+            "profile_id": profile_id,
+            "user_id": user_id,
+            "position": position,
+            "title": _clean(item.get("title")),
+            "company": company,
+            "normalized_company": company.lower(),
+            "start_date": _month(item.get("startDate")),
+            "end_date": None if current else _month(end),
+            "current": current,
+        })
+    return skills, experience
+
+
+def store_facts(connection, documents):
+    """Store the facts of new resumes. `documents` are (profile_id, user_id, content) triples."""
+    skills, experience = [], []
+    for profile_id, user_id, content in documents:
+        profile_skills, profile_experience = _facts(profile_id, user_id, content)
+        skills.extend(profile_skills)
+        experience.extend(profile_experience)
+    if skills:
+        connection.execute(_skills.insert(), skills)
+    if experience:
+        connection.execute(_experience.insert(), experience)
+
+
+def remove_facts(connection, profile_ids):
+    if profile_ids:
+        connection.execute(delete(_skills).where(_skills.c.profile_id.in_(profile_ids)))
+        connection.execute(delete(_experience).where(_experience.c.profile_id.in_(profile_ids)))
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_facts(session, flush_context):
+    changed = []
+    removed = [p.id for p in session.deleted if type(p) is Profile]
+    for profile in list(session.new) + list(session.dirty):
+        if type(profile) is not Profile:
+            continue
+        if profile not in session.new and not (
+            attributes.get_history(profile, "content").has_changes()
+            or attributes.get_history(profile, "deleted_at").has_changes()
+        ):
+            continue
+        if profile not in session.new:
+            removed.append(profile.id)
+        if not profile.deleted_at:
+            changed.append((profile.id, profile.user_id, profile.content))
+    connection = session.connection()
+    remove_facts(connection, removed)
+    store_facts(connection, changed)
+
+
+# === Aggregates ===
+def top_skills(user_id=None, limit=10):
+    """
+    Most listed skills, as [{"name", "count"}]: across the user's resumes
+    (count = resumes listing it), or platform-wide without a user (count = users)
+    """
+    if user_id is not None:
+        count = func.count(_skills.c.profile_id.distinct())
+        query = select(_skills.c.normalized_name, func.min(_skills.c.name), count).where(_skills.c.user_id == user_id)
+    else:
+        count = func.count(_skills.c.user_id.distinct())
+        query = select(_skills.c.normalized_name, func.min(_skills.c.name), count)
+    rows = db.session.execute(
+        query.group_by(_skills.c.normalized_name).order_by(count.desc(), _skills.c.normalized_name).limit(limit)
+    ).all()
+    return [{"name": name, "count": total} for _, name, total in rows]
+
+
+def most_recent_position(user_id):
+    """The user's current (or most recently ended) position across their resumes, or None"""
+    row = db.session.execute(
+        select(_experience.c.title, _experience.c.company, _experience.c.start_date, _experience.c.end_date)
+        .where((_experience.c.user_id == user_id) & (_experience.c.title != ""))
+        .order_by(
+            _experience.c.current.desc(),
+            # Unknown end dates sort last
+            case((_experience.c.end_date.is_(None), 0), else_=1).desc(),
+            _experience.c.end_date.desc(),
+            _experience.c.start_date.desc(),
+        )
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    return {"title": row.title, "company": row.company, "start_date": row.start_date, "end_date": row.end_date}
@@ -0,0 +1,239 @@
+"""
+Section-granular storage for resume content (optional).
+
+With RESUME_SECTION_STORAGE=true the item sections of a resume
+(workExperience, education, skills, certifications, links, others) are
+stored in resume_section_items, one row per item keyed by
+(profile_id, section, item_id), with the item's position in the section; the
+content column keeps the rest of the document. The split is invisible above
+the model:
+
+- writes: the column type leaves the sections out of the stored JSON and an
+  after_flush hook writes only the items that were added, changed, moved or
+  removed (editing one job rewrites that one row)
+- reads: a load hook puts the sections back, so profile.content is always the
+  whole document, in the shape the API returns
+
+A single section can be read without touching the rest (load_section()).
+Changing the setting converts the database on the next startup
+(sync_section_storage()).
+"""
+from sqlalchemy import bindparam, delete, event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, attributes
+from app.config import RESUME_SECTION_STORAGE
+from app.extensions import db
+from app.models import DataMigration, Profile, ResumeSectionItem
+from utils.resume_validation import RESUME_LIST_SECTIONS
+
+MIGRATION_BATCH = 200  # profiles per batch when converting the database
+
+# Recorded in data_migrations while the database uses section storage
+STORAGE_MARKER = "resume_section_storage"
+
+_items = ResumeSectionItem.__table__
+_profiles = Profile.__table__
+
+
+def _section_rows(content):
+    """{(section, item_id): (position, item)} for the item sections of `content`"""
+    rows = {}
+    for section in RESUME_LIST_SECTIONS:
+        items = content.get(section)
+        if not isinstance(items, list):
+            continue
+        for position, item in enumerate(items):
+            item_id = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(item_id, str) or not item_id or (section, item_id) in rows:
+                item_id = f"~{position}"
+            rows[(section, item_id)] = (position, item)
+    return rows
+
+
+def _insert_values(profile_id, rows):
+    return [
+        {"profile_id": profile_id, "section": section, "item_id": item_id, "position": position, "data": item}
+        for (section, item_id), (position, item) in rows.items()
+    ]
+
+
+def insert_sections(connection, documents):
+    """Store the sections of new resumes. `documents` are (profile_id, content) pairs."""
+    values = []
+    for profile_id, content in documents:
+        values.extend(_insert_values(profile_id, _section_rows(content or {})))
+    if values:
+        connection.execute(_items.insert(), values)
+
+
+def update_sections(connection, profile_id, content):
+    """Bring the stored sections of a resume in line with `content`, writing only what differs"""
+    stored = {
+        (row.section, row.item_id): (row.position, row.data)
+        for row in connection.execute(
+            select(_items.c.section, _items.c.item_id, _items.c.position, _items.c.data).where(
+                _items.c.profile_id == profile_id
+            )
+        )
+    }
+    rows = _section_rows(content or {})
+
+    removed = [{"_section": s, "_item_id": i} for (s, i) in stored if (s, i) not in rows]
+    added = {key: value for key, value in rows.items() if key not in stored}
+    changed = [
+        {"_section": section, "_item_id": item_id, "_position": position, "_data": item}
+        for (section, item_id), (position, item) in rows.items()
+        if (section, item_id) in stored and stored[(section, item_id)] != (position, item)
+    ]
+    where = (
+        (_items.c.profile_id == profile_id)
+        & (_items.c.section == bindparam("_section"))
+        & (_items.c.item_id == bindparam("_item_id"))
+    )
+    if removed:
+        connection.execute(_items.delete().where(where), removed)
+    if changed:
+        connection.execute(
+            _items.update().where(where).values(position=bindparam("_position"), data=bindparam("_data")), changed
+        )
+    if added:
+        connection.execute(_items.insert(), _insert_values(profile_id, added))
+
+
+def load_sections(connection, profile_ids):
+    """{profile_id: {section: [items]}} for the given resumes, in one query"""
+    sections = {profile_id: {section: [] for section in RESUME_LIST_SECTIONS} for profile_id in profile_ids}
+    rows = connection.execute(
+        select(_items.c.profile_id, _items.c.section, _items.c.data)
+        .where(_items.c.profile_id.in_(list(profile_ids)))
+        .order_by(_items.c.profile_id, _items.c.section, _items.c.position)
+    )
+    for row in rows:
+        sections[row.profile_id].setdefault(row.section, []).append(row.data)
+    return sections
+
+
+def load_section(profile_id, section):
+    """The items of one section of a resume, without loading the rest of the document"""
+    if not RESUME_SECTION_STORAGE:
+        content = db.session.execute(select(_profiles.c.content).where(_profiles.c.id == profile_id)).scalar()
+        return list((content or {}).get(section) or [])
+    return db.session.execute(
+        select(_items.c.data)
+        .where((_items.c.profile_id == profile_id) & (_items.c.section == section))
+        .order_by(_items.c.position)
+    ).scalars().all()
+
+
+def with_sections(connection, profile_id, content):
+    """The whole document for content read straight from the column"""
+    if not RESUME_SECTION_STORAGE or content is None:
+        return content
+    return {**content, **load_sections(connection, [profile_id])[profile_id]}
+
+
+# === Hooks ===
+def _assemble(profile, connection):
+    content = profile.__dict__.get("content")
+    if content is not None:
+        # dict.update: filling in the loaded value is not a change to the document
+        dict.update(content, load_sections(connection, [profile.id])[profile.id])
+
+
+@event.listens_for(Profile, "load")
+def _load_sections(profile, context):
+    if RESUME_SECTION_STORAGE:
+        _assemble(profile, context.session.connection())
+
+
+@event.listens_for(Profile, "refresh")
+def _refresh_sections(profile, context, attrs):
+    if RESUME_SECTION_STORAGE and (attrs is None or "content" in attrs):
+        _assemble(profile, context.session.connection())
+
+
+@event.listens_for(Session, "after_flush")
+def _store_sections(session, flush_context):
+    if not RESUME_SECTION_STORAGE:
+        return
+    created = [(p.id, p.content) for p in session.new if type(p) is Profile]
+    if created:
+        insert_sections(session.connection(), created)
+    for profile in session.dirty:
+        if type(profile) is Profile and attributes.get_history(profile, "content").has_changes():
+            update_sections(session.connection(), profile.id, profile.content)
+    deleted = [p.id for p in session.deleted if type(p) is Profile]
+    if deleted:
+        session.connection().execute(delete(_items).where(_items.c.profile_id.in_(deleted)))
+
+
+# === Conversion ===
+def _convert(batch_update):
+    """
+    Rewrite the content of the profiles batch_update returns values for,
+    MIGRATION_BATCH at a time, keeping updated_at and the revision
+    """
+    update = (
+        _profiles.update()
+        .where(_profiles.c.id == bindparam("_id"))
+        .values(content=bindparam("_content"), updated_at=bindparam("_updated_at"))
+    )
+    last_id = ""
+    count = 0
+    while True:
+        rows = db.session.execute(
+            select(_profiles.c.id, _profiles.c.content, _profiles.c.updated_at)
+            .where(_profiles.c.id > last_id)
+            .order_by(_profiles.c.id)
+            .limit(MIGRATION_BATCH)
+        ).all()
+        if not rows:
+            return count
+        last_id = rows[-1].id
+        values = batch_update(db.session.connection(), rows)
+        if values:
+            db.session.execute(update, values)
+        count += len(values)
+
+
+def _split(connection, rows):
+    # Rows whose sections are still in the column; the others were split already
+    moving = [row for row in rows if any(key in (row.content or {}) for key in RESUME_LIST_SECTIONS)]
+    for row in moving:
+        update_sections(connection, row.id, row.content)
+    # The column type drops the sections from the rewritten content
+    return [{"_id": row.id, "_content": row.content, "_updated_at": row.updated_at} for row in moving]
+
+
+def _merge(connection, rows):
+    ids = [row.id for row in rows]
+    split = set(connection.execute(select(_items.c.profile_id).where(_items.c.profile_id.in_(ids)).distinct()).scalars())
+    sections = load_sections(connection, split)
+    return [
+        {"_id": row.id, "_content": {**(row.content or {}), **sections[row.id]}, "_updated_at": row.updated_at}
+        for row in rows
+        if row.id in split
+    ]
+
+
+def sync_section_storage():
+    """Convert the database to or from section storage when RESUME_SECTION_STORAGE has changed"""
+    marker = db.session.get(DataMigration, STORAGE_MARKER)
+    try:
+        if RESUME_SECTION_STORAGE and marker is None:
+            count = _convert(_split)
+            db.session.add(DataMigration(name=STORAGE_MARKER))
+            db.session.commit()
+            print(f"[DB] Moved the sections of {count} resumes to resume_section_items")
+        elif not RESUME_SECTION_STORAGE and (
+            marker is not None or db.session.execute(select(_items.c.profile_id).limit(1)).first()
+        ):
+            count = _convert(_merge)
+            db.session.execute(delete(_items))
+            if marker is not None:
+                db.session.delete(marker)
+            db.session.commit()
+            print(f"[DB] Moved the sections of {count} resumes back into the content column")
+    except IntegrityError:
+        # Another worker converted the database at the same time
+        db.session.rollback()
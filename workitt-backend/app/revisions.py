@@ -0,0 +1,59 @@
+"""
+Document revisions: optimistic concurrency and no-op write elision.
+
+Profile and CoverLetter carry a `revision` counter that SQLAlchemy uses as the
+mapper's version column: every UPDATE is issued as
+"... WHERE id = ? AND revision = <revision loaded>" and bumps it, so a save
+racing another save fails with StaleDataError instead of silently
+overwriting it.
+
+Clients send the document's ETag (derived from the revision) back in If-Match;
+a mismatch means they edited a stale copy and the save is refused with 409.
+
+Each row also stores `content_hash`, the SHA-256 of its canonical JSON content
+(kept up to date by a mapper hook in app/models.py), so a save whose
+normalized content is unchanged can skip the UPDATE and the commit entirely.
+"""
+import hashlib
+import json
+from flask import request
+from sqlalchemy.orm.exc import StaleDataError
+from app.conditional import make_etag
+from app.extensions import db
+
+
+def content_hash(content):
+    """SHA-256 of the canonical JSON form of a content document"""
+    canonical = json.dumps(
+        content or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def stored_content_hash(document):
+    """The row's content hash (computed for rows saved before hashes were stored)"""
+    return document.content_hash or content_hash(document.content)
+
+
+def document_etag(kind, key, revision):
+    return make_etag(kind, key, revision)
+
+
+def if_match_failed(etag):
+    """True if the request has an If-Match header that does not match `etag`"""
+    return bool(request.if_match) and not request.if_match.contains(etag)
+
+
+def unchanged(document, **values):
+    """True if every given attribute already has the given value"""
+    return all(getattr(document, name) == value for name, value in values.items())
+
+
+def commit_revision():
+    """Commit; False (after rolling back) if another request updated the row first"""
+    try:
+        db.session.commit()
+        return True
+    except StaleDataError:
+        db.session.rollback()
+        return False
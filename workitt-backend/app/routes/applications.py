@@ -0,0 +1,365 @@
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import contains_eager
+from app.models import Application, CoverLetter, Profile, generate_uuid
+from app.extensions import db
+from app.application_events import application_events, applications_created, applications_deleted, statuses_changed
+from app.conditional import conditional_get, list_version, make_etag
+from app.pagination import ListArgumentError, keyset_page, parse_cursor, parse_limit
+from app.search import index_created, unindex_deleted
+from app.subscription_limits import check_limit, require_subscription_limit
+from app.uploads import has_signature, spooled_path
+from utils.application_import import XLSX_SIGNATURE, ImportFormatError, read_applications
+from utils.application_validation import APPLICATION_STATUSES, validate_application_data, ValidationError
+
+bp = Blueprint('applications', __name__)
+
+MAX_BULK_IDS = 500  # applications per bulk status update or delete
+MAX_IMPORT_ROWS = 10000  # rows per spreadsheet import
+IMPORT_BATCH = 500  # rows per INSERT batch when importing
+MAX_REPORTED_ERRORS = 200  # invalid rows listed in an import's error report
+
+# Fields a client can set, in the order they are returned
+APPLICATION_FIELDS = ("job_title", "company", "job_link", "summary", "status", "profile_id", "cover_letter_id")
+
+
+def _application_entry(application):
+    """An application with summaries of its linked resume and cover letter (loaded by the same query)"""
+    profile = application.profile
+    cover_letter = application.cover_letter
+    return {
+        "app_id": application.app_id,
+        **{field: getattr(application, field) for field in APPLICATION_FIELDS},
+        "created_at": application.created_at,
+        "updated_at": application.updated_at,
+        "resume": {
+            "resume_id": profile.id,
+            "title": f"{profile.first_name} {profile.last_name} - {profile.job_sector}"
+            if profile.first_name and profile.last_name else profile.job_sector or "Resume title",
+        } if profile else None,
+        "cover_letter": {"cover_id": cover_letter.cover_id, "title": cover_letter.title} if cover_letter else None,
+    }
+
+
+def _application_query():
+    """
+    The user's applications, joined to the linked resume and cover letter
+    with only their summary columns (never their content)
+    """
+    return (
+        Application.query.filter(Application.user_id == current_user.id)
+        .outerjoin(Application.profile)
+        .outerjoin(Application.cover_letter)
+        .options(
+            contains_eager(Application.profile).load_only(
+                Profile.id, Profile.first_name, Profile.last_name, Profile.job_sector, Profile.revision
+            ),
+            contains_eager(Application.cover_letter).load_only(
+                CoverLetter.cover_id, CoverLetter.title, CoverLetter.revision
+            ),
+        )
+    )
+
+
+def _linked_documents_error(data):
+    """Error response if the application links a resume or cover letter the user does not own"""
+    if data.get("profile_id") and not Profile.query.filter_by(
+        id=data["profile_id"], user_id=current_user.id
+    ).count():
+        return jsonify({"error": "Resume not found"}), 404
+    if data.get("cover_letter_id") and not CoverLetter.query.filter_by(
+        cover_id=data["cover_letter_id"], user_id=current_user.id
+    ).count():
+        return jsonify({"error": "Cover letter not found"}), 404
+    return None
+
+
+@bp.route("/api/applications", methods=["GET"])
+@login_required
+def list_applications():
+    """
+    List applications, newest first.
+
+    Query args: status (comma separated), company (case-insensitive
+    substring), limit and cursor (from the previous page's next_cursor).
+    `total` counts the applications matching the filters, across all pages.
+    """
+    try:
+        limit = parse_limit()
+        after = parse_cursor()
+    except ListArgumentError as e:
+        return jsonify({"error": str(e)}), 400
+    statuses = [s.strip() for s in request.args.get("status", "").split(",") if s.strip()]
+    unknown = [s for s in statuses if s not in APPLICATION_STATUSES]
+    if unknown:
+        return jsonify({"error": f"Unknown status: {', '.join(unknown)}"}), 400
+    company = (request.args.get("company") or "").strip()
+
+    # Renaming or deleting a linked resume or cover letter changes the summaries in the list too
+    total, newest = list_version(Application, Application.updated_at, current_user.id)
+    etag = make_etag(
+        "applications", current_user.id, total, newest,
+        *list_version(Profile, Profile.updated_at, current_user.id),
+        *list_version(CoverLetter, CoverLetter.updated_at, current_user.id),
+        request.query_string.decode(),
+    )
+
+    filters = []
+    if statuses:
+        filters.append(Application.status.in_(statuses))
+    if company:
+        pattern = "%" + company.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        filters.append(func.lower(Application.company).like(pattern, escape="\\"))
+
+    def build():
+        query = _application_query().filter(*filters)
+        applications, next_cursor = keyset_page(query, Application.updated_at, Application.app_id, limit, after)
+        return jsonify({
+            "applications": [_application_entry(a) for a in applications],
+            # Applications matching the filters, over all pages
+            "total": Application.query.filter(Application.user_id == current_user.id, *filters).count()
+            if filters else total,
+            "next_cursor": next_cursor,
+        })
+
+    return conditional_get(etag, None, build)
+
+
+@bp.route("/api/applications", methods=["POST"])
+@login_required
+@require_subscription_limit("applications")
+def create_application():
+    """Create a new application - subscription limit enforced by decorator"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    try:
+        validated_data = validate_application_data(data)
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "details": err.messages}), 400
+    error_response = _linked_documents_error(validated_data)
+    if error_response:
+        return error_response
+
+    application = Application(user_id=current_user.id, **validated_data)
+    db.session.add(application)
+    db.session.commit()
+    application = _application_query().filter(Application.app_id == application.app_id).one()
+    return jsonify({"success": True, "application": _application_entry(application)}), 201
+
+
+@bp.route("/api/applications/<app_id>", methods=["GET", "PUT", "DELETE"])
+@login_required
+def api_application_detail(app_id):
+    """Get, update (fields not sent keep their values) or delete an application"""
+    application = _application_query().filter(Application.app_id == app_id).first()
+    if not application:
+        return jsonify({"error": "Application not found"}), 404
+
+    if request.method == "GET":
+        return jsonify({"application": _application_entry(application)})
+
+    if request.method == "DELETE":
+        db.session.delete(application)
+        db.session.commit()
+        return jsonify({"success": True, "message": "Application deleted"})
+
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    current = {
+        field: getattr(application, field) for field in APPLICATION_FIELDS if getattr(application, field) is not None
+    }
+    try:
+        validated_data = validate_application_data({**current, **data})
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "details": err.messages}), 400
+    error_response = _linked_documents_error(
+        {key: value for key, value in validated_data.items() if value != current.get(key)}
+    )
+    if error_response:
+        return error_response
+
+    for field, value in validated_data.items():
+        setattr(application, field, value)
+    db.session.commit()
+    application = _application_query().filter(Application.app_id == app_id).one()
+    return jsonify({"success": True, "application": _application_entry(application)})
+
+
+@bp.route("/api/applications/<app_id>/events", methods=["GET"])
+@login_required
+def api_application_events(app_id):
+    """The status changes of an application, oldest first (the first one records its creation)"""
+    if not Application.query.filter_by(app_id=app_id, user_id=current_user.id).count():
+        return jsonify({"error": "Application not found"}), 404
+    return jsonify({
+        "events": [
+            {"from_status": event.from_status, "to_status": event.to_status, "created_at": event.created_at}
+            for event in application_events(app_id)
+        ]
+    })
+
+
+def _bulk_ids():
+    """(request body, unique app_ids, error response) for a bulk request"""
+    data = request.get_json(silent=True) or {}
+    app_ids = data.get("app_ids")
+    if not isinstance(app_ids, list) or not app_ids or not all(isinstance(i, str) for i in app_ids):
+        return data, None, (jsonify({"error": "app_ids must be a non-empty list of application ids"}), 400)
+    if len(app_ids) > MAX_BULK_IDS:
+        return data, None, (jsonify({"error": f"At most {MAX_BULK_IDS} applications at once"}), 400)
+    return data, list(dict.fromkeys(app_ids)), None
+
+
+@bp.route("/api/applications/bulk/status", methods=["POST"])
+@login_required
+def bulk_update_status():
+    """Set the status of several applications with one UPDATE. Body: {"app_ids": [...], "status": ...}"""
+    data, app_ids, error_response = _bulk_ids()
+    if error_response:
+        return error_response
+    status = data.get("status")
+    if status not in APPLICATION_STATUSES:
+        return jsonify({"error": f"status must be one of {', '.join(APPLICATION_STATUSES)}"}), 400
+
+    changing = (
+        (Application.user_id == current_user.id) & Application.app_id.in_(app_ids) & (Application.status != status)
+    )
+    changes = db.session.execute(select(Application.app_id, Application.status).where(changing)).all()
+    if changes:
+        # Status is not indexed for search; the flush hooks it skips only record the status events
+        db.session.execute(
+            update(Application)
+            .where(changing)
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        statuses_changed(db.session.connection(), current_user.id, changes, status)
+    db.session.commit()
+    return jsonify({"success": True, "updated": len(changes)})
+
+
+@bp.route("/api/applications/bulk/delete", methods=["POST"])
+@login_required
+def bulk_delete():
+    """Delete several applications with one DELETE. Body: {"app_ids": [...]}"""
+    _, app_ids, error_response = _bulk_ids()
+    if error_response:
+        return error_response
+
+    owned = db.session.execute(
+        select(Application.app_id, Application.user_id, Application.status, Application.created_at).where(
+            (Application.user_id == current_user.id) & Application.app_id.in_(app_ids)
+        )
+    ).all()
+    if owned:
+        # Bulk deletes skip the flush hooks, so the search entries and status events are removed here
+        connection = db.session.connection()
+        unindex_deleted(connection, Application, [row.app_id for row in owned])
+        applications_deleted(connection, [tuple(row) for row in owned])
+        db.session.execute(
+            delete(Application)
+            .where((Application.user_id == current_user.id) & Application.app_id.in_([row.app_id for row in owned]))
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return jsonify({"success": True, "deleted": len(owned)})
+
+
+def _import_rows(path, filename):
+    """(row number, application fields or None, errors or None) for every row of an import"""
+    for number, data, errors in read_applications(path, filename):
+        applied_at = data.pop("applied_at", None)
+        try:
+            validated_data = validate_application_data(data)
+        except ValidationError as err:
+            yield number, None, {**err.messages, **(errors or {})}
+            continue
+        if errors:
+            yield number, None, errors
+            continue
+        if applied_at:
+            validated_data["created_at"] = applied_at
+        yield number, validated_data, None
+
+
+@bp.route("/api/applications/import", methods=["POST"])
+@login_required
+def import_applications():
+    """
+    Import applications from an uploaded spreadsheet ("file": .csv or .xlsx).
+
+    The file is read as a stream twice: once to validate every row and count
+    the valid ones, so the subscription limit is checked once for the whole
+    import, and once to insert the rows, IMPORT_BATCH at a time, in a single
+    transaction. Invalid rows are skipped and reported by row number (the
+    first MAX_REPORTED_ERRORS of them). The upload is capped by
+    MAX_CONTENT_LENGTH (32MB).
+    """
+    file = request.files.get("file")
+    if not file or not file.filename:
+        return jsonify({"error": "No file uploaded"}), 400
+    filename = file.filename
+    if filename.lower().endswith(".xlsx") and not has_signature(file, XLSX_SIGNATURE):
+        return jsonify({"error": "Not an XLSX file"}), 400
+    path = spooled_path(file)
+
+    valid = 0
+    rows = 0
+    errors = []
+    error_count = 0
+    try:
+        for number, data, row_errors in _import_rows(path, filename):
+            rows += 1
+            if rows > MAX_IMPORT_ROWS:
+                return jsonify({"error": f"At most {MAX_IMPORT_ROWS} applications can be imported at once"}), 400
+            if row_errors:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": number, "errors": row_errors})
+            else:
+                valid += 1
+    except ImportFormatError as e:
+        return jsonify({"error": str(e)}), 400
+
+    report = {"imported": 0, "skipped": error_count, "errors": errors}
+    if not valid:
+        return jsonify({"error": "No valid rows to import", **report}), 400
+    can_create, error_response = check_limit("applications", requested=valid)
+    if not can_create:
+        return error_response
+
+    now = datetime.utcnow()
+    connection = db.session.connection()
+
+    def flush(batch):
+        # Bulk inserts skip the flush hooks, so the search entries and status events are written here
+        db.session.execute(insert(Application), batch)
+        index_created(connection, Application, [Application(**row) for row in batch])
+        applications_created(
+            connection,
+            [(row["app_id"], row["user_id"], row.get("status") or "applied", row["created_at"]) for row in batch],
+        )
+
+    batch = []
+    for _, data, _ in _import_rows(path, filename):
+        if data is None:
+            continue
+        batch.append({
+            "app_id": generate_uuid(),
+            "user_id": current_user.id,
+            "created_at": now,
+            **data,
+            "updated_at": now,
+        })
+        if len(batch) >= IMPORT_BATCH:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    db.session.commit()
+
+    return jsonify({"success": True, **report, "imported": valid}), 201
@@ -1,29 +1,59 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_login import login_required, current_user
+import os
 import yaml
-from app.models import CoverLetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from sqlalchemy.orm import load_only, undefer
+from app.models import CoverLetter, Profile
 from app.extensions import db
-from app.subscription_limits import require_subscription_limit
+from app.conditional import conditional_get, list_version, make_etag
+from app.revisions import commit_revision, content_hash, document_etag, if_match_failed, stored_content_hash
+from app.json_provider import STREAM_BATCH, STREAM_LIST_THRESHOLD, dump_json_bytes, stream_json
+from app.history import list_revisions, load_revision
+from app.persona import format_persona, persona_yaml, resume_persona_yaml
+from app.render_cache import pdf_response
+from app.subscription_limits import check_limit, require_subscription_limit
 from utils.cover_letter_validation import validate_cover_letter_data, ValidationError
 from utils.ai_providers import ProviderFactory
+from utils.pdf_render import PdfRenderError
 from utils.prompts import COVER_LETTER_PROMPT, REWRITE_PROMPT, SHORTEN_PROMPT
 
 bp = Blueprint('cover_letter', __name__)
 
+BATCH_MAX_JOBS = 20  # job postings per batch generation request
+# Generations of a batch that run at the same time
+BATCH_CONCURRENCY = int(os.environ.get("COVER_LETTER_BATCH_CONCURRENCY", 4))
+
+def _cover_letter_list_entry(cl):
+    return {
+        "cover_id": cl.cover_id,
+        "title": cl.title,
+        "created_at": cl.created_at,
+        "updated_at": cl.updated_at,
+        "content": cl.content
+    }
+
 @bp.route("/api/cover-letters", methods=["GET"])
 @login_required
 def list_cover_letters():
     """List all cover letters"""
-    cover_letters = CoverLetter.query.filter_by(user_id=current_user.id).order_by(CoverLetter.updated_at.desc()).all()
-    return jsonify({
-        "cover_letters": [{
-            "cover_id": cl.cover_id,
-            "title": cl.title,
-            "created_at": cl.created_at.isoformat() if cl.created_at else None,
-            "updated_at": cl.updated_at.isoformat() if cl.updated_at else None,
-            "content": cl.content
-        } for cl in cover_letters]
-    })
+    total, newest = list_version(CoverLetter, CoverLetter.updated_at, current_user.id)
+
+    def build():
+        query = (
+            CoverLetter.query.filter_by(user_id=current_user.id)
+            .options(undefer(CoverLetter.content))
+            .order_by(CoverLetter.updated_at.desc())
+        )
+        if total > STREAM_LIST_THRESHOLD:
+            # Written out row by row instead of building the whole list in memory
+            return stream_json(
+                {}, "cover_letters", (_cover_letter_list_entry(cl) for cl in query.yield_per(STREAM_BATCH))
+            )
+        return jsonify({"cover_letters": [_cover_letter_list_entry(cl) for cl in query]})
+
+    return conditional_get(make_etag("cover_letters", current_user.id, total, newest), None, build)
 
 @bp.route("/api/cover-letters", methods=["POST"])
 @login_required
@@ -52,8 +82,8 @@ def create_cover_letter():
             "cover_letter": {
                 "cover_id": cover_letter.cover_id,
                 "title": cover_letter.title,
-                "created_at": cover_letter.created_at.isoformat() if cover_letter.created_at else None,
-                "updated_at": cover_letter.updated_at.isoformat() if cover_letter.updated_at else None,
+                "created_at": cover_letter.created_at,
+                "updated_at": cover_letter.updated_at,
                 "content": cover_letter.content
             }
         }), 201
@@ -64,10 +94,56 @@ def create_cover_letter():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+def _cover_letter_detail_response(cover_letter):
+    return jsonify({
+        "cover_letter": {
+            "cover_id": cover_letter.cover_id,
+            "title": cover_letter.title,
+            "created_at": cover_letter.created_at,
+            "updated_at": cover_letter.updated_at,
+            "content": cover_letter.content,
+            "template_name": cover_letter.c_template_name
+        }
+    })
+
+def _cover_letter_saved_response(cover_letter):
+    response = jsonify({
+        "success": True,
+        "cover_letter": {
+            "cover_id": cover_letter.cover_id,
+            "title": cover_letter.title,
+            "updated_at": cover_letter.updated_at,
+            "revision": cover_letter.revision
+        }
+    })
+    response.set_etag(document_etag("cover_letter", cover_letter.cover_id, cover_letter.revision))
+    return response
+
+def _cover_letter_conflict(cover_letter):
+    return jsonify({
+        "error": "This cover letter was changed in another session. Reload it to get the latest version.",
+        "revision": cover_letter.revision
+    }), 409
+
 @bp.route("/api/cover-letters/<cover_id>", methods=["GET", "PUT", "DELETE"])
 @login_required
 def api_cover_letter_detail(cover_id):
     """Get, update, or delete a specific cover letter"""
+    if request.method == "GET":
+        # Check the client's cached copy against the revision before loading content
+        row = db.session.query(CoverLetter.revision, CoverLetter.updated_at).filter_by(
+            cover_id=cover_id, user_id=current_user.id
+        ).first()
+        if not row:
+            return jsonify({"error": "Cover letter not found"}), 404
+        return conditional_get(
+            document_etag("cover_letter", cover_id, row.revision),
+            row.updated_at,
+            lambda: _cover_letter_detail_response(
+                CoverLetter.query.filter_by(cover_id=cover_id, user_id=current_user.id).first_or_404()
+            )
+        )
+
     cover_letter = CoverLetter.query.filter_by(
         cover_id=cover_id, user_id=current_user.id
     ).first()
@@ -75,50 +151,142 @@ def api_cover_letter_detail(cover_id):
     if not cover_letter:
         return jsonify({"error": "Cover letter not found"}), 404
     
-    if request.method == "GET":
-        return jsonify({
-            "cover_letter": {
-                "cover_id": cover_letter.cover_id,
-                "title": cover_letter.title,
-                "created_at": cover_letter.created_at.isoformat() if cover_letter.created_at else None,
-                "updated_at": cover_letter.updated_at.isoformat() if cover_letter.updated_at else None,
-                "content": cover_letter.content,
-                "template_name": cover_letter.c_template_name
-            }
-        })
-    
-    elif request.method == "PUT":
+    if request.method == "PUT":
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
         
+        # Refuse saves made against an older revision (e.g. another tab saved first)
+        if if_match_failed(document_etag("cover_letter", cover_letter.cover_id, cover_letter.revision)):
+            return _cover_letter_conflict(cover_letter)
+        
         try:
             # Validate data
             validated_data = validate_cover_letter_data(data)
-            
-            cover_letter.title = validated_data["title"]
-            cover_letter.content = validated_data
-            cover_letter.c_template_name = validated_data.get("templateId", cover_letter.c_template_name)
-            
-            db.session.commit()
-            
-            return jsonify({
-                "success": True,
-                "cover_letter": {
-                    "cover_id": cover_letter.cover_id,
-                    "title": cover_letter.title,
-                    "updated_at": cover_letter.updated_at.isoformat()
-                }
-            })
-            
         except ValidationError as err:
             return jsonify({"error": "Validation error", "details": err.messages}), 400
+        
+        # Skip the write entirely when the normalized content is unchanged
+        # (title and template are derived from it)
+        if content_hash(validated_data) == stored_content_hash(cover_letter):
+            return _cover_letter_saved_response(cover_letter)
+        
+        cover_letter.title = validated_data["title"]
+        cover_letter.content = validated_data
+        cover_letter.c_template_name = validated_data.get("templateId", cover_letter.c_template_name)
+        
+        if not commit_revision():
+            return _cover_letter_conflict(cover_letter)
+        
+        return _cover_letter_saved_response(cover_letter)
     
     elif request.method == "DELETE":
         db.session.delete(cover_letter)
         db.session.commit()
         return jsonify({"success": True, "message": "Cover letter deleted"})
 
+@bp.route("/api/cover-letters/<cover_id>/revisions", methods=["GET"])
+@login_required
+def list_cover_letter_revisions(cover_id):
+    """Stored revisions of a cover letter, newest first (older ones are thinned out over time)"""
+    row = db.session.query(CoverLetter.revision).filter_by(
+        cover_id=cover_id, user_id=current_user.id
+    ).first()
+    if not row:
+        return jsonify({"error": "Cover letter not found"}), 404
+    return jsonify({
+        "success": True,
+        "current_revision": row.revision,
+        "revisions": [
+            {
+                "revision": entry.revision,
+                "created_at": entry.created_at,
+                "size": entry.size,
+                "snapshot": entry.kind == "snapshot"
+            }
+            for entry in list_revisions("cover_letter", cover_id)
+        ]
+    })
+
+@bp.route("/api/cover-letters/<cover_id>/revisions/<int:revision>", methods=["GET"])
+@login_required
+def get_cover_letter_revision(cover_id, revision):
+    """Content of a stored revision of a cover letter"""
+    if not CoverLetter.query.filter_by(cover_id=cover_id, user_id=current_user.id).count():
+        return jsonify({"error": "Cover letter not found"}), 404
+    content = load_revision("cover_letter", cover_id, revision)
+    if content is None:
+        return jsonify({"error": "Revision not found"}), 404
+    return jsonify({"success": True, "revision": revision, "content": content})
+
+@bp.route("/api/cover-letters/<cover_id>/revisions/<int:revision>/restore", methods=["POST"])
+@login_required
+def restore_cover_letter_revision(cover_id, revision):
+    """Make a stored revision the current content (saved as a new revision)"""
+    cover_letter = CoverLetter.query.filter_by(
+        cover_id=cover_id, user_id=current_user.id
+    ).first()
+    if not cover_letter:
+        return jsonify({"error": "Cover letter not found"}), 404
+
+    if if_match_failed(document_etag("cover_letter", cover_letter.cover_id, cover_letter.revision)):
+        return _cover_letter_conflict(cover_letter)
+
+    content = load_revision("cover_letter", cover_id, revision)
+    if content is None:
+        return jsonify({"error": "Revision not found"}), 404
+    try:
+        validated_data = validate_cover_letter_data(content)
+    except ValidationError as err:
+        return jsonify({"error": "Revision no longer passes validation", "details": err.messages}), 400
+
+    if content_hash(validated_data) == stored_content_hash(cover_letter):
+        return _cover_letter_saved_response(cover_letter)
+
+    cover_letter.title = validated_data["title"]
+    cover_letter.content = validated_data
+    cover_letter.c_template_name = validated_data.get("templateId", cover_letter.c_template_name)
+
+    if not commit_revision():
+        return _cover_letter_conflict(cover_letter)
+
+    return _cover_letter_saved_response(cover_letter)
+
+@bp.route("/api/cover-letters/<cover_id>/pdf", methods=["GET"])
+@login_required
+def download_cover_letter_pdf(cover_id):
+    """Download the cover letter as a PDF rendered on the server (cached until the content changes)"""
+    row = db.session.query(CoverLetter.content_hash, CoverLetter.title).filter_by(
+        cover_id=cover_id, user_id=current_user.id
+    ).first()
+    if not row:
+        return jsonify({"error": "Cover letter not found"}), 404
+
+    def load_content():
+        return db.session.query(CoverLetter.content).filter_by(cover_id=cover_id).scalar()
+
+    # Rows saved before content hashes were stored need their content hashed once
+    digest = row.content_hash or content_hash(load_content())
+    filename = "".join(c if c.isalnum() or c in "-_" else "_" for c in (row.title or "cover_letter")).strip("_")
+    try:
+        return pdf_response(
+            "cover_letter", digest, load_content, f"{filename or 'cover_letter'}.pdf", date.today().isoformat()
+        )
+    except PdfRenderError as e:
+        print(f"[COVER LETTER PDF] Render failed for {cover_id}: {e}")
+        return jsonify({"error": "Could not generate the PDF. Please try again."}), 503
+
+def _persona_profile(profile_id):
+    """The user's resume with the columns the persona needs (content loads on access)"""
+    return (
+        Profile.query.options(load_only(
+            Profile.id, Profile.user_id, Profile.revision, Profile.first_name, Profile.last_name,
+            Profile.profile_email, Profile.phone, Profile.address,
+        ))
+        .filter_by(id=profile_id, user_id=current_user.id)
+        .first()
+    )
+
 @bp.route("/api/cover_letter", methods=["POST"])
 @login_required
 def summarize_and_generate():
@@ -135,17 +303,11 @@ def summarize_and_generate():
     resume_text = data.get("resume_text", "").strip()
     ai_prompt = data.get("ai_prompt", "").strip()
 
-    # Extract persona-specific fields (default empty string)
+    # Persona: built from the stored resume when a profile_id is given (the
+    # client needs to send nothing else), otherwise from the posted fields
     profile_id = data.get("profile_id", "").strip()
     first_name = data.get("first_name", "").strip()
     last_name = data.get("last_name", "").strip()
-    profile_email = data.get("profile_email", "").strip()
-    phone = data.get("phone", "").strip()
-    address = data.get("address", "").strip()
-    work_experience = data.get("work_experience", [])
-    skills = data.get("skills", [])
-    certifications = data.get("certifications", [])
-    custom_content = data.get("custom_content", [])
 
     # Safety check: at least one input must be present
     if not any(
@@ -163,6 +325,24 @@ def summarize_and_generate():
     ):
         return jsonify({"error": "Missing input"}), 400
 
+    if profile_id:
+        profile = _persona_profile(profile_id)
+        if not profile:
+            return jsonify({"error": "Profile not found"}), 404
+        persona = resume_persona_yaml(profile)
+    else:
+        persona = persona_yaml(format_persona(
+            first_name=first_name,
+            last_name=last_name,
+            email=data.get("profile_email", "").strip(),
+            phone=data.get("phone", "").strip(),
+            address=data.get("address", "").strip(),
+            work_experience=data.get("work_experience", []),
+            skills=data.get("skills", []),
+            certifications=data.get("certifications", []),
+            custom_content=data.get("custom_content", []),
+        ))
+
     # Build payload for AI (only non-empty fields)
     payload_dict = {}
 
@@ -186,87 +366,7 @@ def summarize_and_generate():
     if ai_prompt:
         payload_dict["ai_prompt"] = ai_prompt
 
-    # Persona-specific fields (only include if we have persona data)
-    if profile_id or first_name or last_name:
-        persona_dict = {}
-
-        if first_name:
-            persona_dict["first_name"] = first_name
-        if last_name:
-            persona_dict["last_name"] = last_name
-        if profile_email:
-            persona_dict["email"] = profile_email
-        if phone:
-            persona_dict["phone"] = phone
-        if address:
-            persona_dict["address"] = address
-
-        # Work experience - only include if there are entries with actual data
-        if work_experience:
-            formatted_we = []
-            for we in work_experience:
-                if we.get("title") or we.get("company") or we.get("description"):
-                    we_entry = {}
-                    if we.get("title"):
-                        we_entry["title"] = we["title"]
-                    if we.get("company"):
-                        we_entry["company"] = we["company"]
-                    if we.get("location"):
-                        we_entry["location"] = we["location"]
-                    if we.get("start_date"):
-                        we_entry["start_date"] = we["start_date"]
-                    if we.get("end_date"):
-                        we_entry["end_date"] = we["end_date"]
-                    if we.get("description"):
-                        we_entry["description"] = we["description"]
-                    formatted_we.append(we_entry)
-
-            if formatted_we:
-                persona_dict["work_experience"] = formatted_we
-
-        # Skills - only include if there are entries with names
-        if skills:
-            formatted_skills = []
-            for skill in skills:
-                if skill.get("name"):
-                    skill_entry = {"name": skill["name"]}
-                    if skill.get("level"):
-                        skill_entry["level"] = skill["level"]
-                    formatted_skills.append(skill_entry)
-
-            if formatted_skills:
-                persona_dict["skills"] = formatted_skills
-
-        # Certifications - only include if there are entries with names
-        if certifications:
-            formatted_certs = []
-            for cert in certifications:
-                if cert.get("name"):
-                    cert_entry = {"name": cert["name"]}
-                    if cert.get("authority"):
-                        cert_entry["authority"] = cert["authority"]
-                    formatted_certs.append(cert_entry)
-
-            if formatted_certs:
-                persona_dict["certifications"] = formatted_certs
-
-        # Custom content - only include if there are entries with both title and details
-        if custom_content:
-            formatted_content = []
-            for content in custom_content:
-                if content.get("title") and content.get("details"):
-                    formatted_content.append(
-                        {"title": content["title"], "details": content["details"]}
-                    )
-
-            if formatted_content:
-                persona_dict["custom_content"] = formatted_content
-
-        # Only add persona section if we have any persona data
-        if persona_dict:
-            payload_dict["persona"] = persona_dict
-
-    user_payload = yaml.dump(payload_dict)
+    user_payload = (yaml.dump(payload_dict) if payload_dict else "") + persona
 
     # Detect operation type and select appropriate prompt
     instruction = data.get("instruction", "").strip()
@@ -287,16 +387,150 @@ def summarize_and_generate():
         selected_prompt, user_payload, max_tokens=6400, parse_yaml=False
     )
 
+    cover_letter_text = _generated_text(result)
+
+    if not cover_letter_text:
+        return jsonify({"error": "AI did not generate a response"}), 500
+
+    return jsonify({"body": cover_letter_text})
+
+def _generated_text(result):
     # Fix: Check for both 'text' and 'raw' keys
     cover_letter_text = ""
     if isinstance(result, dict):
         cover_letter_text = result.get("text", "") or result.get("raw", "")
     elif isinstance(result, str):
         cover_letter_text = result
+    return (cover_letter_text or "").strip()
 
-    cover_letter_text = cover_letter_text.strip()
+def _batch_job(job, ai_prompt):
+    """(prompt fields, cover letter metadata) for one job posting of a batch"""
+    job_description = (job.get("job_description") or "").strip()
+    company = (job.get("company") or "").strip()
+    job_title = (job.get("job_title") or "").strip()
+    fields = {"job_description": job_description, "company": company, "job_title": job_title, "ai_prompt": ai_prompt}
+    metadata = {
+        "title": " - ".join(part for part in (job_title, company) if part) or "Cover letter",
+        "company": company,
+        "jobTitle": job_title,
+        "jobDescription": job_description,
+        "aiPrompt": ai_prompt,
+    }
+    return {key: value for key, value in fields.items() if value}, metadata
 
-    if not cover_letter_text:
-        return jsonify({"error": "AI did not generate a response"}), 500
+@bp.route("/api/cover_letter/batch", methods=["POST"])
+@login_required
+def generate_batch():
+    """
+    Generate cover letters for several job postings from one resume.
 
-    return jsonify({"body": cover_letter_text})
+    Body: {"profile_id", "jobs": [{"job_description", "company", "job_title"}],
+    "ai_prompt" (optional, applies to every job), "save" (optional)}.
+
+    The persona is built once for the whole batch and the letters are
+    generated BATCH_CONCURRENCY at a time. The response is NDJSON: one
+    {"index", "body"} (or {"index", "error"}) line per job as soon as its
+    letter is ready, then {"done": true, "saved": [...]}. With "save" the
+    subscription limit is checked once for the whole batch up front and the
+    generated letters are saved as cover letters in one commit at the end.
+    """
+    data = request.get_json(silent=True) or {}
+    profile_id = (data.get("profile_id") or "").strip()
+    jobs = data.get("jobs")
+    ai_prompt = (data.get("ai_prompt") or "").strip()
+    save = bool(data.get("save"))
+    if not profile_id:
+        return jsonify({"error": "profile_id is required"}), 400
+    if not isinstance(jobs, list) or not jobs or not all(isinstance(job, dict) for job in jobs):
+        return jsonify({"error": "jobs must be a non-empty list of job postings"}), 400
+    if len(jobs) > BATCH_MAX_JOBS:
+        return jsonify({"error": f"At most {BATCH_MAX_JOBS} cover letters can be generated at once"}), 400
+
+    profile = _persona_profile(profile_id)
+    if not profile:
+        return jsonify({"error": "Profile not found"}), 404
+
+    postings = [_batch_job(job, ai_prompt) for job in jobs]
+    errors = {}
+    for index, (fields, metadata) in enumerate(postings):
+        if not fields.get("job_description") and not fields.get("job_title") and not fields.get("company"):
+            errors[index] = "Missing input"
+            continue
+        try:
+            validate_cover_letter_data({**metadata, "contact": {}, "visibility": {}, "style": {}})
+        except ValidationError as err:
+            errors[index] = err.messages
+    if errors:
+        return jsonify({"error": "Validation failed", "details": errors}), 400
+
+    if save:
+        can_create, error_response = check_limit("cover_letters", requested=len(jobs))
+        if not can_create:
+            return error_response
+
+    # Encoded once and shared by every generation in the batch
+    persona = resume_persona_yaml(profile)
+    contact = {
+        "name": " ".join(part for part in (profile.first_name, profile.last_name) if part),
+        "email": profile.profile_email or "",
+        "phone": profile.phone or "",
+        "address": profile.address or "",
+    }
+    template_id = data.get("templateId") or "default"
+    provider = ProviderFactory.get_provider()
+
+    def generate(fields):
+        result = provider.call_model(
+            COVER_LETTER_PROMPT, yaml.dump(fields) + persona, max_tokens=6400, parse_yaml=False
+        )
+        return _generated_text(result)
+
+    def stream():
+        executor = ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, len(postings)))
+        generated = {}
+        try:
+            futures = {executor.submit(generate, fields): index for index, (fields, _) in enumerate(postings)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"[COVER LETTER BATCH] Generation {index} failed: {e}")
+                    text = ""
+                if text:
+                    generated[index] = text
+                    yield dump_json_bytes({"index": index, "body": text}) + b"\n"
+                else:
+                    yield dump_json_bytes({"index": index, "error": "AI did not generate a response"}) + b"\n"
+        finally:
+            # Stops the queued generations if the client went away
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        saved = []
+        if save and generated:
+            cover_letters = []
+            for index in sorted(generated):
+                content = {
+                    **postings[index][1], "body": generated[index], "contact": contact, "visibility": {}, "style": {},
+                    "templateId": template_id,
+                }
+                try:
+                    content = validate_cover_letter_data(content)
+                except ValidationError as err:
+                    yield dump_json_bytes({"index": index, "error": "Not saved", "details": err.messages}) + b"\n"
+                    continue
+                cover_letter = CoverLetter(
+                    title=content["title"],
+                    content=content,
+                    user_id=current_user.id,
+                    c_template_name=content.get("templateId", "default"),
+                )
+                cover_letters.append((index, cover_letter))
+            db.session.add_all([cover_letter for _, cover_letter in cover_letters])
+            db.session.commit()
+            saved = [{"index": index, "cover_id": cover_letter.cover_id} for index, cover_letter in cover_letters]
+        yield dump_json_bytes({"done": True, "saved": saved}) + b"\n"
+
+    response = Response(stream_with_context(stream()), mimetype="application/x-ndjson")
+    response.headers["Cache-Control"] = "no-store"
+    return response
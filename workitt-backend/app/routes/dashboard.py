@@ -1,87 +1,55 @@
 from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
-from datetime import datetime, timezone, timedelta
-from app.models import Application
+from datetime import datetime, timezone
+from app.models import Application, Profile
+from app.application_events import month_counts, status_counts
+from app.conditional import conditional_get, list_version, make_etag
+from app.resume_facts import most_recent_position, top_skills
+from utils.application_validation import APPLICATION_STATUSES
 
 bp = Blueprint('dashboard', __name__)
 
 @bp.route("/api/dashboard", methods=["GET"])
 @login_required
 def api_dashboard():
-    # Calculate 6 months data
-    six_months_ago = datetime.now(timezone.utc) - timedelta(days=180)
-    apps_last_6_months = Application.query.filter(
-        Application.user_id == current_user.id, Application.created_at >= six_months_ago
-    ).count()
+    # The stats depend on the user's applications, resumes and on the date; the rolling windows are revalidated daily
+    total, newest = list_version(Application, Application.updated_at, current_user.id)
+    resumes, newest_resume = list_version(Profile, Profile.updated_at, current_user.id)
+    etag = make_etag(
+        "dashboard", current_user.id, current_user.updated_at, total, newest, resumes, newest_resume,
+        datetime.now(timezone.utc).date(),
+    )
+    return conditional_get(etag, None, _dashboard_response)
+
+def _months_back(today, count):
+    """(year, month) of the `count` calendar months up to the current one, oldest first"""
+    months = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        months.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return list(reversed(months))
+
+def _dashboard_response():
+    # Counts come from the rollups kept by app/application_events.py: a few rows per user, however many applications
+    months = _months_back(datetime.now(timezone.utc), 6)
+    per_month = month_counts(current_user.id, "%04d-%02d" % months[0])
+    monthly_counts = [per_month.get("%04d-%02d" % month, 0) for month in months]
+    monthly_data = {
+        datetime(year, month, 1).strftime("%b"): count for (year, month), count in zip(months, monthly_counts)
+    }
 
     # Growth calculation (last 3 months vs prior 3 months)
-    three_months_ago = datetime.now(timezone.utc) - timedelta(days=90)
-    apps_last_3 = Application.query.filter(
-        Application.user_id == current_user.id,
-        Application.created_at >= three_months_ago,
-    ).count()
+    apps_last_6_months = sum(monthly_counts)
+    apps_last_3 = sum(monthly_counts[3:])
     apps_prev_3 = apps_last_6_months - apps_last_3
     growth = 0
     if apps_prev_3 > 0:
         growth = round(((apps_last_3 - apps_prev_3) / apps_prev_3) * 100, 1)
 
-    # Monthly data for the last 6 months
-    monthly_data = {}
-    monthly_counts = []
-    current_date = datetime.now(timezone.utc)
-
-    for i in range(6):
-        # Calculate the start and end of each month
-        if i == 0:
-            # Current month
-            month_start = current_date.replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
-            )
-            month_end = current_date
-        else:
-            # Previous months
-            month_date = current_date.replace(day=1) - timedelta(
-                days=i * 30
-            )  # Approximate
-            month_start = month_date.replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
-            )
-            # Get last day of the month
-            if month_date.month == 12:
-                next_month = month_date.replace(year=month_date.year + 1, month=1)
-            else:
-                next_month = month_date.replace(month=month_date.month + 1)
-            month_end = next_month - timedelta(days=1)
-            month_end = month_end.replace(hour=23, minute=59, second=59)
-
-        count = Application.query.filter(
-            Application.user_id == current_user.id,
-            Application.created_at >= month_start,
-            Application.created_at <= month_end,
-        ).count()
-
-        month_name = month_start.strftime("%b")
-        monthly_data[month_name] = count
-        monthly_counts.append(count)
-
-    # Reverse to show oldest to newest
-    monthly_data = dict(reversed(list(monthly_data.items())))
-    
     # Status counts
-    status_counts = {
-        "applied": Application.query.filter_by(
-            user_id=current_user.id, status="applied"
-        ).count(),
-        "interview": Application.query.filter_by(
-            user_id=current_user.id, status="interview"
-        ).count(),
-        "offer": Application.query.filter_by(
-            user_id=current_user.id, status="offer"
-        ).count(),
-        "rejected": Application.query.filter_by(
-            user_id=current_user.id, status="rejected"
-        ).count(),
-    }
+    counts = status_counts(current_user.id)
+    status_counts_data = {status: counts.get(status, 0) for status in APPLICATION_STATUSES}
     
     # Recent Applications
     recent_apps = (
@@ -110,8 +78,13 @@ def api_dashboard():
         "stats": {
             "total_6_months": apps_last_6_months,
             "growth": growth,
-            "status_counts": status_counts,
+            "status_counts": status_counts_data,
             "monthly_data": monthly_data
         },
+        # Read from the skill and experience tables kept alongside the resumes
+        "profile_insights": {
+            "top_skills": top_skills(current_user.id, limit=5),
+            "current_position": most_recent_position(current_user.id),
+        },
         "recent_applications": recent_apps_data
     })
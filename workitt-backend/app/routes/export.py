@@ -0,0 +1,75 @@
+from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context
+from flask_login import login_required, current_user
+from app.export import EXPORT_FORMATS, export_chunks, export_filename, job_path, start_export_job
+from app.models import ExportJob
+
+bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+def _export_format(default="zip"):
+    export_format = (request.args.get("format") or (request.get_json(silent=True) or {}).get("format") or default).lower()
+    return export_format if export_format in EXPORT_FORMATS else None
+
+def _job_response(job):
+    return {
+        "job_id": job.id,
+        "format": job.format,
+        "status": job.status,
+        "size": job.size,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+@bp.route("", methods=["GET"])
+@login_required
+def export_account():
+    """Stream an export of all of the user's data (format=zip or ndjson)"""
+    export_format = _export_format()
+    if not export_format:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    response = Response(
+        stream_with_context(export_chunks(current_user.id, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="{export_filename(export_format)}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+@bp.route("/jobs", methods=["POST"])
+@login_required
+def create_export_job():
+    """Build the export in the background (for very large accounts); poll the job, then download it"""
+    export_format = _export_format()
+    if not export_format:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    job = start_export_job(current_user.id, export_format)
+    return jsonify({"success": True, "job": _job_response(job)}), 202
+
+@bp.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+def get_export_job(job_id):
+    """Status of a background export"""
+    job = ExportJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if not job:
+        return jsonify({"error": "Export not found"}), 404
+    return jsonify({"success": True, "job": _job_response(job)})
+
+@bp.route("/jobs/<job_id>/download", methods=["GET"])
+@login_required
+def download_export_job(job_id):
+    """Download a finished background export"""
+    job = ExportJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if not job:
+        return jsonify({"error": "Export not found"}), 404
+    path = job_path(job)
+    if job.status != "done" or not path.exists():
+        return jsonify({"error": "Export is not ready", "status": job.status}), 409
+    response = send_file(
+        path,
+        mimetype=EXPORT_FORMATS[job.format],
+        as_attachment=True,
+        download_name=export_filename(job.format, job.finished_at),
+    )
+    response.headers["Cache-Control"] = "no-store"
+    return response
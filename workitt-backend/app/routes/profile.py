@@ -1,8 +1,13 @@
 from flask import Blueprint, jsonify, request
 from flask_login import login_required, current_user
 from datetime import datetime
+from sqlalchemy.orm import load_only
 from app.models import Profile
 from app.extensions import db
+from app.conditional import conditional_get, list_version, make_etag
+from app.revisions import commit_revision, content_hash, document_etag, if_match_failed, stored_content_hash, unchanged
+from app.pagination import ListArgumentError, keyset_page, parse_cursor, parse_fields, parse_limit
+from utils.resume_validation import normalize_resume_content
 
 bp = Blueprint('profile', __name__)
 
@@ -46,20 +51,58 @@ def manage_account():
             }
         })
 
+# Fields a profile list entry can include, and the Profile columns each one needs
+PROFILE_LIST_FIELDS = {
+    "id": ("id",),
+    "name": ("first_name", "last_name", "job_sector"),
+    "job_sector": ("job_sector",),
+    "first_name": ("first_name",),
+    "last_name": ("last_name",),
+    "updated_at": ("updated_at",),
+    "content": ("content",),
+}
+DEFAULT_PROFILE_LIST_FIELDS = ("id", "name", "job_sector", "first_name", "last_name")
+
+def _profile_list_entry(p, fields):
+    entry = {}
+    for field in fields:
+        if field == "name":
+            entry[field] = f"{p.first_name} {p.last_name}" if p.first_name and p.last_name else p.job_sector or "Unnamed Profile"
+        elif field == "content":
+            entry[field] = p.content or {}
+        else:
+            entry[field] = getattr(p, field)
+    return entry
+
 @bp.route("/api/profiles", methods=["GET"])
 @login_required
 def list_profiles():
-    """Get all profiles/personas for the current user"""
-    profiles = Profile.query.filter_by(user_id=current_user.id).all()
-    return jsonify({
-        "profiles": [{
-            "id": p.id,
-            "name": f"{p.first_name} {p.last_name}" if p.first_name and p.last_name else p.job_sector or "Unnamed Profile",
-            "job_sector": p.job_sector,
-            "first_name": p.first_name,
-            "last_name": p.last_name
-        } for p in profiles]
-    })
+    """Get profiles/personas for the current user, newest first (fields, limit and cursor query args)"""
+    try:
+        fields = parse_fields(PROFILE_LIST_FIELDS, DEFAULT_PROFILE_LIST_FIELDS)
+        limit = parse_limit()
+        after = parse_cursor()
+    except ListArgumentError as e:
+        return jsonify({"error": str(e)}), 400
+
+    total, newest = list_version(Profile, Profile.updated_at, current_user.id)
+
+    def build():
+        columns = {"id", "updated_at"}
+        for field in fields:
+            columns.update(PROFILE_LIST_FIELDS[field])
+        query = Profile.query.filter_by(user_id=current_user.id).options(
+            load_only(*(getattr(Profile, c) for c in columns))
+        )
+        profiles, next_cursor = keyset_page(query, Profile.updated_at, Profile.id, limit, after)
+        return jsonify({
+            "profiles": [_profile_list_entry(p, fields) for p in profiles],
+            "total": total,
+            "next_cursor": next_cursor
+        })
+
+    etag = make_etag("profiles", current_user.id, total, newest, request.query_string.decode())
+    return conditional_get(etag, None, build)
 
 @bp.route("/api/profiles", methods=["POST"])
 @login_required
@@ -82,6 +125,8 @@ def create_profile():
         country="",
         summary=""
     )
+    # The profile doubles as a resume; store its content normalized like resume writes do
+    profile.content = normalize_resume_content({}, profile)
     db.session.add(profile)
     db.session.commit()
     
@@ -114,73 +159,103 @@ def delete_profile(profile_id):
     
     return jsonify({"success": True, "message": "Profile deleted"})
 
+def _profile_detail_response(profile):
+    # Return comprehensive profile data - all resume data is in content JSON field
+    content = profile.content or {}
+    
+    return jsonify({
+        "profile": {
+            "id": profile.id,
+            "first_name": profile.first_name,
+            "last_name": profile.last_name,
+            "job_sector": profile.job_sector,
+            "profile_email": profile.profile_email,
+            "phone": profile.phone,
+            "address": profile.address,
+            "city": profile.city,
+            "country": profile.country,
+            "summary": profile.summary,
+            "created_at": profile.created_at,
+            "updated_at": profile.updated_at,
+            "content": content
+        }
+    })
+
+# Profile columns PUT /api/profile/<id> can set directly
+PROFILE_UPDATE_FIELDS = (
+    "first_name", "last_name", "job_sector", "profile_email", "phone",
+    "address", "city", "country", "summary",
+)
+
+def _profile_saved_response(profile):
+    response = jsonify({
+        "success": True,
+        "message": "Profile updated successfully",
+        "profile_id": profile.id,
+        "revision": profile.revision
+    })
+    response.set_etag(document_etag("profile", profile.id, profile.revision))
+    return response
+
+def _profile_conflict(profile):
+    return jsonify({
+        "error": "This profile was changed in another session. Reload it to get the latest version.",
+        "revision": profile.revision
+    }), 409
+
 @bp.route("/api/profile/<profile_id>", methods=["GET", "PUT", "DELETE"])
 @login_required
 def api_profile_detail(profile_id):
     """Centralized endpoint for profile/resume management - GET all data, PUT to update, DELETE to remove"""
+    if request.method == "GET":
+        # Check the client's cached copy against the revision before loading content
+        row = db.session.query(Profile.revision, Profile.updated_at).filter_by(id=profile_id, user_id=current_user.id).first()
+        if not row:
+            return jsonify({"error": "Profile not found"}), 404
+        return conditional_get(
+            document_etag("profile", profile_id, row.revision),
+            row.updated_at,
+            lambda: _profile_detail_response(
+                Profile.query.filter_by(id=profile_id, user_id=current_user.id).first_or_404()
+            )
+        )
+
     profile = Profile.query.filter_by(id=profile_id, user_id=current_user.id).first()
     
     if not profile:
         return jsonify({"error": "Profile not found"}), 404
     
-    if request.method == "GET":
-        # Return comprehensive profile data - all resume data is in content JSON field
-        content = profile.content or {}
-        
-        return jsonify({
-            "profile": {
-                "id": profile.id,
-                "first_name": profile.first_name,
-                "last_name": profile.last_name,
-                "job_sector": profile.job_sector,
-                "profile_email": profile.profile_email,
-                "phone": profile.phone,
-                "address": profile.address,
-                "city": profile.city,
-                "country": profile.country,
-                "summary": profile.summary,
-                "created_at": profile.created_at.isoformat() if profile.created_at else None,
-                "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
-                "content": content
-            }
-        })
-    
-    elif request.method == "PUT":
+    if request.method == "PUT":
         # Update profile - all data stored in content JSON field
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
         
+        # Refuse saves made against an older revision (e.g. another tab saved first)
+        if if_match_failed(document_etag("profile", profile.id, profile.revision)):
+            return _profile_conflict(profile)
+        
         # Update basic profile fields
-        if "first_name" in data:
-            profile.first_name = data["first_name"]
-        if "last_name" in data:
-            profile.last_name = data["last_name"]
-        if "job_sector" in data:
-            profile.job_sector = data["job_sector"]
-        if "profile_email" in data:
-            profile.profile_email = data["profile_email"]
-        if "phone" in data:
-            profile.phone = data["phone"]
-        if "address" in data:
-            profile.address = data["address"]
-        if "city" in data:
-            profile.city = data["city"]
-        if "country" in data:
-            profile.country = data["country"]
-        if "summary" in data:
-            profile.summary = data["summary"]
-        if "content" in data:
-            profile.content = data["content"]
+        updates = {field: data[field] for field in PROFILE_UPDATE_FIELDS if field in data}
+        content = data.get("content")
+        if isinstance(content, dict):
+            content = normalize_resume_content(content, profile)
+        content_changed = "content" in data and content_hash(content) != stored_content_hash(profile)
+        
+        # Skip the write entirely when nothing would change
+        if not content_changed and unchanged(profile, **updates):
+            return _profile_saved_response(profile)
+        
+        for field, value in updates.items():
+            setattr(profile, field, value)
+        if content_changed:
+            profile.content = content
         
         profile.updated_at = datetime.utcnow()
-        db.session.commit()
+        if not commit_revision():
+            return _profile_conflict(profile)
         
-        return jsonify({
-            "success": True,
-            "message": "Profile updated successfully",
-            "profile_id": profile.id
-        })
+        return _profile_saved_response(profile)
     
     elif request.method == "DELETE":
         # Delete profile
@@ -1,14 +1,50 @@
 from flask import Blueprint, jsonify, request
 from flask_login import login_required, current_user
-from datetime import datetime
+from werkzeug.exceptions import UnsupportedMediaType
+from datetime import date, datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import load_only
+import json
 import yaml
-from app.models import Profile
+from app.models import Profile, generate_uuid
 from app.extensions import db
-from app.subscription_limits import require_subscription_limit
-from utils.resume_validation import validate_resume_data, ValidationError
+from app.conditional import conditional_get, list_version, make_etag
+from app.config import RESUME_SECTION_STORAGE
+from app.revisions import (
+    commit_revision,
+    content_hash,
+    document_etag,
+    if_match_failed,
+    stored_content_hash,
+    unchanged,
+)
+from app.history import list_revisions, load_revision, record_created
+from app.render_cache import pdf_response
+from app.resume_facts import store_facts
+from app.resume_sections import insert_sections, with_sections
+from app.pagination import ListArgumentError, keyset_page, parse_cursor, parse_fields, parse_limit
+from app.search import index_created
+from app.subscription_limits import check_limit, require_subscription_limit
+from app.upload_cache import file_digest, get_cached_upload, store_upload
+from app.uploads import (
+    MAX_PDF_REQUEST, MAX_PDF_UPLOAD, PDF_SIGNATURE, expect_upload_signature, has_signature, limit_request_size,
+    spooled_path,
+)
+from utils.resume_validation import (
+    normalize_resume_content,
+    validate_resume_data,
+    validate_resume_changes,
+    ValidationError,
+)
+from utils.json_patch import apply_patch, JsonPatchError, JsonPatchTestFailed
 from utils.ai_providers import ProviderFactory
+from utils.pdf_extraction import extract_pdf_text, PdfExtractionError
+from utils.pdf_render import PdfRenderError
+from utils.resume_preparser import preparse_resume, merge_parsed_resume
+from utils.resume_import import ImportFormatError, from_json_resume, from_linkedin_archive
 from utils.prompts import (
     RESUME_PARSER_PROMPT,
+    RESUME_REMAINDER_PARSER_PROMPT,
     RESUME_TEXT_ENHANCE_PROMPT,
     RESUME_GENERATION_PROMPT,
 )
@@ -16,39 +52,96 @@ from utils.prompts import (
 bp = Blueprint("resume", __name__)
 
 
-@bp.route("/api/resumes", methods=["GET", "POST"])
+# Fields a resume list entry can include, and the Profile columns each one needs
+RESUME_LIST_FIELDS = {
+    "resume_id": ("id",),
+    "title": ("first_name", "last_name", "job_sector"),
+    "job_sector": ("job_sector",),
+    "created_at": ("created_at",),
+    "updated_at": ("updated_at",),
+    "content": ("content",),
+}
+DEFAULT_RESUME_LIST_FIELDS = ("resume_id", "title", "job_sector", "created_at", "updated_at")
+
+MAX_IMPORT_DOCUMENTS = 100  # resumes per import request
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+
+def _resume_title(p):
+    if p.first_name and p.last_name:
+        return f"{p.first_name} {p.last_name} - {p.job_sector}"
+    return p.job_sector or "Resume title"
+
+
+def _resume_list_entry(p, fields):
+    entry = {}
+    for field in fields:
+        if field == "resume_id":
+            entry[field] = p.id  # Use profile.id as resume_id
+        elif field == "title":
+            entry[field] = _resume_title(p)
+        elif field == "content":
+            entry[field] = p.content or {}
+        else:
+            entry[field] = getattr(p, field)
+    return entry
+
+
+@bp.route("/api/resumes", methods=["GET"])
 @login_required
 def api_resumes():
-    """List all resumes (profiles) or create a new one"""
-    if request.method == "GET":
-        # Get all profiles for this user (each profile is a resume/persona)
-        profiles = (
-            Profile.query.filter_by(user_id=current_user.id)
-            .order_by(Profile.updated_at.desc())
-            .all()
+    """
+    List resumes (profiles), newest first.
+
+    Query args: fields (comma separated, default excludes content), limit and
+    cursor (from the previous page's next_cursor).
+    """
+    try:
+        fields = parse_fields(RESUME_LIST_FIELDS, DEFAULT_RESUME_LIST_FIELDS)
+        limit = parse_limit()
+        after = parse_cursor()
+    except ListArgumentError as e:
+        return jsonify({"error": str(e)}), 400
+
+    total, newest = list_version(Profile, Profile.updated_at, current_user.id)
+    etag = make_etag("resumes", current_user.id, total, newest, request.query_string.decode())
+
+    def build():
+        # Only load the columns the requested fields need; content stays unloaded unless asked for
+        columns = {"id", "updated_at"}
+        for field in fields:
+            columns.update(RESUME_LIST_FIELDS[field])
+        query = Profile.query.filter_by(user_id=current_user.id).options(
+            load_only(*(getattr(Profile, c) for c in columns))
         )
+        profiles, next_cursor = keyset_page(query, Profile.updated_at, Profile.id, limit, after)
         return jsonify(
             {
-                "resumes": [
-                    {
-                        "resume_id": p.id,  # Use profile.id as resume_id
-                        "title": f"{p.first_name} {p.last_name} - {p.job_sector}"
-                        if p.first_name and p.last_name
-                        else p.job_sector or "Resume title",
-                        "job_sector": p.job_sector,
-                        "created_at": p.created_at.isoformat()
-                        if p.created_at
-                        else None,
-                        "updated_at": p.updated_at.isoformat()
-                        if p.updated_at
-                        else None,
-                        "content": p.content or {},
-                    }
-                    for p in profiles
-                ]
+                "resumes": [_resume_list_entry(p, fields) for p in profiles],
+                "total": total,
+                "next_cursor": next_cursor,
             }
         )
 
+    # No Last-Modified on lists: a delete changes the list without a newer updated_at
+    return conditional_get(etag, None, build)
+
+
+def _new_profile_fields(content_data):
+    """Profile columns of a new resume, mirrored from its content"""
+    personal_info = content_data.get("personalInfo", {})
+    return {
+        "first_name": personal_info.get("firstName", ""),
+        "last_name": personal_info.get("lastName", ""),
+        "job_sector": content_data.get("title", "Resume title"),
+        "profile_email": personal_info.get("email", ""),
+        "phone": personal_info.get("phone", ""),
+        "address": personal_info.get("address", ""),
+        "city": personal_info.get("city", ""),
+        "country": personal_info.get("country", ""),
+        "summary": content_data.get("summary", ""),
+    }
+
 
 @bp.route("/api/resumes", methods=["POST"])
 @login_required
@@ -62,26 +155,16 @@ def create_resume():
     # Extract content data
     raw_content_data = data.get("content", {})
 
-    # Validate content
+    # Validate content, then store it with every section's defaults filled in
     try:
-        content_data = validate_resume_data(raw_content_data)
+        content_data = normalize_resume_content(validate_resume_data(raw_content_data))
     except ValidationError as err:
         return jsonify({"error": "Validation failed", "details": err.messages}), 400
 
-    personal_info = content_data.get("personalInfo", {})
-
     # Create new profile (which serves as a resume)
     profile = Profile(
         user_id=current_user.id,
-        first_name=personal_info.get("firstName", ""),
-        last_name=personal_info.get("lastName", ""),
-        job_sector=content_data.get("title", "Resume title"),
-        profile_email=personal_info.get("email", ""),
-        phone=personal_info.get("phone", ""),
-        address=personal_info.get("address", ""),
-        city=personal_info.get("city", ""),
-        country=personal_info.get("country", ""),
-        summary=content_data.get("summary", ""),
+        **_new_profile_fields(content_data),
         content=content_data,  # Store all resume data in content JSON field
     )
 
@@ -95,113 +178,230 @@ def create_resume():
                 "resume_id": profile.id,
                 "title": f"{profile.first_name} {profile.last_name} - {profile.job_sector}",
                 "job_sector": profile.job_sector,
-                "created_at": profile.created_at.isoformat()
-                if profile.created_at
-                else None,
-                "updated_at": profile.updated_at.isoformat()
-                if profile.updated_at
-                else None,
+                "created_at": profile.created_at,
+                "updated_at": profile.updated_at,
             },
         }
     ), 201
 
 
-@bp.route("/api/resumes/<resume_id>", methods=["GET", "PUT", "DELETE"])
+def _import_documents():
+    """
+    (source, mapper, document) for every resume in an import request: a JSON
+    body (a JSON Resume document, a list of them or {"resumes": [...]}), or
+    uploaded .json files (JSON Resume) and .zip files (LinkedIn data exports).
+    """
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict) and isinstance(body.get("resumes"), list):
+            body = body["resumes"]
+        documents = body if isinstance(body, list) else [body]
+        return [(f"resumes[{i}]", from_json_resume, document) for i, document in enumerate(documents)]
+
+    documents = []
+    for file in request.files.getlist("files") + request.files.getlist("file"):
+        name = file.filename or "upload"
+        if name.lower().endswith(".zip"):
+            if not has_signature(file, ZIP_SIGNATURE):
+                documents.append((name, None, "Not a zip archive"))
+            else:
+                documents.append((name, from_linkedin_archive, spooled_path(file)))
+        elif name.lower().endswith(".json"):
+            try:
+                body = json.load(file.stream)
+            except ValueError:
+                documents.append((name, None, "Not valid JSON"))
+                continue
+            if isinstance(body, list):
+                documents.extend((f"{name}[{i}]", from_json_resume, d) for i, d in enumerate(body))
+            else:
+                documents.append((name, from_json_resume, body))
+        else:
+            documents.append((name, None, "Only .json (JSON Resume) and .zip (LinkedIn export) files can be imported"))
+    return documents
+
+
+@bp.route("/api/resumes/import", methods=["POST"])
 @login_required
-def api_resume_detail(resume_id):
-    """Get, update, or delete a specific resume (profile)"""
-    profile = Profile.query.filter_by(id=resume_id, user_id=current_user.id).first()
+def import_resumes():
+    """
+    Import resumes from JSON Resume documents or LinkedIn data exports.
+
+    All documents are mapped and validated first; if any fails, nothing is
+    imported and the errors are reported per document. The subscription limit
+    is checked once for the whole batch, and the resumes are inserted with a
+    single executemany in one transaction. The request body (JSON or the
+    uploaded files together) is capped by MAX_CONTENT_LENGTH (32MB).
+    """
+    documents = _import_documents()
+    if not documents:
+        return jsonify({"error": "No resumes provided"}), 400
+    if len(documents) > MAX_IMPORT_DOCUMENTS:
+        return jsonify({"error": f"At most {MAX_IMPORT_DOCUMENTS} resumes can be imported at once"}), 400
+
+    contents = []
+    errors = []
+    for index, (source, mapper, document) in enumerate(documents):
+        try:
+            if mapper is None:
+                raise ImportFormatError(document)
+            contents.append(normalize_resume_content(validate_resume_data(mapper(document))))
+        except ImportFormatError as e:
+            errors.append({"index": index, "source": source, "errors": str(e)})
+        except ValidationError as err:
+            errors.append({"index": index, "source": source, "errors": err.messages})
+    if errors:
+        return jsonify({"error": "Validation failed", "details": errors}), 400
+
+    can_create, error_response = check_limit("resumes", requested=len(contents))
+    if not can_create:
+        return error_response
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": generate_uuid(),
+            "user_id": current_user.id,
+            **_new_profile_fields(content_data),
+            "content": content_data,
+            "content_hash": content_hash(content_data),
+            "revision": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for content_data in contents
+    ]
+    # Bulk inserts skip the flush hooks, so history, facts and search entries are written here
+    db.session.execute(insert(Profile), rows)
+    connection = db.session.connection()
+    record_created(connection, "resume", [(row["id"], row["user_id"], row["content"]) for row in rows])
+    store_facts(connection, [(row["id"], row["user_id"], row["content"]) for row in rows])
+    if RESUME_SECTION_STORAGE:
+        insert_sections(connection, [(row["id"], row["content"]) for row in rows])
+    index_created(connection, Profile, [Profile(**row) for row in rows])
+    db.session.commit()
 
-    if not profile:
-        return jsonify({"error": "Resume not found"}), 404
+    return jsonify(
+        {
+            "success": True,
+            "imported": len(rows),
+            "resumes": [
+                {
+                    "resume_id": row["id"],
+                    "title": f"{row['first_name']} {row['last_name']} - {row['job_sector']}",
+                    "job_sector": row["job_sector"],
+                    "created_at": row["created_at"],
+                    "updated_at": row["updated_at"],
+                }
+                for row in rows
+            ],
+        }
+    ), 201
 
-    if request.method == "GET":
-        # Get content from the JSON field
-        content = profile.content or {}
-
-        # Ensure all required fields exist with defaults (omitted lengthy defaults code for brevity, assuming standard structure)
-        # Note: In refactoring, it's better to preserve logic.
-        # I will include the logic from app.py
-
-        if "personalInfo" not in content:
-            content["personalInfo"] = {
-                "firstName": profile.first_name or "",
-                "lastName": profile.last_name or "",
-                "email": profile.profile_email or "",
-                "phone": profile.phone or "",
-                "address": profile.address or "",
-                "city": profile.city or "",
-                "country": profile.country or "",
-                "linkedIn": "",
-                "website": "",
+
+def _resume_detail_response(profile):
+    """Full resume document; content is stored normalized, so it is returned as is"""
+    content = profile.content or {}
+    return jsonify(
+        {
+            "resume": {
+                "resume_id": profile.id,
+                "title": f"{profile.first_name} {profile.last_name} - {profile.job_sector}"
+                if profile.first_name and profile.last_name
+                else profile.job_sector or "Resume title",
+                "job_sector": profile.job_sector,
+                "created_at": profile.created_at,
+                "updated_at": profile.updated_at,
+                "content": content,
+                "template_name": content.get("templateId", "modern"),
             }
+        }
+    )
 
-        if "summary" not in content:
-            content["summary"] = profile.summary or ""
 
-        if "title" not in content:
-            content["title"] = profile.job_sector or "Resume title"
+def _sync_profile_fields(profile, content_data):
+    """Copy the resume fields mirrored as Profile columns out of the content"""
+    personal_info = content_data.get("personalInfo", {})
+    if personal_info:
+        profile.first_name = personal_info.get("firstName", profile.first_name)
+        profile.last_name = personal_info.get("lastName", profile.last_name)
+        profile.profile_email = personal_info.get("email", profile.profile_email)
+        profile.phone = personal_info.get("phone", profile.phone)
+        profile.address = personal_info.get("address", profile.address)
+        profile.city = personal_info.get("city", profile.city)
+        profile.country = personal_info.get("country", profile.country)
+
+    if "title" in content_data:
+        profile.job_sector = content_data["title"]
+    if "summary" in content_data:
+        profile.summary = content_data["summary"]
+
+
+def _resume_saved_response(profile):
+    response = jsonify(
+        {
+            "success": True,
+            "resume": {
+                "resume_id": profile.id,
+                "title": f"{profile.first_name} {profile.last_name} - {profile.job_sector}",
+                "updated_at": profile.updated_at,
+                "revision": profile.revision,
+            },
+        }
+    )
+    response.set_etag(document_etag("resume", profile.id, profile.revision))
+    return response
 
-        if "templateId" not in content:
-            content["templateId"] = "modern"
 
-        # Ensure arrays exist
-        for key in [
-            "workExperience",
-            "education",
-            "skills",
-            "certifications",
-            "links",
-            "others",
-        ]:
-            if key not in content:
-                content[key] = []
-
-        # Section order
-        if "sectionOrder" not in content:
-            content["sectionOrder"] = [
-                "summary",
-                "workExperience",
-                "education",
-                "skills",
-                "certifications",
-                "links",
-                "others",
-            ]
-
-        # Styles and visibility (kept minimal for brevity but should be there)
-        # ... (Assuming frontend handles defaults if missing, or I should copy full defaults)
+def _resume_conflict(profile):
+    return jsonify(
+        {
+            "error": "This resume was changed in another session. Reload it to get the latest version.",
+            "revision": profile.revision,
+        }
+    ), 409
 
-        return jsonify(
-            {
-                "resume": {
-                    "resume_id": profile.id,
-                    "title": f"{profile.first_name} {profile.last_name} - {profile.job_sector}"
-                    if profile.first_name and profile.last_name
-                    else profile.job_sector or "Resume title",
-                    "job_sector": profile.job_sector,
-                    "created_at": profile.created_at.isoformat()
-                    if profile.created_at
-                    else None,
-                    "updated_at": profile.updated_at.isoformat()
-                    if profile.updated_at
-                    else None,
-                    "content": content,
-                    "template_name": content.get("templateId", "modern"),
-                }
-            }
+
+@bp.route("/api/resumes/<resume_id>", methods=["GET", "PUT", "DELETE"])
+@login_required
+def api_resume_detail(resume_id):
+    """Get, update, or delete a specific resume (profile)"""
+    if request.method == "GET":
+        # Check the client's cached copy against the revision before loading content
+        row = (
+            db.session.query(Profile.revision, Profile.updated_at)
+            .filter_by(id=resume_id, user_id=current_user.id)
+            .first()
         )
+        if not row:
+            return jsonify({"error": "Resume not found"}), 404
+        return conditional_get(
+            document_etag("resume", resume_id, row.revision),
+            row.updated_at,
+            lambda: _resume_detail_response(
+                Profile.query.filter_by(id=resume_id, user_id=current_user.id).first_or_404()
+            ),
+        )
+
+    profile = Profile.query.filter_by(id=resume_id, user_id=current_user.id).first()
 
-    elif request.method == "PUT":
+    if not profile:
+        return jsonify({"error": "Resume not found"}), 404
+
+    if request.method == "PUT":
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        # Update content field
+        # Refuse saves made against an older revision (e.g. another tab saved first)
+        if if_match_failed(document_etag("resume", profile.id, profile.revision)):
+            return _resume_conflict(profile)
+
+        content_data = None
         if "content" in data:
             raw_content = data["content"]
             try:
-                content_data = validate_resume_data(raw_content)
+                content_data = normalize_resume_content(validate_resume_data(raw_content), profile)
 
                 # Debug: Log what we're saving
                 print(f"[RESUME SAVE] Validated content keys: {content_data.keys()}")
@@ -211,49 +411,32 @@ def api_resume_detail(resume_id):
                 if "others" in content_data:
                     print(f"[RESUME SAVE] Others count: {len(content_data['others'])}")
                     print(f"[RESUME SAVE] Others data: {content_data['others']}")
-
-                profile.content = content_data
             except ValidationError as err:
                 print(f"[RESUME SAVE] Validation error: {err.messages}")
                 return jsonify(
                     {"error": "Validation failed", "details": err.messages}
                 ), 400
 
-            # Also update profile fields from content
-            personal_info = content_data.get("personalInfo", {})
-            if personal_info:
-                profile.first_name = personal_info.get("firstName", profile.first_name)
-                profile.last_name = personal_info.get("lastName", profile.last_name)
-                profile.profile_email = personal_info.get(
-                    "email", profile.profile_email
-                )
-                profile.phone = personal_info.get("phone", profile.phone)
-                profile.address = personal_info.get("address", profile.address)
-                profile.city = personal_info.get("city", profile.city)
-                profile.country = personal_info.get("country", profile.country)
+        # Skip the write entirely when the normalized content and title are unchanged
+        if (content_data is None or content_hash(content_data) == stored_content_hash(profile)) and (
+            "title" not in data or unchanged(profile, job_sector=data["title"])
+        ):
+            return _resume_saved_response(profile)
 
-            if "title" in content_data:
-                profile.job_sector = content_data["title"]
-            if "summary" in content_data:
-                profile.summary = content_data["summary"]
+        if content_data is not None:
+            profile.content = content_data
+            # Also update profile fields from content
+            _sync_profile_fields(profile, content_data)
 
         # Direct field updates (for backwards compatibility)
         if "title" in data:
             profile.job_sector = data["title"]
 
         profile.updated_at = datetime.utcnow()
-        db.session.commit()
+        if not commit_revision():
+            return _resume_conflict(profile)
 
-        return jsonify(
-            {
-                "success": True,
-                "resume": {
-                    "resume_id": profile.id,
-                    "title": f"{profile.first_name} {profile.last_name} - {profile.job_sector}",
-                    "updated_at": profile.updated_at.isoformat(),
-                },
-            }
-        )
+        return _resume_saved_response(profile)
 
     elif request.method == "DELETE":
         # Use centralized delete logic
@@ -262,14 +445,174 @@ def api_resume_detail(resume_id):
         return jsonify({"success": True, "message": "Resume deleted successfully"})
 
 
+@bp.route("/api/resumes/<resume_id>", methods=["PATCH"])
+@login_required
+def patch_resume(resume_id):
+    """
+    Partially update resume content with a JSON Patch (RFC 6902).
+
+    Paths are relative to the content document, e.g.
+    [{"op": "replace", "path": "/workExperience/0/title", "value": "Lead"}].
+    Only the sections and items the patch touches are re-validated.
+    """
+    operations = request.get_json(silent=True)
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "Expected a non-empty JSON Patch array"}), 400
+
+    profile = Profile.query.filter_by(id=resume_id, user_id=current_user.id).first()
+    if not profile:
+        return jsonify({"error": "Resume not found"}), 404
+
+    if if_match_failed(document_etag("resume", profile.id, profile.revision)):
+        return _resume_conflict(profile)
+
+    content = profile.content
+    try:
+        patched = apply_patch(content, operations)
+        if not isinstance(patched, dict):
+            raise JsonPatchError("Content must remain an object")
+        patched = normalize_resume_content(validate_resume_changes(content, patched), profile)
+    except JsonPatchTestFailed as e:
+        return jsonify({"error": str(e)}), 409
+    except JsonPatchError as e:
+        return jsonify({"error": "Invalid patch", "details": str(e)}), 400
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "details": err.messages}), 400
+
+    # Write back only the top-level sections that changed
+    changed = {
+        key: value
+        for key, value in patched.items()
+        if content.get(key) is not value and content.get(key) != value
+    }
+    removed = [key for key in content if key not in patched]
+    if not changed and not removed:
+        return _resume_saved_response(profile)
+    # A new dict rather than an in-place edit, so the revision history sees the content being replaced
+    profile.content = {**{key: value for key, value in content.items() if key not in removed}, **changed}
+    _sync_profile_fields(profile, changed)
+
+    profile.updated_at = datetime.utcnow()
+    if not commit_revision():
+        return _resume_conflict(profile)
+
+    return _resume_saved_response(profile)
+
+
+def _revision_entry(row):
+    return {
+        "revision": row.revision,
+        "created_at": row.created_at,
+        "size": row.size,
+        "snapshot": row.kind == "snapshot",
+    }
+
+
+@bp.route("/api/resumes/<resume_id>/revisions", methods=["GET"])
+@login_required
+def list_resume_revisions(resume_id):
+    """Stored revisions of a resume, newest first (older ones are thinned out over time)"""
+    profile = (
+        Profile.query.options(load_only(Profile.id, Profile.revision))
+        .filter_by(id=resume_id, user_id=current_user.id)
+        .first()
+    )
+    if not profile:
+        return jsonify({"error": "Resume not found"}), 404
+    return jsonify(
+        {
+            "success": True,
+            "current_revision": profile.revision,
+            "revisions": [_revision_entry(row) for row in list_revisions("resume", profile.id)],
+        }
+    )
+
+
+@bp.route("/api/resumes/<resume_id>/revisions/<int:revision>", methods=["GET"])
+@login_required
+def get_resume_revision(resume_id, revision):
+    """Content of a stored revision of a resume"""
+    if not Profile.query.filter_by(id=resume_id, user_id=current_user.id).count():
+        return jsonify({"error": "Resume not found"}), 404
+    content = load_revision("resume", resume_id, revision)
+    if content is None:
+        return jsonify({"error": "Revision not found"}), 404
+    return jsonify({"success": True, "revision": revision, "content": content})
+
+
+@bp.route("/api/resumes/<resume_id>/revisions/<int:revision>/restore", methods=["POST"])
+@login_required
+def restore_resume_revision(resume_id, revision):
+    """Make a stored revision the current content (saved as a new revision)"""
+    profile = Profile.query.filter_by(id=resume_id, user_id=current_user.id).first()
+    if not profile:
+        return jsonify({"error": "Resume not found"}), 404
+
+    if if_match_failed(document_etag("resume", profile.id, profile.revision)):
+        return _resume_conflict(profile)
+
+    content = load_revision("resume", profile.id, revision)
+    if content is None:
+        return jsonify({"error": "Revision not found"}), 404
+    try:
+        content_data = normalize_resume_content(validate_resume_data(content), profile)
+    except ValidationError as err:
+        return jsonify({"error": "Revision no longer passes validation", "details": err.messages}), 400
+
+    if content_hash(content_data) == stored_content_hash(profile):
+        return _resume_saved_response(profile)
+
+    profile.content = content_data
+    _sync_profile_fields(profile, content_data)
+    profile.updated_at = datetime.utcnow()
+    if not commit_revision():
+        return _resume_conflict(profile)
+
+    return _resume_saved_response(profile)
+
+
+@bp.route("/api/resumes/<resume_id>/pdf", methods=["GET"])
+@login_required
+def download_resume_pdf(resume_id):
+    """Download the resume as a PDF rendered on the server (cached until the content changes)"""
+    row = (
+        db.session.query(Profile.content_hash, Profile.first_name, Profile.last_name)
+        .filter_by(id=resume_id, user_id=current_user.id)
+        .first()
+    )
+    if not row:
+        return jsonify({"error": "Resume not found"}), 404
+
+    def load_content():
+        content = db.session.query(Profile.content).filter_by(id=resume_id).scalar()
+        return with_sections(db.session.connection(), resume_id, content)
+
+    # Rows saved before content hashes were stored need their content hashed once
+    digest = row.content_hash or content_hash(load_content())
+    name = "_".join(part for part in (row.first_name, row.last_name) if part) or "resume"
+    try:
+        return pdf_response("resume", digest, load_content, f"{name}_Resume.pdf", date.today().isoformat())
+    except PdfRenderError as e:
+        print(f"[RESUME PDF] Render failed for {resume_id}: {e}")
+        return jsonify({"error": "Could not generate the PDF. Please try again."}), 503
+
+
 @bp.route("/api/resume/upload", methods=["POST"])
 @login_required
 def upload_resume_pdf():
     """Upload and extract text from a PDF resume"""
-    if "file" not in request.files:
+    # The body streams to a temp file; non-PDF content is rejected on its first bytes
+    limit_request_size(MAX_PDF_REQUEST)
+    expect_upload_signature(PDF_SIGNATURE)
+    try:
+        files = request.files
+    except UnsupportedMediaType:
+        return jsonify({"error": "Only PDF files are allowed"}), 400
+
+    if "file" not in files:
         return jsonify({"error": "No file provided"}), 400
 
-    file = request.files["file"]
+    file = files["file"]
 
     if file.filename == "":
         return jsonify({" error": "No file selected"}), 400
@@ -282,21 +625,33 @@ def upload_resume_pdf():
     size = file.tell()
     file.seek(0)  # Reset to beginning
 
-    if size > 5 * 1024 * 1024:  # 5MB
+    if size > MAX_PDF_UPLOAD:
         return jsonify({"error": "File too large (max 5MB)"}), 400
 
-    try:
-        import pdfplumber
+    if not has_signature(file, PDF_SIGNATURE):
+        return jsonify({"error": "Only PDF files are allowed"}), 400
 
-        # Extract text from PDF
-        text = ""
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+    # Re-uploads of the same file reuse the cached result unless a re-parse is requested
+    path = spooled_path(file)
+    digest = file_digest(path)
+    reparse = (request.form.get("reparse") or request.args.get("reparse") or "").lower() in ("1", "true", "yes")
+    cached = None if reparse else get_cached_upload(current_user.id, digest)
+    if cached and cached.parsed:
+        return jsonify(
+            {
+                "success": True,
+                "resume_data": cached.parsed,
+                "cached": True,
+                "message": "Resume uploaded and processed successfully",
+            }
+        )
 
-        text = text.strip()
+    try:
+        # Extract text from PDF in the isolated extraction pool
+        if cached and cached.text:
+            text = cached.text
+        else:
+            text = extract_pdf_text(path)
 
         # Validate extracted text
         if not text or len(text) < 50:
@@ -306,16 +661,44 @@ def upload_resume_pdf():
                 }
             ), 400
 
-        # Call AI to parse the resume
+        # Parse the deterministic parts locally; well-formed resumes skip the AI entirely
+        preparsed = preparse_resume(text)
+        if preparsed["complete"]:
+            store_upload(current_user.id, digest, text, preparsed["data"])
+            return jsonify(
+                {
+                    "success": True,
+                    "resume_data": preparsed["data"],
+                    "message": "Resume uploaded and processed successfully",
+                }
+            )
+
+        # Cache the text now so a failed AI parse does not have to re-extract
+        if not (cached and cached.text):
+            store_upload(current_user.id, digest, text)
+
+        # Call AI to parse the resume (only the ambiguous remainder if anything was pre-parsed)
         try:
             provider = ProviderFactory.get_provider()
-
-            ai_response = provider.call_model(
-                system_prompt=RESUME_PARSER_PROMPT,
-                user_payload={"resume_text": text},
-                parse_yaml=True,
-                max_tokens=5000,
-            )
+            partial = bool(preparsed["parsed_sections"] and preparsed["remainder"])
+
+            if partial:
+                ai_response = provider.call_model(
+                    system_prompt=RESUME_REMAINDER_PARSER_PROMPT,
+                    user_payload={
+                        "parsed_sections": preparsed["parsed_sections"],
+                        "resume_text": preparsed["remainder"],
+                    },
+                    parse_yaml=True,
+                    max_tokens=5000,
+                )
+            else:
+                ai_response = provider.call_model(
+                    system_prompt=RESUME_PARSER_PROMPT,
+                    user_payload={"resume_text": text},
+                    parse_yaml=True,
+                    max_tokens=5000,
+                )
 
             parsed_data = ai_response.get("parsed")
 
@@ -330,6 +713,11 @@ def upload_resume_pdf():
             if "error" in parsed_data:
                 return jsonify({"error": parsed_data["error"]}), 400
 
+            if partial:
+                parsed_data = merge_parsed_resume(preparsed["data"], parsed_data)
+
+            store_upload(current_user.id, digest, text, parsed_data)
+
             return jsonify(
                 {
                     "success": True,
@@ -343,6 +731,8 @@ def upload_resume_pdf():
                 {"error": f"Failed to process resume with AI: {str(e)}"}
             ), 500
 
+    except PdfExtractionError as e:
+        return jsonify({"error": str(e)}), 400
     except ImportError:
         return jsonify(
             {"error": "PDF processing library not installed. Please contact support."}
@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+from app.search import DEFAULT_RESULTS, INDEXED, MAX_RESULTS, SearchQueryError, search, search_available
+
+bp = Blueprint('search', __name__)
+
+DOCUMENT_TYPES = tuple(spec[0] for spec in INDEXED.values())
+
+@bp.route("/api/search", methods=["GET"])
+@login_required
+def api_search():
+    """
+    Full-text search over the user's resumes, cover letters and applications.
+
+    Query arguments: q (required), limit (default 20, max 50) and types
+    (comma separated subset of resume, cover_letter, application).
+    """
+    if not search_available():
+        return jsonify({"error": "Search is not available"}), 503
+
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "Missing search query (q)"}), 400
+
+    try:
+        limit = min(max(int(request.args.get("limit", DEFAULT_RESULTS)), 1), MAX_RESULTS)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    types = [t.strip() for t in request.args.get("types", "").split(",") if t.strip()]
+    unknown = [t for t in types if t not in DOCUMENT_TYPES]
+    if unknown:
+        return jsonify({"error": f"Unknown types: {', '.join(unknown)}"}), 400
+
+    try:
+        results = search(current_user.id, query, limit, types)
+    except SearchQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"success": True, "query": query, "results": results})
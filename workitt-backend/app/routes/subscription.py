@@ -20,12 +20,12 @@ def get_subscription():
             "plan_type": subscription.plan_type,
             "status": subscription.status,
             "active": subscription.active,
-            "current_period_start": subscription.current_period_start.isoformat() if subscription.current_period_start else None,
-            "current_period_end": subscription.current_period_end.isoformat() if subscription.current_period_end else None,
+            "current_period_start": subscription.current_period_start,
+            "current_period_end": subscription.current_period_end,
             "cancel_at_period_end": subscription.cancel_at_period_end,
-            "cancelled_at": subscription.cancelled_at.isoformat() if subscription.cancelled_at else None,
-            "trial_start": subscription.trial_start.isoformat() if subscription.trial_start else None,
-            "trial_end": subscription.trial_end.isoformat() if subscription.trial_end else None,
+            "cancelled_at": subscription.cancelled_at,
+            "trial_start": subscription.trial_start,
+            "trial_end": subscription.trial_end,
         }
     })
 
@@ -68,7 +68,7 @@ def upgrade_subscription():
         "subscription": {
             "plan_type": subscription.plan_type,
             "status": subscription.status,
-            "current_period_end": subscription.current_period_end.isoformat() if subscription.current_period_end else None
+            "current_period_end": subscription.current_period_end
         }
     })
 
@@ -96,7 +96,7 @@ def cancel_subscription():
             "plan_type": subscription.plan_type,
             "status": subscription.status,
             "cancel_at_period_end": subscription.cancel_at_period_end,
-            "current_period_end": subscription.current_period_end.isoformat() if subscription.current_period_end else None
+            "current_period_end": subscription.current_period_end
         }
     })
 
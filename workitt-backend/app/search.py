@@ -0,0 +1,307 @@
+"""
+Full-text search over a user's resumes, cover letters and applications.
+
+Documents are indexed in an SQLite FTS5 table, search_index, with three
+columns: `owner` (the user id, so a search only ever touches that user's
+entries in the index), `title` and `body`. search_documents maps each
+document to its FTS rowid, so updating or removing an entry is a primary key
+lookup rather than a scan of the index.
+
+The index is kept in sync by an after_flush hook, in the same transaction as
+the write: documents are re-indexed when a field that feeds the index
+changes and removed when they are deleted. The text is extracted from the
+JSON content once, at write time, so searching never reads or decodes rows.
+
+The table is created (and filled from the existing rows) on startup by
+create_search_index(), under one write transaction so that workers starting
+together build it once. A worker that could not check or build the index at
+startup (e.g. while another worker held the database) looks for the table
+again on its next write or search, so it never stops indexing for good. On
+databases other than SQLite, search is disabled.
+"""
+import html
+import re
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session, attributes, undefer
+from app.extensions import db
+from app.models import Application, CoverLetter, Profile, SearchDocument
+
+DEFAULT_RESULTS = 20
+MAX_RESULTS = 50
+MAX_TERMS = 10
+
+# bm25 column weights: owner (only filters), title, body
+RANK = "bm25(search_index, 0.0, 10.0, 1.0)"
+
+# Markers FTS5 puts around matches; replaced by <mark> after the text is HTML-escaped
+_OPEN, _CLOSE = "\x02", "\x03"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_documents = SearchDocument.__table__
+_available = None  # None until the index has been found (False: not SQLite, search disabled)
+
+
+class SearchQueryError(ValueError):
+    """The search query has no searchable terms"""
+
+
+def _index_exists(connection):
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    ).scalar() is not None
+
+
+def _ready(connection):
+    """Whether the index can be used, looking for it again if startup did not find it"""
+    global _available
+    if _available is None and connection.dialect.name == "sqlite" and _index_exists(connection):
+        _available = True
+    return bool(_available)
+
+
+def _join(*parts):
+    return "\n".join(str(part) for part in parts if part)
+
+
+def _resume_text(profile):
+    content = profile.content or {}
+    info = content.get("personalInfo") or {}
+    sections = []
+    for item in content.get("workExperience") or []:
+        sections.append(_join(item.get("title"), item.get("company"), item.get("location"), item.get("description")))
+    for item in content.get("education") or []:
+        sections.append(_join(item.get("degree"), item.get("field"), item.get("school"), item.get("description")))
+    sections.append(", ".join(s.get("name") for s in content.get("skills") or [] if s.get("name")))
+    for item in content.get("certifications") or []:
+        sections.append(_join(item.get("name"), item.get("issuer"), item.get("description")))
+    for item in content.get("others") or []:
+        sections.append(_join(item.get("title"), item.get("content") or item.get("description")))
+    name = " ".join(part for part in (profile.first_name, profile.last_name) if part)
+    title = _join(name, profile.job_sector).replace("\n", " - ") or content.get("title") or "Resume"
+    body = _join(
+        info.get("title"), info.get("city"), info.get("country"), content.get("title"), content.get("summary"), *sections
+    )
+    return title, body
+
+
+def _cover_letter_text(cover_letter):
+    content = cover_letter.content or {}
+    return cover_letter.title, _join(content.get("company"), content.get("jobTitle"), content.get("body"))
+
+
+def _application_text(application):
+    return application.job_title, _join(application.company, application.summary)
+
+
+# Model -> (document_type, primary key attribute, attributes feeding the index, text extractor)
+INDEXED = {
+    Profile: ("resume", "id", ("content", "first_name", "last_name", "job_sector"), _resume_text),
+    CoverLetter: ("cover_letter", "cover_id", ("content", "title"), _cover_letter_text),
+    Application: ("application", "app_id", ("job_title", "company", "summary"), _application_text),
+}
+
+
+def _rowid(connection, document_type, document_id):
+    return connection.execute(
+        select(_documents.c.id).where(
+            (_documents.c.document_type == document_type) & (_documents.c.document_id == document_id)
+        )
+    ).scalar()
+
+
+def _index(connection, document):
+    document_type, key, _, extract = INDEXED[type(document)]
+    document_id = getattr(document, key)
+    title, body = extract(document)
+    rowid = _rowid(connection, document_type, document_id)
+    if rowid is None:
+        rowid = connection.execute(
+            _documents.insert().values(
+                user_id=document.user_id, document_type=document_type, document_id=document_id
+            )
+        ).inserted_primary_key[0]
+    # Replaces the previous entry (or one left behind under a reused rowid)
+    connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {"rowid": rowid})
+    connection.execute(
+        text("INSERT INTO search_index (rowid, owner, title, body) VALUES (:rowid, :owner, :title, :body)"),
+        {"rowid": rowid, "owner": document.user_id, "title": title or "", "body": body or ""},
+    )
+
+
+def _unindex(connection, document):
+    document_type, key, _, _ = INDEXED[type(document)]
+    rowid = _rowid(connection, document_type, getattr(document, key))
+    if rowid is not None:
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {"rowid": rowid})
+        connection.execute(_documents.delete().where(_documents.c.id == rowid))
+
+
+def index_created(connection, model, documents):
+    """
+    Index documents inserted in bulk, which bypasses the after_flush hook.
+    `documents` are objects with the model's attributes (e.g. transient instances).
+    """
+    if not documents or not _ready(connection):
+        return
+    document_type, key, _, extract = INDEXED[model]
+    connection.execute(
+        _documents.insert(),
+        [{"user_id": d.user_id, "document_type": document_type, "document_id": getattr(d, key)} for d in documents],
+    )
+    rowids = dict(connection.execute(
+        select(_documents.c.document_id, _documents.c.id).where(
+            (_documents.c.document_type == document_type)
+            & _documents.c.document_id.in_([getattr(d, key) for d in documents])
+        )
+    ).all())
+    entries = []
+    for document in documents:
+        title, body = extract(document)
+        entries.append(
+            {"rowid": rowids[getattr(document, key)], "owner": document.user_id, "title": title or "", "body": body or ""}
+        )
+    connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), [{"rowid": e["rowid"]} for e in entries])
+    connection.execute(
+        text("INSERT INTO search_index (rowid, owner, title, body) VALUES (:rowid, :owner, :title, :body)"), entries
+    )
+
+
+def unindex_deleted(connection, model, document_ids):
+    """Remove documents deleted in bulk (which bypasses the after_flush hook) from the index"""
+    if not document_ids or not _ready(connection):
+        return
+    document_type = INDEXED[model][0]
+    where = (_documents.c.document_type == document_type) & _documents.c.document_id.in_(list(document_ids))
+    rowids = connection.execute(select(_documents.c.id).where(where)).scalars().all()
+    if rowids:
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), [{"rowid": r} for r in rowids])
+        connection.execute(_documents.delete().where(where))
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session, flush_context):
+    if not any(type(document) in INDEXED for document in (*session.new, *session.dirty, *session.deleted)):
+        return
+    if not _ready(session.connection()):
+        return
+    for document in list(session.new) + list(session.dirty):
+        spec = INDEXED.get(type(document))
+        if spec is None:
+            continue
+        # Soft deleting or restoring a document removes or re-adds it too
+        if document not in session.new and not any(
+            attributes.get_history(document, name).has_changes() for name in (*spec[2], "deleted_at")
+        ):
+            continue
+        if document.deleted_at:
+            _unindex(session.connection(), document)
+        else:
+            _index(session.connection(), document)
+    for document in session.deleted:
+        if type(document) in INDEXED:
+            _unindex(session.connection(), document)
+
+
+def _build_index(connection):
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "owner, title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    connection.execute(text("DELETE FROM search_index"))
+    connection.execute(_documents.delete())
+    # Read through the locked connection too: a second connection's open read would block the commit
+    session = Session(bind=connection)
+    count = 0
+    try:
+        for model in INDEXED:
+            query = session.query(model).filter(model.deleted_at.is_(None))
+            if hasattr(model, "content"):
+                query = query.options(undefer(model.content))
+            for document in query.yield_per(200):
+                _index(connection, document)
+                count += 1
+    finally:
+        session.close()
+    return count
+
+
+def create_search_index():
+    """Create the FTS5 index if it is missing and fill it from the existing documents"""
+    global _available
+    if db.engine.dialect.name != "sqlite":
+        print("[SEARCH] Full-text search needs SQLite FTS5; search is disabled")
+        _available = False
+        return
+    if _index_exists(db.session.connection()):
+        db.session.commit()
+        _available = True
+        return
+    db.session.commit()
+    with db.engine.connect() as connection:
+        # BEGIN IMMEDIATE takes the write lock before the table is looked for again, so a worker
+        # starting at the same moment waits here and then finds the index built
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            count = None if _index_exists(connection) else _build_index(connection)
+            connection.exec_driver_sql("COMMIT")
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+    if count is not None:
+        print(f"[SEARCH] Built the search index ({count} documents)")
+    _available = True
+
+
+def _match_expression(user_id, query):
+    """FTS5 query: every term (the last one as a prefix) in the title or body of the user's documents"""
+    terms = _TERM_RE.findall(query)[:MAX_TERMS]
+    if not terms:
+        raise SearchQueryError("Search query has no searchable words")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    owner = user_id.replace('"', '""')
+    return f'owner : "{owner}" AND {{title body}} : ({" AND ".join(quoted)})'
+
+
+def _marked(value):
+    return html.escape(value or "").replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def search(user_id, query, limit=DEFAULT_RESULTS, document_types=None):
+    """
+    Ranked matches for `query` among the user's documents, best first.
+
+    Each result has the document type and id, its title and a snippet of the
+    body around the matches, both HTML-escaped with matches wrapped in <mark>.
+    """
+    sql = (
+        "SELECT d.document_type, d.document_id, "
+        f"highlight(search_index, 1, :open, :close) AS title, "
+        f"snippet(search_index, 2, :open, :close, '…', 16) AS snippet, "
+        f"{RANK} AS rank "
+        "FROM search_index JOIN search_documents d ON d.id = search_index.rowid "
+        "WHERE search_index MATCH :match"
+    )
+    params = {"match": _match_expression(user_id, query), "open": _OPEN, "close": _CLOSE, "limit": limit}
+    if document_types:
+        names = [f":type{i}" for i in range(len(document_types))]
+        sql += f" AND d.document_type IN ({', '.join(names)})"
+        params.update({f"type{i}": name for i, name in enumerate(document_types)})
+    sql += " ORDER BY rank LIMIT :limit"
+    rows = db.session.execute(text(sql), params).all()
+    return [
+        {
+            "type": row.document_type,
+            "id": row.document_id,
+            "title": _marked(row.title),
+            "snippet": _marked(row.snippet),
+            "score": round(-row.rank, 4),
+        }
+        for row in rows
+    ]
+
+
+def search_available():
+    return _ready(db.session.connection())
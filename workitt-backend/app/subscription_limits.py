@@ -47,12 +47,13 @@ def get_user_subscription():
     """Get current user's subscription"""
     return Subscription.query.filter_by(user_id=current_user.id).first()
 
-def check_limit(resource_type):
+def check_limit(resource_type, requested=1):
     """
     Generic function to check if user can create more of a resource type
     
     Args:
         resource_type: One of 'resumes', 'cover_letters', 'applications', 'ai_generations'
+        requested: How many are about to be created (bulk imports check the whole batch at once)
     
     Returns:
         tuple: (can_create: bool, error_response: tuple or None)
@@ -80,7 +81,7 @@ def check_limit(resource_type):
         return True, None
     
     # Check if limit reached
-    if current_count >= limit:
+    if current_count + requested > limit:
         resource_name = RESOURCE_NAMES.get(resource_type, resource_type)
         plural_name = resource_type.replace("_", " ")
         
@@ -88,6 +89,7 @@ def check_limit(resource_type):
             "error": f"{resource_name.capitalize()} limit reached",
             "message": f"Your {subscription.plan_type} plan allows {limit} {plural_name}. Please upgrade to create more.",
             "current_count": current_count,
+            "requested": requested,
             "limit": limit,
             "plan_type": subscription.plan_type,
             "resource_type": resource_type
@@ -0,0 +1,68 @@
+"""
+Per-user cache of resume PDF uploads, keyed by the SHA-256 of the file bytes.
+
+Stores the extracted text and, once parsing succeeds, the parsed resume data so
+that re-uploading the same file skips both extraction and AI parsing. Entries
+are scoped to the uploading user and evicted least-recently-used first once a
+user exceeds the entry or byte limits.
+"""
+import hashlib
+import json
+import mmap
+from datetime import datetime
+from app.extensions import db
+from app.models import ResumeUploadCache
+
+# Per-user limits
+MAX_ENTRIES = 10
+MAX_BYTES = 2 * 1024 * 1024
+
+def file_digest(path):
+    """SHA-256 hex digest of an uploaded file, read through mmap"""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+def get_cached_upload(user_id, digest):
+    """Return the cache entry for this user's upload (marking it used) or None"""
+    entry = ResumeUploadCache.query.filter_by(user_id=user_id, digest=digest).first()
+    if entry:
+        entry.last_used_at = datetime.utcnow()
+        db.session.commit()
+    return entry
+
+def store_upload(user_id, digest, text, parsed=None):
+    """
+    Insert or update the cache entry for an upload and enforce the user's limits.
+    A previously parsed result is kept unless a new one is given.
+    """
+    entry = ResumeUploadCache.query.filter_by(user_id=user_id, digest=digest).first()
+    if not entry:
+        entry = ResumeUploadCache(user_id=user_id, digest=digest)
+        db.session.add(entry)
+    entry.text = text
+    if parsed is not None:
+        entry.parsed = parsed
+    entry.size = len(text.encode("utf-8")) + (len(json.dumps(entry.parsed)) if entry.parsed else 0)
+    entry.last_used_at = datetime.utcnow()
+    db.session.flush()
+    _evict(user_id)
+    db.session.commit()
+    return entry
+
+def _evict(user_id):
+    """Drop the user's least recently used entries beyond MAX_ENTRIES / MAX_BYTES"""
+    rows = (
+        db.session.query(ResumeUploadCache.id, ResumeUploadCache.size)
+        .filter_by(user_id=user_id)
+        .order_by(ResumeUploadCache.last_used_at.desc())
+        .all()
+    )
+    total = 0
+    stale = []
+    for position, (entry_id, size) in enumerate(rows):
+        total += size or 0
+        if position >= MAX_ENTRIES or (position > 0 and total > MAX_BYTES):
+            stale.append(entry_id)
+    if stale:
+        ResumeUploadCache.query.filter(ResumeUploadCache.id.in_(stale)).delete(synchronize_session=False)
@@ -0,0 +1,71 @@
+"""
+Streaming upload handling.
+
+File parts of multipart requests are written straight to named temporary files
+on disk instead of being buffered in memory, and MAX_CONTENT_LENGTH (see
+app/config.py) is enforced by Werkzeug while the body is being read. Routes
+that take a single PDF lower that limit for their request with
+limit_request_size(MAX_PDF_REQUEST). A route can
+declare the file signature it expects before touching request.files, so an
+upload of the wrong type is rejected as soon as its first bytes arrive instead
+of after the whole body has been received.
+"""
+import tempfile
+from flask import Request, request
+from werkzeug.exceptions import UnsupportedMediaType
+
+PDF_SIGNATURE = b"%PDF-"
+MAX_PDF_UPLOAD = 5 * 1024 * 1024
+MAX_PDF_REQUEST = MAX_PDF_UPLOAD + 1024 * 1024  # the file plus multipart overhead
+
+class SignatureCheckedFile:
+    """Temporary-file wrapper that validates the leading bytes as they are written"""
+
+    def __init__(self, file, signature):
+        self._file = file
+        self._signature = signature
+        self._head = b""
+
+    def write(self, data):
+        if len(self._head) < len(self._signature):
+            self._head += bytes(data[:len(self._signature) - len(self._head)])
+            if not self._signature.startswith(self._head):
+                raise UnsupportedMediaType("Uploaded file does not match the expected type")
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+class UploadRequest(Request):
+    """Request class that spools every uploaded file to a named temporary file"""
+
+    upload_signature = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        file = tempfile.NamedTemporaryFile("w+b", prefix="workitt-upload-")
+        if self.upload_signature:
+            return SignatureCheckedFile(file, self.upload_signature)
+        return file
+
+def expect_upload_signature(signature):
+    """Reject uploads in the current request whose content does not start with `signature`"""
+    request.upload_signature = signature
+
+def limit_request_size(max_length):
+    """Lower the body size limit of the current request (call before reading request.files or request.form)"""
+    request.max_content_length = max_length
+
+def spooled_path(file_storage):
+    """Path of the temporary file backing an uploaded file (deleted when the request ends)"""
+    file_storage.stream.flush()
+    return file_storage.stream.name
+
+def has_signature(file_storage, signature):
+    """Check the leading bytes of an upload (catches files too short for the streaming check)"""
+    file_storage.stream.seek(0)
+    head = file_storage.stream.read(len(signature))
+    file_storage.stream.seek(0)
+    return head == signature
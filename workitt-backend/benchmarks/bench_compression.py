@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Content compression benchmark.
+
+Stores the same resume documents in two throwaway SQLite databases, one with
+a plain JSON column and one with CompressedJSON (app/column_types.py), and
+reports the size of each database file and the time to write and read all
+documents.
+
+Usage:
+    python benchmarks/bench_compression.py [--count 2000]
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, "libs")
+import argparse
+import time
+from sqlalchemy import JSON, Column, Integer, MetaData, Table, create_engine, select, text
+from app.column_types import CompressedJSON, zstandard
+from utils.resume_import import from_json_resume
+from utils.resume_validation import normalize_resume_content
+
+WORKDIR = tempfile.mkdtemp(prefix="workitt-bench-")
+
+
+def resume(i):
+    return normalize_resume_content(from_json_resume({
+        "basics": {"name": f"Ada Lovelace{i}", "label": "Engineer", "email": "ada@example.com",
+                   "summary": f"Analyst {i} with a background in mathematics and computing machinery. " * 4},
+        "work": [
+            {"name": f"Company {j}", "position": "Engineer", "startDate": "2019-01", "endDate": "2021-06",
+             "summary": f"Built the difference engine tooling for team {j}. ", "highlights": ["Shipped", "Measured"]}
+            for j in range(5)
+        ],
+        "education": [{"institution": "University", "area": "Mathematics", "studyType": "BSc", "startDate": "2012"}],
+        "skills": [{"name": f"Skill {j}"} for j in range(15)],
+    }))
+
+
+def run(name, column_type, documents):
+    path = os.path.join(WORKDIR, f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    table = Table("documents", MetaData(), Column("id", Integer, primary_key=True), Column("content", column_type))
+    table.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [{"id": i, "content": d} for i, d in enumerate(documents)])
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        loaded = connection.execute(select(table.c.content)).scalars().all()
+    read = time.perf_counter() - start
+    assert loaded == documents
+
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    engine.dispose()
+    return os.path.getsize(path), write, read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    documents = [resume(i) for i in range(args.count)]
+    print(f"{args.count} resumes, codec: {'zstd' if zstandard is not None else 'zlib'}")
+    for name, column_type in (("json", JSON), ("compressed", CompressedJSON)):
+        size, write, read = run(name, column_type, documents)
+        print(f"{name:<11} {size / 1024:9.0f} KiB   write {write * 1e3:7.1f} ms   read {read * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
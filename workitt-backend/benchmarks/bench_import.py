@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Bulk resume import benchmark.
+
+Creates resumes one POST /api/resumes at a time and through a single
+POST /api/resumes/import of JSON Resume documents, against a throwaway SQLite
+database, and reports the time of each.
+
+Usage:
+    python benchmarks/bench_import.py [--count 100]
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, "libs")
+import argparse
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="workitt-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+
+import bcrypt
+from app import create_app
+from app.extensions import db
+from app.models import Subscription, User
+from utils.resume_import import from_json_resume
+
+
+def json_resume(i):
+    return {
+        "basics": {"name": f"Ada Lovelace{i}", "label": "Engineer", "email": "ada@example.com", "summary": "Analyst " * 40},
+        "work": [
+            {"name": f"Company {j}", "position": "Engineer", "startDate": "2019-01", "endDate": "2021-06",
+             "summary": "Built things. " * 20, "highlights": ["Shipped", "Measured"]}
+            for j in range(5)
+        ],
+        "education": [{"institution": "University", "area": "Mathematics", "studyType": "BSc", "startDate": "2012"}],
+        "skills": [{"name": f"Skill {j}"} for j in range(15)],
+    }
+
+
+def client(app, email):
+    with app.app_context():
+        user = User(username=email, email=email, password=bcrypt.hashpw(b"Password123*", bcrypt.gensalt(4)), verified=True)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Subscription(user_id=user.id, plan_type="premium", status="active"))
+        db.session.commit()
+    c = app.test_client()
+    assert c.post("/api/auth/login", json={"email": email, "password": "Password123*"}).status_code == 200
+    return c
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+
+    app = create_app()
+    documents = [json_resume(i) for i in range(args.count)]
+
+    one_by_one = client(app, "single@example.com")
+    one_by_one.post("/api/resumes", json={"content": from_json_resume(documents[0])})  # warm up
+    start = time.perf_counter()
+    for document in documents:
+        assert one_by_one.post("/api/resumes", json={"content": from_json_resume(document)}).status_code == 201
+    single = time.perf_counter() - start
+
+    bulk = client(app, "bulk@example.com")
+    start = time.perf_counter()
+    response = bulk.post("/api/resumes/import", json={"resumes": documents})
+    imported = time.perf_counter() - start
+    assert response.status_code == 201, response.get_json()
+
+    print(f"{args.count} x POST /api/resumes:       {single * 1e3:8.1f} ms ({single / args.count * 1e3:.1f} ms each)")
+    print(f"1 x POST /api/resumes/import ({args.count}): {imported * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
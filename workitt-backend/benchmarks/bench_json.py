@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+JSON response serialization benchmark.
+
+Times Flask's standard library provider (with the .isoformat() calls routes
+used to make) against FastJSONProvider on list responses of increasing size,
+and checks both decode to the same data. Also reports the peak size of a
+streamed list chunk against the size of the fully built body.
+
+Usage:
+    python benchmarks/bench_json.py [--repeat 20]
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, "libs")
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, orjson, stream_json
+from benchmarks.bench_validation import make_resume
+
+
+def make_list(count, items):
+    """A list response of `count` documents with `items` entries per resume section"""
+    stamp = datetime(2026, 1, 31, 12, 0, 0, 123456)
+    return [
+        {
+            "resume_id": f"r{i}",
+            "title": "Ada Lovelace - Engineer",
+            "created_at": stamp - timedelta(days=i),
+            "updated_at": stamp - timedelta(hours=i),
+            "content": make_resume(items),
+        }
+        for i in range(count)
+    ]
+
+
+def with_isoformat(entries):
+    """What routes built before the provider handled datetimes"""
+    return [
+        {**entry, "created_at": entry["created_at"].isoformat(), "updated_at": entry["updated_at"].isoformat()}
+        for entry in entries
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if orjson is None:
+        print("orjson is not installed: FastJSONProvider falls back to the standard library encoder")
+
+    app = Flask(__name__)
+    standard = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    print(f"{'response':<30} {'KiB':>8} {'stdlib ms':>10} {'fast ms':>10} {'speedup':>9}")
+    print("-" * 71)
+    for count, items in ((1, 5), (20, 5), (100, 5), (100, 20)):
+        entries = make_list(count, items)
+        body = {"resumes": entries}
+        old_body = {"resumes": with_isoformat(entries)}
+        assert json.loads(standard.dumps(old_body)) == json.loads(fast.dumps(body))
+        before = min(timeit.repeat(lambda: standard.dumps(old_body), number=args.repeat, repeat=3)) / args.repeat
+        after = min(timeit.repeat(lambda: fast.dump_bytes(body), number=args.repeat, repeat=3)) / args.repeat
+        size = len(fast.dump_bytes(body)) / 1024
+        print(f"{f'{count} resumes, {items} items/section':<30} {size:>8.0f} {before * 1e3:>10.2f} {after * 1e3:>10.2f} {before / after:>8.1f}x")
+
+    app.json = fast
+    entries = make_list(500, 5)
+    with app.test_request_context():
+        response = stream_json({"success": True}, "resumes", iter(entries))
+        chunks = list(response.response)
+    streamed = b"".join(chunks)
+    assert json.loads(streamed) == json.loads(fast.dumps({"success": True, "resumes": entries}))
+    print(f"\nstreamed 500 resumes: {len(streamed) / 1024:.0f} KiB in {len(chunks)} chunks, "
+          f"largest chunk {max(len(c) for c in chunks) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
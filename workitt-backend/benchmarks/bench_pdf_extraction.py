@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+PDF extraction benchmark.
+
+Runs every extraction backend over a corpus of sample resumes and reports
+throughput and how closely each backend's text matches the pdfplumber output.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py path/to/resumes [--repeat 3] [--pool]
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, "libs")
+import argparse
+import time
+from difflib import SequenceMatcher
+from utils.pdf_backends import BACKENDS, text_quality
+
+REFERENCE = "pdfplumber"
+EQUIVALENT = 0.98  # word-sequence similarity at which two extractions count as equivalent
+
+
+def similarity(a, b):
+    """Similarity of the word sequences of two texts (whitespace differences ignored)"""
+    a_words, b_words = a.split(), b.split()
+    if not a_words and not b_words:
+        return 1.0
+    return SequenceMatcher(None, a_words, b_words, autojunk=False).ratio()
+
+
+def extract_in_process(backend, data):
+    pages = backend.extract_pages(data, 1, backend.page_count(data))
+    return "\n".join(page.strip() for page in pages if page.strip())
+
+
+def run(corpus, repeat, use_pool):
+    files = sorted(Path(corpus).rglob("*.pdf"))
+    if not files:
+        print(f"No PDFs found in {corpus}")
+        return
+    documents = [(f.name, f.read_bytes()) for f in files]
+    total_bytes = sum(len(data) for _, data in documents)
+    page_counts = {name: BACKENDS[REFERENCE].page_count(data) for name, data in documents}
+    total_pages = sum(page_counts.values())
+    print(f"Corpus: {len(documents)} PDFs, {total_pages} pages, {total_bytes / 1e6:.2f} MB, repeat={repeat}\n")
+
+    if use_pool:
+        from utils.pdf_extraction import extract_pdf_text
+
+        def extract(name, data):
+            return extract_pdf_text(data, backend=name, fallback="")
+    else:
+        def extract(name, data):
+            return extract_in_process(BACKENDS[name], data)
+
+    texts = {}
+    print(f"{'backend':<12} {'seconds':>9} {'pages/s':>9} {'MB/s':>8} {'quality':>8} {'sim(mean)':>10} {'sim(min)':>9} {'equiv':>7}")
+    print("-" * 78)
+    for name in [REFERENCE] + [n for n in BACKENDS if n != REFERENCE]:
+        failures = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for doc, data in documents:
+                try:
+                    texts[(name, doc)] = extract(name, data)
+                except Exception as e:
+                    failures += 1
+                    texts[(name, doc)] = ""
+                    print(f"  ! {name} failed on {doc}: {e}")
+        elapsed = (time.perf_counter() - start) / repeat
+
+        sims = [similarity(texts[(name, doc)], texts[(REFERENCE, doc)]) for doc, _ in documents]
+        quality = sum(text_quality(texts[(name, doc)]) for doc, _ in documents) / len(documents)
+        equivalent = sum(1 for s in sims if s >= EQUIVALENT)
+        print(
+            f"{name:<12} {elapsed:>9.3f} {total_pages / elapsed:>9.1f} {total_bytes / 1e6 / elapsed:>8.2f} "
+            f"{quality:>8.3f} {sum(sims) / len(sims):>10.3f} {min(sims):>9.3f} {equivalent:>3}/{len(documents):<3}"
+        )
+
+    print(f"\nsim = word-sequence similarity to {REFERENCE}; equiv = documents with sim >= {EQUIVALENT}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction backends")
+    parser.add_argument("corpus", help="Directory containing sample resume PDFs")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per backend")
+    parser.add_argument("--pool", action="store_true", help="Measure through the extraction process pool")
+    args = parser.parse_args()
+    run(args.corpus, args.repeat, args.pool)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Resume and cover letter validation microbenchmark.
+
+Times a plain marshmallow load (a new schema per call, as the validators used
+to do) against the compiled validators on documents of increasing size.
+
+Usage:
+    python benchmarks/bench_validation.py [--repeat 200]
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, "libs")
+import argparse
+import timeit
+from utils.resume_validation import ResumeContentSchema, validate_resume_data
+from utils.cover_letter_validation import CoverLetterDataSchema, validate_cover_letter_data
+
+
+def make_resume(items):
+    """A resume with `items` entries in each list section"""
+    text = "Led a team of engineers building a platform used by thousands of customers. " * 5
+    return {
+        "personalInfo": {"firstName": "Ada", "lastName": "Lovelace", "email": "ada@example.com", "city": "London"},
+        "summary": text,
+        "workExperience": [
+            {"id": f"w{i}", "title": "Engineer", "company": "Acme", "startDate": "2020-01",
+             "endDate": "Present", "current": i == 0, "description": text}
+            for i in range(items)
+        ],
+        "education": [{"id": f"e{i}", "school": "University", "degree": "BSc", "field": "CS"} for i in range(items)],
+        "skills": [{"id": f"s{i}", "name": f"Skill {i}", "level": "Expert"} for i in range(items * 3)],
+        "certifications": [{"id": f"c{i}", "name": "Cert", "issuer": "Org", "date": "2021-05"} for i in range(items)],
+        "links": [{"id": f"l{i}", "label": "GitHub", "linkUrl": "https://github.com/ada"} for i in range(items)],
+        "others": [{"id": f"o{i}", "title": "Volunteering", "content": text} for i in range(items)],
+        "sectionOrder": ["summary", "workExperience", "education", "skills", "certifications", "links", "others"],
+        "style": {"fontSize": 11, "paperSize": "a4"},
+        "visibility": {"personalInfo": {"email": True}, "summary": True, "skills": True},
+        "title": "Engineer",
+        "templateId": "modern",
+    }
+
+
+COVER_LETTER = {
+    "title": "Application",
+    "jobTitle": "Engineer",
+    "company": "Acme",
+    "contact": {"name": "Ada", "email": "ada@example.com"},
+    "visibility": {"company": True},
+    "style": {"fontSize": 11, "margins": 8},
+    "body": "Dear hiring manager, " * 200,
+}
+
+
+def bench(label, baseline, compiled, data, repeat):
+    assert baseline(data) == compiled(data)
+    before = min(timeit.repeat(lambda: baseline(data), number=repeat, repeat=3)) / repeat
+    after = min(timeit.repeat(lambda: compiled(data), number=repeat, repeat=3)) / repeat
+    print(f"{label:<28} {before * 1e6:>12.1f} {after * 1e6:>12.1f} {before / after:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'document':<28} {'marshmallow us':>12} {'compiled us':>12} {'speedup':>9}")
+    print("-" * 64)
+    for items in (1, 5, 20, 50):
+        bench(f"resume ({items} items/section)", lambda d: ResumeContentSchema().load(d),
+              validate_resume_data, make_resume(items), args.repeat)
+    bench("cover letter", lambda d: CoverLetterDataSchema().load(d),
+          validate_cover_letter_data, COVER_LETTER, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
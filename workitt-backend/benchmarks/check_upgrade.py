@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Upgrade check: a database written by an older release keeps its resumes.
+
+Checks out the older release (by default the first commit of the
+repository) into a temporary directory, creates a user with a resume and a
+cover letter there, then starts the current code on that database with
+RESUME_SECTION_STORAGE on and off in turn, and checks after each start that
+every resume section came through (and that with section storage on the
+sections are stored as resume_section_items rows).
+
+Usage:
+    python benchmarks/check_upgrade.py [--baseline <git revision>]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+CONTENT = {
+    "personalInfo": {"firstName": "Ada", "lastName": "Lovelace", "email": "ada@example.com"},
+    "title": "Engineer",
+    "summary": "Writes programs",
+    "workExperience": [
+        {"title": "Analyst", "company": "Engines Ltd", "startDate": "2019-01", "endDate": "2021-06", "description": "Notes"},
+        {"title": "Lead", "company": "Babbage & Co", "startDate": "2021-07", "current": True, "description": "Loops"},
+    ],
+    "education": [{"degree": "BSc", "field": "Mathematics", "school": "London", "startDate": "2015", "endDate": "2018"}],
+    "skills": [{"name": "Python", "level": "expert"}, {"name": "SQL", "level": "intermediate"}],
+    "certifications": [{"name": "Cert", "issuer": "Society"}],
+    "links": [{"label": "Site", "url": "https://example.com"}],
+    "others": [{"title": "Languages", "content": "French"}],
+}
+SECTIONS = ("workExperience", "education", "skills", "certifications", "links", "others")
+
+# Runs in the old release: create the tables and one user with a resume and a cover letter
+CREATE = """
+import json, sys
+sys.path.insert(0, ".")
+from app import create_app
+from app.extensions import db
+from app.models import CoverLetter, Profile, User
+app = create_app()
+with app.app_context():
+    db.create_all()
+    user = User(username="ada", email="ada@example.com", password=b"x", verified=True)
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Profile(user_id=user.id, first_name="Ada", last_name="Lovelace", content=json.loads(sys.argv[1])))
+    db.session.add(CoverLetter(user_id=user.id, title="Letter", content={"body": "Dear reader"}))
+    db.session.commit()
+"""
+
+# Runs in the current code: start the app (upgrade and conversion) and report what a resume reads back as
+READ = """
+import json, sys
+sys.path.insert(0, ".")
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+from app.models import CoverLetter, Profile
+app = create_app()
+with app.app_context():
+    profile = Profile.query.one()
+    print(json.dumps({
+        "content": profile.content,
+        "items": db.session.execute(text("SELECT count(*) FROM resume_section_items")).scalar(),
+        "cover_letter": CoverLetter.query.one().content,
+    }))
+"""
+
+
+def _run(cwd, script, database, *args, section_storage=None):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}"}
+    if section_storage is not None:
+        env["RESUME_SECTION_STORAGE"] = "true" if section_storage else "false"
+    result = subprocess.run(
+        [sys.executable, "-c", script, *args], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        sys.exit(f"Failed in {cwd}:\n{result.stderr}")
+    return result.stdout
+
+
+def _problems(content):
+    problems = []
+    for section in SECTIONS:
+        items = content.get(section) or []
+        if len(items) != len(CONTENT[section]):
+            problems.append(f"{section}: {len(items)} items instead of {len(CONTENT[section])}")
+            continue
+        for expected, item in zip(CONTENT[section], items):
+            missing = [key for key, value in expected.items() if isinstance(value, str) and item.get(key) != value]
+            if missing:
+                problems.append(f"{section}: {', '.join(missing)} changed")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", help="git revision of the old release (default: the first commit)")
+    args = parser.parse_args()
+    baseline = args.baseline or subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=BACKEND, capture_output=True, text=True, check=True
+    ).stdout.split()[0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old = Path(tmp) / "old"
+        old.mkdir()
+        archive = subprocess.run(
+            ["git", "archive", baseline, "."], cwd=BACKEND, capture_output=True, check=True
+        ).stdout
+        subprocess.run(["tar", "-x", "-C", str(old)], input=archive, check=True)
+        database = Path(tmp) / "upgrade.db"
+        _run(old, CREATE, database, json.dumps(CONTENT))
+        print(f"Created a resume with {baseline[:10]}")
+
+        failed = False
+        for section_storage in (True, False, True):
+            state = json.loads(_run(BACKEND, READ, database, section_storage=section_storage).splitlines()[-1])
+            problems = _problems(state["content"])
+            if section_storage and state["items"] != sum(len(CONTENT[s]) for s in SECTIONS):
+                problems.append(f"{state['items']} rows in resume_section_items")
+            if not section_storage and state["items"]:
+                problems.append(f"{state['items']} rows left in resume_section_items")
+            if state["cover_letter"] != {"body": "Dear reader"}:
+                problems.append("cover letter content changed")
+            label = f"RESUME_SECTION_STORAGE={'true' if section_storage else 'false'}"
+            print(f"{label}: {'ok' if not problems else '; '.join(problems)}")
+            failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
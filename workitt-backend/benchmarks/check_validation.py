@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Differential check of the compiled validators against marshmallow.
+
+Generates random resume and cover letter payloads (valid documents with
+fields swapped for values of the wrong type, over-long strings, special
+numbers, unknown keys and missing sections) and checks that:
+
+- whenever the compiled fast path accepts a payload, marshmallow accepts it
+  too and returns an identical result (same keys, order, values and types)
+- validate_resume_data / validate_cover_letter_data behave exactly like a
+  plain marshmallow load, errors included
+
+Usage:
+    python benchmarks/check_validation.py [--iterations 20000] [--seed 1]
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, "libs")
+import argparse
+import copy
+import random
+from marshmallow import ValidationError
+from utils.fast_validation import _Invalid
+from utils.resume_validation import ResumeContentSchema, validate_resume_data, _compiled_resume_schema
+from utils.cover_letter_validation import (
+    CoverLetterDataSchema,
+    validate_cover_letter_data,
+    _compiled_cover_letter_schema,
+)
+
+ODD_VALUES = [
+    None, True, False, 0, 1, -3, 2.5, 9, 14, 16, 1e308, 10 ** 400, float("nan"), float("inf"),
+    "", "x", "1", "0", "true", "False", "yes", "off", "11.5", "#12abEF", "#zzzzzz", "letter",
+    "center", "font-mono", "a" * 50, "a" * 51, "a" * 100, "a" * 101, "a" * 200, "a" * 201,
+    "a" * 500, "a" * 501, "a" * 5001, "a" * 10001, b"bytes", [], ["x"], [{}], {}, {"k": True},
+    {"k": "yes"}, {1: True}, ("t",),
+]
+
+
+def sample_resume(rng):
+    def text(limit):
+        return "w" * rng.randint(0, limit)
+    return {
+        "personalInfo": {"firstName": text(30), "lastName": text(30), "email": text(40), "extra": "ignored"},
+        "summary": text(400),
+        "workExperience": [
+            {"id": str(i), "title": text(50), "company": text(50), "current": rng.random() < 0.3,
+             "description": text(2000), "ui": {"open": True}}
+            for i in range(rng.randint(0, 12))
+        ],
+        "education": [{"school": text(50), "degree": text(50), "field": text(30)} for _ in range(rng.randint(0, 4))],
+        "skills": [{"name": text(20), "level": "Expert"} for _ in range(rng.randint(0, 30))],
+        "certifications": [{"name": text(40), "date": "2021-05"} for _ in range(rng.randint(0, 5))],
+        "links": [{"label": "GitHub", "linkUrl": "https://github.com/x"} for _ in range(rng.randint(0, 4))],
+        "others": [{"title": text(30), "content": text(500)} for _ in range(rng.randint(0, 3))],
+        "sectionOrder": ["summary", "workExperience", "education", "skills"],
+        "style": {"fontSize": rng.choice([10, 11.5]), "paperSize": "letter", "lineSpacing": 1},
+        "visibility": {"personalInfo": {"email": True}, "summary": True, "skills": False},
+        "title": text(60),
+        "templateId": "modern",
+    }
+
+
+def sample_cover_letter(rng):
+    return {
+        "title": "w" * rng.randint(0, 100),
+        "templateId": "default",
+        "jobTitle": "Engineer",
+        "company": "Acme",
+        "date": "2026-01-01",
+        "contact": {"name": "A", "email": "a@b.c", "visibility": {"name": True, "phone": False}},
+        "visibility": {"company": True, "date": False},
+        "style": {"fontFamily": "font-serif", "fontSize": 12, "fontColor": "#112233", "margins": 10},
+        "body": "w" * rng.randint(0, 4000),
+        "unknownTopLevel": 1,
+    }
+
+
+def locations(value):
+    """Every (container, key) pair in a JSON-like document"""
+    if isinstance(value, dict):
+        for key in list(value):
+            yield value, key
+            yield from locations(value[key])
+    elif isinstance(value, list):
+        for index in range(len(value)):
+            yield value, index
+            yield from locations(value[index])
+
+
+def mutate(document, rng):
+    document = copy.deepcopy(document)
+    for _ in range(rng.randint(0, 3)):
+        spots = list(locations(document))
+        if not spots:
+            break
+        container, key = rng.choice(spots)
+        action = rng.random()
+        if action < 0.7:
+            container[key] = copy.deepcopy(rng.choice(ODD_VALUES))
+        elif action < 0.85 and isinstance(container, dict):
+            del container[key]
+        elif isinstance(container, dict):
+            container[rng.choice(["bogus", "id", "level", "paperSize"])] = copy.deepcopy(rng.choice(ODD_VALUES))
+    if rng.random() < 0.05:
+        document = copy.deepcopy(rng.choice(ODD_VALUES))
+    return document
+
+
+def outcome(load, data):
+    try:
+        return "ok", repr(load(data))
+    except ValidationError as err:
+        return "error", repr(err.messages)
+
+
+def check(name, schema_class, compiled, validate_function, sample, iterations, rng):
+    reference = schema_class()
+    fast = accepted = 0
+    for i in range(iterations):
+        data = sample(rng) if i % 4 == 0 else mutate(sample(rng), rng)
+        expected = outcome(reference.load, copy.deepcopy(data))
+        if expected[0] == "ok":
+            accepted += 1
+        if isinstance(data, dict):
+            try:
+                result = compiled._load(copy.deepcopy(data))
+            except _Invalid:
+                pass
+            else:
+                fast += 1
+                if ("ok", repr(result)) != expected:
+                    print(f"{name}: fast path disagrees with marshmallow\n  input: {data!r}\n  fast: {result!r}\n  marshmallow: {expected}")
+                    return False
+        actual = outcome(validate_function, copy.deepcopy(data))
+        if actual != expected:
+            print(f"{name}: validator disagrees with marshmallow\n  input: {data!r}\n  got: {actual}\n  expected: {expected}")
+            return False
+    print(f"{name}: {iterations} payloads, {accepted} valid, {fast} taken by the fast path, no differences")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    ok = check("resume", ResumeContentSchema, _compiled_resume_schema, validate_resume_data,
+               sample_resume, args.iterations, rng)
+    ok = check("cover letter", CoverLetterDataSchema, _compiled_cover_letter_schema, validate_cover_letter_data,
+               sample_cover_letter, args.iterations, rng) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# utils/application_import.py
+"""
+Job application import from spreadsheets.
+
+Reads the rows of an uploaded CSV or XLSX file one at a time (XLSX through
+openpyxl's read-only mode, when it is installed), so memory use does not
+depend on the size of the file. Column headers are matched against common
+spreadsheet names ("Company", "Position", "Date applied", ...) and each row
+is mapped to the fields of ApplicationDataSchema; the result still has to go
+through validate_application_data().
+"""
+import codecs
+import csv
+import re
+from datetime import date, datetime
+
+try:
+    import openpyxl
+except ImportError:  # XLSX import is unavailable
+    openpyxl = None
+
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+# Application field -> accepted column headers (compared lowercased, without punctuation)
+COLUMN_ALIASES = {
+    "job_title": ("job title", "title", "position", "role", "job"),
+    "company": ("company", "company name", "employer", "organization", "organisation"),
+    "job_link": ("job link", "link", "url", "job url", "posting", "job posting"),
+    "summary": ("summary", "notes", "note", "description", "comments"),
+    "status": ("status", "stage", "state"),
+    "applied_at": ("date applied", "applied on", "applied", "date", "application date"),
+}
+
+# Spreadsheet status wording -> application status
+STATUS_ALIASES = {
+    "applied": "applied", "submitted": "applied", "sent": "applied", "pending": "applied",
+    "interview": "interview", "interviewing": "interview", "interviewed": "interview", "screening": "interview",
+    "offer": "offer", "offered": "offer", "accepted": "offer",
+    "rejected": "rejected", "declined": "rejected", "no": "rejected", "ghosted": "rejected",
+}
+
+_HEADER_RE = re.compile(r"[^a-z0-9]+")
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be read as a spreadsheet of applications"""
+
+
+def _header_key(value):
+    return _HEADER_RE.sub(" ", str(value or "").lower()).strip()
+
+
+def _columns(header):
+    """{column index: field} for a header row"""
+    aliases = {alias: field for field, names in COLUMN_ALIASES.items() for alias in names}
+    columns = {}
+    for index, name in enumerate(header):
+        field = aliases.get(_header_key(name))
+        if field and field not in columns.values():
+            columns[index] = field
+    if "company" not in columns.values() or "job_title" not in columns.values():
+        raise ImportFormatError("The first row must name the columns, including a company and a job title column")
+    return columns
+
+
+def _csv_rows(path):
+    with open(path, "rb") as raw:
+        text = codecs.getreader("utf-8-sig")(raw, errors="replace")
+        reader = csv.reader(text)
+        try:
+            yield from reader
+        except csv.Error as e:
+            raise ImportFormatError(f"Not a readable CSV file (line {reader.line_num}: {e})")
+
+
+def _xlsx_rows(path):
+    if openpyxl is None:
+        raise ImportFormatError("XLSX import is not available on this server; upload a CSV file instead")
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFormatError("Not a readable XLSX file")
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _applied_at(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError("Unrecognized date (use YYYY-MM-DD)")
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_applications(path, filename):
+    """
+    Yield (row number, data, errors) for every non-empty row of the file, one
+    at a time. `data` holds the application fields, `errors` the values that
+    could not be mapped (None if there are none). Row numbers are those a
+    spreadsheet shows (the header is row 1).
+    """
+    if filename.lower().endswith(".xlsx"):
+        rows = _xlsx_rows(path)
+    elif filename.lower().endswith(".csv"):
+        rows = _csv_rows(path)
+    else:
+        raise ImportFormatError("Only .csv and .xlsx files can be imported")
+
+    header = next(rows, None)
+    if header is None:
+        raise ImportFormatError("The file is empty")
+    columns = _columns(header)
+
+    for number, row in enumerate(rows, start=2):
+        values = {field: row[index] for index, field in columns.items() if index < len(row)}
+        if not any(_cell(value) for value in values.values()):
+            continue
+        data, errors = {}, {}
+        for field, value in values.items():
+            if field == "applied_at":
+                if _cell(value):
+                    try:
+                        data["applied_at"] = _applied_at(value)
+                    except ValueError as e:
+                        errors[field] = [str(e)]
+            elif field == "status":
+                status = _cell(value).lower()
+                if status:
+                    data["status"] = STATUS_ALIASES.get(status, status)
+            else:
+                data[field] = _cell(value) or (None if field in ("job_link", "summary") else "")
+        yield number, data, errors or None
@@ -0,0 +1,28 @@
+# utils/application_validation.py
+from marshmallow import Schema, fields, validate, ValidationError, EXCLUDE
+from utils.fast_validation import CompiledSchema
+
+APPLICATION_STATUSES = ("applied", "interview", "offer", "rejected")
+
+class ApplicationDataSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    job_title = fields.Str(validate=validate.Length(min=1, max=200), required=True)
+    company = fields.Str(validate=validate.Length(min=1, max=200), required=True)
+    job_link = fields.Str(validate=validate.Length(max=2000), allow_none=True)
+    summary = fields.Str(validate=validate.Length(max=10000), allow_none=True)
+    status = fields.Str(validate=validate.OneOf(APPLICATION_STATUSES), load_default="applied")
+
+    # Resume and cover letter used (ownership is checked by the route)
+    profile_id = fields.Str(allow_none=True)
+    cover_letter_id = fields.Str(allow_none=True)
+
+
+_compiled_application_schema = CompiledSchema(ApplicationDataSchema)
+
+def validate_application_data(data):
+    """
+    Validate application data and return cleaned data or raise ValidationError
+    """
+    return _compiled_application_schema.load(data)
@@ -1,5 +1,6 @@
 # utils/cover_letter_validation.py
 from marshmallow import Schema, fields, validate, ValidationError, EXCLUDE
+from utils.fast_validation import CompiledSchema
 
 class ContactVisibilitySchema(Schema):
     class Meta:
@@ -93,9 +94,10 @@ class CoverLetterDataSchema(Schema):
     aiPrompt = fields.Str(validate=validate.Length(max=500), allow_none=True)
 
 
+_compiled_cover_letter_schema = CompiledSchema(CoverLetterDataSchema)
+
 def validate_cover_letter_data(data):
     """
     Validate cover letter data and return cleaned data or raise ValidationError
     """
-    schema = CoverLetterDataSchema()
-    return schema.load(data)
+    return _compiled_cover_letter_schema.load(data)
@@ -0,0 +1,221 @@
+# utils/fast_validation.py
+"""
+Compiled fast path for marshmallow schemas.
+
+CompiledSchema turns a schema class into a tree of plain closures, once, at
+import time. Loading valid data then costs a few dict lookups and type checks
+per field instead of marshmallow's per-call schema construction, error store
+and hook machinery.
+
+The compiled loader only ever accepts data that marshmallow accepts, with the
+same result: the common JSON types (str, bool, int, float, list, dict) are
+handled inline, anything else is handed to the marshmallow field itself.
+Invalid data never produces errors of its own; the document is simply loaded
+again with the marshmallow schema, so error messages stay exactly
+marshmallow's. Fields or schemas using features the compiler does not know
+are delegated to marshmallow as a whole.
+"""
+import math
+from marshmallow import EXCLUDE, RAISE, ValidationError, fields, validate
+from marshmallow.utils import missing
+
+
+class _Invalid(Exception):
+    """The fast path rejected the data; marshmallow will produce the errors"""
+
+
+class _Unsupported(Exception):
+    """The schema uses a feature the compiler does not handle"""
+
+
+def _delegate(field):
+    """Load a value through the marshmallow field itself"""
+    def load(value):
+        try:
+            return field.deserialize(value)
+        except ValidationError:
+            raise _Invalid()
+    return load
+
+
+def _compile_validators(field):
+    """One callable running all of the field's validators (None if there are none)"""
+    checks = []
+    for validator in field.validators:
+        if (
+            type(validator) is validate.Length
+            and validator.min is None
+            and validator.equal is None
+            and validator.max is not None
+        ):
+            limit = validator.max
+
+            def check(value, limit=limit):
+                if len(value) > limit:
+                    raise _Invalid()
+        else:
+            def check(value, validator=validator):
+                try:
+                    validator(value)
+                except ValidationError:
+                    raise _Invalid()
+        checks.append(check)
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value):
+        for check in checks:
+            check(value)
+    return check_all
+
+
+def _compile_field(field):
+    """Loader for a present (not missing) value of `field`"""
+    if getattr(field, "pre_load", None) or getattr(field, "post_load", None):
+        return _delegate(field)
+    kind = type(field)
+    slow = _delegate(field)
+    check = _compile_validators(field)
+    allow_none = field.allow_none
+
+    if kind is fields.String:
+        def convert(value):
+            if type(value) is not str:
+                return slow(value)
+            if check:
+                check(value)
+            return value
+    elif kind is fields.Boolean:
+        def convert(value):
+            if value is not True and value is not False:
+                return slow(value)
+            if check:
+                check(value)
+            return value
+    elif kind is fields.Float:
+        allow_nan = field.allow_nan
+
+        def convert(value):
+            if type(value) is not float and type(value) is not int:
+                return slow(value)
+            try:
+                number = float(value)
+            except OverflowError:
+                raise _Invalid()
+            if not allow_nan and (math.isnan(number) or math.isinf(number)):
+                raise _Invalid()
+            if check:
+                check(number)
+            return number
+    elif kind is fields.Integer:
+        def convert(value):
+            if type(value) is not int:
+                return slow(value)
+            if check:
+                check(value)
+            return value
+    elif kind is fields.List:
+        inner = _compile_field(field.inner)
+
+        def convert(value):
+            if type(value) is not list:
+                return slow(value)
+            result = [inner(item) for item in value]
+            if check:
+                check(result)
+            return result
+    elif kind is fields.Dict:
+        keys = _compile_field(field.key_field) if field.key_field else None
+        values = _compile_field(field.value_field) if field.value_field else None
+
+        def convert(value):
+            if not isinstance(value, dict):
+                return slow(value)
+            result = {
+                (keys(k) if keys else k): (values(v) if values else v)
+                for k, v in value.items()
+            }
+            if check:
+                check(result)
+            return result
+    elif kind is fields.Nested and not field.many and field.only is None and not field.exclude:
+        try:
+            nested = _compile_schema(field.schema, field.unknown)
+        except _Unsupported:
+            return slow
+
+        def convert(value):
+            if not isinstance(value, dict):
+                return slow(value)
+            result = nested(value)
+            if check:
+                check(result)
+            return result
+    else:
+        return slow
+
+    def load(value):
+        if value is None:
+            if allow_none:
+                return None
+            raise _Invalid()
+        return convert(value)
+    return load
+
+
+def _compile_schema(schema, unknown=None):
+    """Loader for one object of `schema`, mirroring Schema.load"""
+    if any(schema._hooks.values()):
+        raise _Unsupported(f"{type(schema).__name__} has processing hooks")
+    unknown = unknown or schema.unknown
+    if unknown not in (RAISE, EXCLUDE):
+        raise _Unsupported(f"unknown={unknown} is not supported")
+
+    entries = []
+    for name, field in schema.load_fields.items():
+        key = field.data_key if field.data_key is not None else name
+        entries.append((key, field.attribute or name, _compile_field(field), field.required, field.load_default))
+    known = frozenset(key for key, *_ in entries)
+    raise_unknown = unknown == RAISE
+
+    def load(data):
+        if raise_unknown and not known.issuperset(data):
+            raise _Invalid()
+        result = {}
+        for key, attribute, convert, required, default in entries:
+            if key in data:
+                result[attribute] = convert(data[key])
+            elif required:
+                raise _Invalid()
+            elif default is not missing:
+                result[attribute] = default() if callable(default) else default
+        return result
+    return load
+
+
+class CompiledSchema:
+    """
+    A marshmallow schema with a compiled loader for the valid-data fast path.
+
+    load() returns the same result as schema.load() and raises the same
+    ValidationError.
+    """
+
+    def __init__(self, schema_class):
+        self.schema = schema_class()
+        try:
+            self._load = _compile_schema(self.schema)
+        except _Unsupported as e:
+            print(f"[VALIDATION] {schema_class.__name__} not compiled: {e}")
+            self._load = None
+
+    def load(self, data):
+        if self._load is not None and isinstance(data, dict):
+            try:
+                return self._load(data)
+            except _Invalid:
+                pass
+        # Invalid (or uncompiled): marshmallow produces the result or the errors
+        return self.schema.load(data)
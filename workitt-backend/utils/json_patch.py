@@ -0,0 +1,238 @@
+# utils/json_patch.py
+"""
+JSON Patch (RFC 6902) with JSON Pointer (RFC 6901) paths.
+
+apply_patch() never modifies its input. Each operation copies only the
+containers on the path it touches, so everything the patch did not touch is
+still the very same object as in the original document. Callers can use that
+identity to re-validate just the changed parts.
+
+make_patch() computes the patch between two documents (used for revision
+history deltas).
+"""
+import copy
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or cannot be applied to the document"""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A "test" operation did not match the document"""
+
+
+def parse_pointer(pointer):
+    """Split a JSON Pointer into its unescaped reference tokens"""
+    if not isinstance(pointer, str):
+        raise JsonPatchError("Path must be a string")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid path: {pointer}")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _index(container, token, pointer, allow_end=False):
+    """List index for a reference token; allow_end accepts len(container) and "-" (for add)"""
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index in path: {pointer}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {pointer}")
+    return index
+
+
+def _child(container, token, pointer):
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path does not exist: {pointer}")
+        return token
+    if isinstance(container, list):
+        return _index(container, token, pointer)
+    raise JsonPatchError(f"Path does not exist: {pointer}")
+
+
+def resolve(document, pointer):
+    """Value at a JSON Pointer"""
+    value = document
+    for token in parse_pointer(pointer):
+        value = value[_child(value, token, pointer)]
+    return value
+
+
+def _edit(document, tokens, pointer, edit):
+    """
+    Copy of `document` with edit(parent, token) applied to the parent of the
+    target location. Only the containers on the path are copied.
+    """
+    if isinstance(document, dict):
+        parent = dict(document)
+    elif isinstance(document, list):
+        parent = list(document)
+    else:
+        raise JsonPatchError(f"Path does not exist: {pointer}")
+    if len(tokens) == 1:
+        edit(parent, tokens[0])
+    else:
+        key = _child(parent, tokens[0], pointer)
+        parent[key] = _edit(parent[key], tokens[1:], pointer, edit)
+    return parent
+
+
+def _add(document, pointer, value):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return value
+
+    def edit(parent, token):
+        if isinstance(parent, dict):
+            parent[token] = value
+        else:
+            parent.insert(_index(parent, token, pointer, allow_end=True), value)
+
+    return _edit(document, tokens, pointer, edit)
+
+
+def _remove(document, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+
+    def edit(parent, token):
+        del parent[_child(parent, token, pointer)]
+
+    return _edit(document, tokens, pointer, edit)
+
+
+def _replace(document, pointer, value):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return value
+
+    def edit(parent, token):
+        parent[_child(parent, token, pointer)] = value
+
+    return _edit(document, tokens, pointer, edit)
+
+
+def _json_equal(a, b):
+    """Equality by JSON rules: true is not 1, and 1 equals 1.0"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    return type(a) is type(b) and a == b
+
+
+def _member(operation, name):
+    if name not in operation:
+        raise JsonPatchError(f'"{operation["op"]}" operation requires "{name}"')
+    return operation[name]
+
+
+def apply_operation(document, operation):
+    """Apply one operation and return the new document"""
+    if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+        raise JsonPatchError(f"Invalid operation: {operation}")
+    op = operation["op"]
+    path = _member(operation, "path")
+
+    if op == "add":
+        return _add(document, path, _member(operation, "value"))
+    if op == "remove":
+        return _remove(document, path)
+    if op == "replace":
+        return _replace(document, path, _member(operation, "value"))
+    if op == "test":
+        if not _json_equal(resolve(document, path), _member(operation, "value")):
+            raise JsonPatchTestFailed(f"Test failed at {path}")
+        return document
+
+    source = _member(operation, "from")
+    value = resolve(document, source)
+    if op == "copy":
+        return _add(document, path, copy.deepcopy(value))
+    # move
+    if path == source:
+        return document
+    if path.startswith(source + "/"):
+        raise JsonPatchError(f"Cannot move {source} into its own child {path}")
+    return _add(_remove(document, source), path, value)
+
+
+def apply_patch(document, operations):
+    """
+    Apply a JSON Patch to `document` and return the patched copy.
+
+    All or nothing: raises JsonPatchError (JsonPatchTestFailed for a failed
+    "test") without having changed `document`.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("Patch must be a list of operations")
+    for operation in operations:
+        document = apply_operation(document, operation)
+    return document
+
+
+def _escape(token):
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _identical(a, b):
+    """Equality that also keeps types apart (1, 1.0 and true all differ)"""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_identical(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(_identical(x, y) for x, y in zip(a, b))
+    return type(a) is type(b) and a == b
+
+
+def make_patch(source, target, path=""):
+    """
+    JSON Patch turning `source` into `target`.
+
+    Objects are diffed key by key. Lists keep their common prefix and suffix,
+    diff the items in between pairwise and add or remove the rest, so an edit
+    inside one list item produces an operation on that item alone.
+    """
+    if _identical(source, target):
+        return []
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = [
+            {"op": "remove", "path": f"{path}/{_escape(key)}"} for key in source if key not in target
+        ]
+        for key, value in target.items():
+            child = f"{path}/{_escape(key)}"
+            if key in source:
+                operations.extend(make_patch(source[key], value, child))
+            else:
+                operations.append({"op": "add", "path": child, "value": value})
+        return operations
+    if isinstance(source, list) and isinstance(target, list):
+        shortest = min(len(source), len(target))
+        start = 0
+        while start < shortest and _identical(source[start], target[start]):
+            start += 1
+        end = 0
+        while end < shortest - start and _identical(source[-1 - end], target[-1 - end]):
+            end += 1
+        old = source[start:len(source) - end]
+        new = target[start:len(target) - end]
+        common = min(len(old), len(new))
+        operations = []
+        for i in range(common):
+            operations.extend(make_patch(old[i], new[i], f"{path}/{start + i}"))
+        for i in range(len(old) - 1, common - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{start + i}"})
+        for i in range(common, len(new)):
+            operations.append({"op": "add", "path": f"{path}/{start + i}", "value": new[i]})
+        return operations
+    return [{"op": "replace", "path": path, "value": target}]
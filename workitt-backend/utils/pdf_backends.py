@@ -0,0 +1,190 @@
+# utils/pdf_backends.py
+"""
+PDF text extraction backends.
+
+Every backend exposes the same two operations (page count and plain text for a
+page range) so the extraction pool can swap engines freely:
+
+- pdfium: pypdfium2, by far the fastest; the default
+- pdfminer: pdfminer.six text mode, pure Python
+- pdfplumber: layout-aware, slowest; used as the fallback for pages where the
+  fast engine's text looks wrong
+
+Backends accept either raw bytes or a private mmap of the file, so large
+uploads are never copied onto the Python heap.
+
+pypdfium2 and pdfminer.six are both installed as pdfplumber dependencies.
+"""
+import sys
+sys.path.insert(0, "libs")
+import ctypes
+import io
+import mmap
+import re
+import unicodedata
+
+MIN_PAGE_CHARS = 40  # fewer characters than this on a page triggers the fallback
+MIN_QUALITY = 0.8  # quality score below this triggers the fallback
+
+_CID_RE = re.compile(r"\(cid:\d+\)")
+
+
+def _stream(data):
+    """File-like view of bytes or an mmap, positioned at the start"""
+    if isinstance(data, mmap.mmap):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+
+def _pdfium_input(data):
+    """pypdfium2 takes bytes or a ctypes buffer; a writable (copy-on-write) mmap maps onto the latter"""
+    if isinstance(data, mmap.mmap):
+        return (ctypes.c_char * len(data)).from_buffer(data)
+    return data
+
+
+class ExtractionBackend:
+    name = None
+
+    def page_count(self, data):
+        raise NotImplementedError
+
+    def extract_pages(self, data, first_page, last_page):
+        """Return the text of pages first_page..last_page (1-indexed, inclusive)"""
+        raise NotImplementedError
+
+
+class PdfiumBackend(ExtractionBackend):
+    name = "pdfium"
+
+    def page_count(self, data):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(_pdfium_input(data))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def extract_pages(self, data, first_page, last_page):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(_pdfium_input(data))
+        texts = []
+        try:
+            for index in range(first_page - 1, last_page):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n"))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return texts
+
+
+class PdfminerBackend(ExtractionBackend):
+    name = "pdfminer"
+
+    def page_count(self, data):
+        from pdfminer.pdfpage import PDFPage
+
+        return sum(1 for _ in PDFPage.get_pages(_stream(data)))
+
+    def extract_pages(self, data, first_page, last_page):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        resources = PDFResourceManager()
+        output = io.StringIO()
+        device = TextConverter(resources, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(resources, device)
+        texts = []
+        try:
+            pagenos = set(range(first_page - 1, last_page))
+            for page in PDFPage.get_pages(_stream(data), pagenos=pagenos):
+                interpreter.process_page(page)
+                texts.append(output.getvalue().replace("\x0c", ""))
+                output.seek(0)
+                output.truncate()
+        finally:
+            device.close()
+        return texts
+
+
+class PdfplumberBackend(ExtractionBackend):
+    name = "pdfplumber"
+
+    def page_count(self, data):
+        import pdfplumber
+
+        with pdfplumber.open(_stream(data)) as pdf:
+            return len(pdf.pages)
+
+    def extract_pages(self, data, first_page, last_page):
+        import pdfplumber
+
+        texts = []
+        with pdfplumber.open(_stream(data), pages=list(range(first_page, last_page + 1))) as pdf:
+            for page in pdf.pages:
+                texts.append(page.extract_text() or "")
+        return texts
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PdfiumBackend(), PdfminerBackend(), PdfplumberBackend())
+}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF extraction backend: {name}")
+
+
+def text_quality(text):
+    """
+    Score extracted text from 0 (garbage) to 1 (clean).
+
+    Penalizes unmapped glyphs ("(cid:12)", U+FFFD, control and private-use
+    characters) and text whose words run together or fall apart into single
+    letters, which is how broken spacing shows up.
+    """
+    text = text.strip()
+    if not text:
+        return 0.0
+
+    bad = sum(len(m) for m in _CID_RE.findall(text))
+    cleaned = _CID_RE.sub("", text)
+    for char in cleaned:
+        if char == "�":
+            bad += 1
+        elif not char.isspace() and unicodedata.category(char) in ("Cc", "Co", "Cs", "Cn"):
+            bad += 1
+    score = 1.0 - bad / len(text)
+
+    words = cleaned.split()
+    if words:
+        mean_length = sum(len(w) for w in words) / len(words)
+        if mean_length > 15:
+            score *= 15 / mean_length
+        elif mean_length < 2:
+            score *= mean_length / 2
+    return max(0.0, score)
+
+
+def needs_fallback(text):
+    """True if a fast engine's page text should be re-extracted with the layout-aware backend"""
+    return len(text.strip()) < MIN_PAGE_CHARS or text_quality(text) < MIN_QUALITY
+
+
+def better_text(primary, fallback):
+    """Pick the better of two extractions of the same page"""
+    primary_score = text_quality(primary) * min(1.0, len(primary.strip()) / MIN_PAGE_CHARS)
+    fallback_score = text_quality(fallback) * min(1.0, len(fallback.strip()) / MIN_PAGE_CHARS)
+    return fallback if fallback_score > primary_score else primary
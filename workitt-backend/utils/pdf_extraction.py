@@ -0,0 +1,183 @@
+# utils/pdf_extraction.py
+"""
+Out-of-process PDF text extraction.
+
+PDF parsing runs in a dedicated process pool so that a pathological upload can
+neither block nor crash the web worker. Each worker process has an address-space
+limit, each task a CPU-time budget, and every document a wall-clock timeout.
+Pages are split into contiguous ranges, extracted in parallel with the fast
+backend and joined back in page order. Pages whose text looks wrong are
+re-extracted with the layout-aware fallback backend (see utils/pdf_backends.py).
+
+Uploaded files are passed to the workers by path and read through mmap, so the
+document is never pickled between processes or copied into worker memory.
+"""
+import sys
+sys.path.insert(0, "libs")
+import math
+import mmap
+import os
+import resource
+import threading
+import time
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from concurrent.futures.process import BrokenProcessPool
+from utils.pdf_backends import get_backend, needs_fallback, better_text
+
+EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS") or os.cpu_count() or 1)
+EXTRACT_TIMEOUT = float(os.environ.get("PDF_EXTRACT_TIMEOUT", 20))  # wall seconds per document
+EXTRACT_CPU_SECONDS = int(os.environ.get("PDF_EXTRACT_CPU_SECONDS", 10))  # CPU seconds per document
+EXTRACT_MEMORY_MB = int(os.environ.get("PDF_EXTRACT_MEMORY_MB", 1024))  # address space per worker
+MAX_PAGES = int(os.environ.get("PDF_EXTRACT_MAX_PAGES", 50))
+EXTRACT_BACKEND = os.environ.get("PDF_EXTRACT_BACKEND", "pdfium")
+FALLBACK_BACKEND = os.environ.get("PDF_EXTRACT_FALLBACK_BACKEND", "pdfplumber")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PdfExtractionError(Exception):
+    """The PDF could not be extracted (invalid file, timeout or resource limit)"""
+
+
+# === Worker side ===
+def _init_worker(memory_mb):
+    """Cap the worker's address space so a decompression bomb raises MemoryError"""
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _limit_cpu(seconds):
+    """Allow this task `seconds` of CPU on top of what the worker already used"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+@contextmanager
+def _open_source(source):
+    """Yield the PDF as bytes or, for a file path, as a private read-only mapping"""
+    if isinstance(source, (bytes, bytearray)):
+        yield source
+        return
+    with open(source, "rb") as f:
+        # ACCESS_COPY: pages are shared with the page cache, but C libraries may take a pointer
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+        yield mapped
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # A backend still holds a view; the mapping is released with it
+
+
+def _count_pages(source, cpu_seconds, backend):
+    _limit_cpu(cpu_seconds)
+    with _open_source(source) as data:
+        return get_backend(backend).page_count(data)
+
+
+def _extract_pages(source, first_page, last_page, cpu_seconds, backend):
+    """Extract pages first_page..last_page (1-indexed, inclusive), in order"""
+    _limit_cpu(cpu_seconds)
+    with _open_source(source) as data:
+        return get_backend(backend).extract_pages(data, first_page, last_page)
+
+
+# === Web worker side ===
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver keeps workers small and free of the web worker's sockets and DB connections
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+                initargs=(EXTRACT_MEMORY_MB,),
+            )
+        return _pool
+
+
+def _reset_pool(pool):
+    """Throw away a broken or stuck pool, killing any worker still running"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(pool, futures, deadline):
+    timeout = max(0, deadline - time.monotonic())
+    done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+    if pending and not any(f.exception() for f in done):
+        _reset_pool(pool)
+        raise PdfExtractionError("PDF took too long to process")
+    try:
+        return [f.result() for f in futures]
+    except BrokenProcessPool:
+        # The worker was killed (CPU limit exceeded or crashed)
+        _reset_pool(pool)
+        raise PdfExtractionError("PDF is too complex to process")
+    except MemoryError:
+        _reset_pool(pool)
+        raise PdfExtractionError("PDF is too large to process")
+    except ImportError:
+        raise
+    except Exception as e:
+        if pending:
+            _reset_pool(pool)
+        raise PdfExtractionError(f"Invalid or corrupted PDF: {e}")
+
+
+def extract_pdf_text(source, backend=None, fallback=None):
+    """
+    Extract plain text from a PDF in the extraction pool.
+
+    `source` is the path of the PDF on disk (preferred) or its raw bytes.
+
+    Returns the text of all pages in page order, separated by newlines.
+    Raises PdfExtractionError if the PDF is invalid, too slow or too large.
+    """
+    backend = backend or EXTRACT_BACKEND
+    fallback = FALLBACK_BACKEND if fallback is None else fallback
+    pool = _get_pool()
+    deadline = time.monotonic() + EXTRACT_TIMEOUT
+
+    [page_count] = _run(pool, [pool.submit(_count_pages, source, EXTRACT_CPU_SECONDS, backend)], deadline)
+    if page_count == 0:
+        return ""
+    if page_count > MAX_PAGES:
+        raise PdfExtractionError(f"PDF has too many pages (max {MAX_PAGES})")
+
+    # Contiguous page ranges, one per worker; the CPU budget is shared out by page count
+    chunk = math.ceil(page_count / min(EXTRACT_WORKERS, page_count))
+    futures = []
+    for first in range(1, page_count + 1, chunk):
+        last = min(first + chunk - 1, page_count)
+        budget = max(1, math.ceil(EXTRACT_CPU_SECONDS * (last - first + 1) / page_count))
+        futures.append(pool.submit(_extract_pages, source, first, last, budget, backend))
+    pages = [text for texts in _run(pool, futures, deadline) for text in texts]
+
+    # Re-extract suspicious pages with the layout-aware backend, one page per task
+    retry = [n for n, text in enumerate(pages, start=1) if needs_fallback(text)]
+    if fallback and fallback != backend and retry:
+        budget = max(1, math.ceil(EXTRACT_CPU_SECONDS / page_count))
+        futures = [pool.submit(_extract_pages, source, n, n, budget, fallback) for n in retry]
+        for n, [text] in zip(retry, _run(pool, futures, deadline)):
+            pages[n - 1] = better_text(pages[n - 1], text)
+
+    return "\n".join(text.strip() for text in pages if text.strip()).strip()
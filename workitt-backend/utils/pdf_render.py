@@ -0,0 +1,379 @@
+# utils/pdf_render.py
+"""
+Server-side PDF rendering of resumes and cover letters.
+
+Documents are laid out with reportlab following the editor previews: the
+content's `style` (fonts, colors, size, line spacing, margins, paper size,
+header alignment), `visibility` flags, section order and `templateId`.
+
+Rendering runs in a dedicated process pool (same setup as the extraction pool
+in utils/pdf_extraction.py) so a large document never blocks a web worker.
+Workers write the PDF straight to its destination path and move it into place
+atomically, so the file is never pickled back to the web worker and a reader
+never sees a half-written file.
+
+The output depends only on the content, TEMPLATE_VERSION and, for a cover
+letter without a date, the day it is rendered; bump TEMPLATE_VERSION whenever
+the layout changes so cached renders are not reused.
+
+Only reportlab's standard PDF fonts are used (Helvetica, Times, Courier), which
+cover Latin-1 text.
+"""
+import sys
+sys.path.insert(0, "libs")
+import os
+import threading
+import multiprocessing
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from xml.sax.saxutils import escape
+
+TEMPLATE_VERSION = "1"
+
+RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS") or min(4, os.cpu_count() or 1))
+RENDER_TIMEOUT = float(os.environ.get("PDF_RENDER_TIMEOUT", 30))  # wall seconds per document
+
+FONTS = {
+    "font-sans": ("Helvetica", "Helvetica-Bold"),
+    "font-roboto": ("Helvetica", "Helvetica-Bold"),
+    "font-serif": ("Times-Roman", "Times-Bold"),
+    "font-mono": ("Courier", "Courier-Bold"),
+}
+
+# templateId -> layout options (unknown templates use "default")
+TEMPLATES = {
+    "default": {"header_rule": False},
+    "modern": {"header_rule": True},
+}
+
+RESUME_SECTIONS = ["summary", "workExperience", "education", "skills", "certifications", "links", "others"]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PdfRenderError(Exception):
+    """The document could not be rendered (timeout or renderer failure)"""
+
+
+# === Worker side ===
+class _Styles:
+    """Paragraph styles derived from a document's `style` settings"""
+
+    def __init__(self, style):
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from reportlab.lib.styles import ParagraphStyle
+
+        def color(value, fallback):
+            try:
+                return colors.HexColor(value)
+            except (TypeError, ValueError, AttributeError):
+                return colors.HexColor(fallback)
+
+        regular, bold = FONTS.get(style.get("fontFamily"), FONTS["font-sans"])
+        size = float(style.get("fontSize") or 11)
+        spacing = float(style.get("lineSpacing") or 1.5)
+        text = color(style.get("contentFontColor") or style.get("fontColor"), "#334155")
+        self.header_color = color(style.get("headerFontColor") or style.get("fontColor"), "#1e293b")
+        align = {"center": TA_CENTER, "right": TA_RIGHT}.get(style.get("headerAlignment"), TA_LEFT)
+
+        def make(name, scale=1.0, font=regular, color=text, **extra):
+            return ParagraphStyle(
+                name, fontName=font, fontSize=size * scale, leading=size * scale * spacing, textColor=color, **extra
+            )
+
+        self.body = make("body")
+        self.small = make("small", 0.9)
+        self.small_right = make("small_right", 0.9, alignment=TA_RIGHT)
+        self.contact = make("contact", 0.875, alignment=align)
+        self.name = make("name", 2.0, bold, self.header_color, alignment=align, spaceAfter=size * 0.5)
+        self.section = make("section", 1.5, bold, self.header_color, spaceBefore=size, spaceAfter=size * 0.2)
+        self.item = make("item", 1.1, bold, self.header_color)
+        self.label = make("label", 0.9, bold, self.header_color)
+        self.subject = make("subject", 0.9, bold, self.header_color, spaceAfter=size)
+
+
+def _text(value):
+    """Paragraph markup for plain text (line breaks kept)"""
+    return escape(str(value or "")).replace("\n", "<br/>")
+
+
+def _visible(flags, key, default=True):
+    value = (flags or {}).get(key, default) if isinstance(flags, dict) else default
+    return value is not False
+
+
+def _page(style):
+    from reportlab.lib.pagesizes import A4, LETTER
+
+    return LETTER if style.get("paperSize") == "letter" else A4
+
+
+def _document(path, style, title):
+    from reportlab.platypus import SimpleDocTemplate
+
+    # The previews pad the page by margins * 4px, i.e. margins * 3pt
+    margin = float(style.get("margins") or 8) * 3
+    return SimpleDocTemplate(
+        path,
+        pagesize=_page(style),
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=margin,
+        bottomMargin=margin,
+        title=title,
+        creator="Workitt",
+    )
+
+
+def _rule(styles, thickness=1.5):
+    from reportlab.platypus import HRFlowable
+
+    return HRFlowable(width="100%", thickness=thickness, color=styles.header_color, spaceBefore=2, spaceAfter=4)
+
+
+def _entry(styles, width, heading, subheading, dates, description):
+    """A titled item with right-aligned dates and an optional description, kept on one page"""
+    from reportlab.platypus import KeepTogether, Paragraph, Spacer, Table, TableStyle
+
+    left = [Paragraph(_text(heading), styles.item)] if heading else []
+    if subheading:
+        left.append(Paragraph(_text(subheading), styles.small))
+    row = Table(
+        [[left, Paragraph(_text(dates), styles.small_right) if dates else ""]],
+        colWidths=[width * 0.72, width * 0.28],
+    )
+    row.setStyle(TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ("TOPPADDING", (0, 0), (-1, -1), 0),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+    ]))
+    parts = [row]
+    if description:
+        parts.append(Spacer(1, 3))
+        parts.append(Paragraph(_text(description), styles.small))
+    parts.append(Spacer(1, styles.body.fontSize * 0.8))
+    return KeepTogether(parts)
+
+
+def _date_range(start, end, current):
+    end = "Present" if current else end
+    if start and end:
+        return f"{start} - {end}"
+    return start or end or ""
+
+
+def _resume_story(content, styles, width, template):
+    from reportlab.platypus import Paragraph
+
+    info = content.get("personalInfo") or {}
+    visibility = content.get("visibility") or {}
+    shown = visibility.get("personalInfo") or {}
+    story = []
+
+    name = " ".join(part for part in (info.get("firstName"), info.get("lastName")) if part)
+    if name:
+        story.append(Paragraph(_text(name), styles.name))
+    lines = [info.get(key) for key in ("email", "phone") if _visible(shown, key) and info.get(key)]
+    address = [info.get(key) for key in ("address", "city", "country") if _visible(shown, key) and info.get(key)]
+    if address:
+        lines.append(", ".join(address))
+    lines += [info.get(key) for key in ("linkedIn", "website") if _visible(shown, key) and info.get(key)]
+    for line in lines:
+        story.append(Paragraph(_text(line), styles.contact))
+    if template["header_rule"] and story:
+        story.append(_rule(styles, 2))
+
+    def section(title):
+        return [Paragraph(_text(title), styles.section), _rule(styles)]
+
+    order = [name for name in dict.fromkeys(content.get("sectionOrder") or []) if name in RESUME_SECTIONS]
+    order += [name for name in RESUME_SECTIONS if name not in order]
+    for name in order:
+        flags = visibility.get(name)
+        if isinstance(flags, dict):
+            if not _visible(flags, "visible"):
+                continue
+        elif flags is False:
+            continue
+        items = content.get(name)
+        if not items:
+            continue
+
+        if name == "summary":
+            story += section("Professional Summary")
+            story.append(Paragraph(_text(items), styles.body))
+        elif name in ("workExperience", "education"):
+            story += section("Work Experience" if name == "workExperience" else "Education")
+            for item in items:
+                if name == "workExperience":
+                    heading, place = item.get("title"), item.get("company")
+                else:
+                    field = item.get("field") or item.get("fieldOfStudy")
+                    heading = f"{item.get('degree') or ''}{f' in {field}' if field else ''}"
+                    place = item.get("school")
+                if _visible(flags, "showLocation") and item.get("location"):
+                    place = f"{place or ''} • {item['location']}"
+                dates = _date_range(item.get("startDate"), item.get("endDate"), item.get("current"))
+                story.append(_entry(
+                    styles, width, heading, place,
+                    dates if _visible(flags, "showDates") else "",
+                    item.get("description") if _visible(flags, "showDescription") else "",
+                ))
+        elif name == "skills":
+            story += section("Skills")
+            skills = [
+                f"{s.get('name')} ({s['level']})" if s.get("level") else s.get("name")
+                for s in items if s.get("name")
+            ]
+            story.append(Paragraph(_text(" • ".join(skills)), styles.body))
+        elif name == "certifications":
+            story += section("Certifications")
+            for item in items:
+                details = [item.get("issuer") or item.get("authority")]
+                if _visible(flags, "showLink"):
+                    details.append(item.get("link") or item.get("certLink"))
+                dates = item.get("date") or _date_range(item.get("startDate"), item.get("endDate"), False)
+                story.append(_entry(
+                    styles, width, item.get("name"), "\n".join(d for d in details if d),
+                    dates if _visible(flags, "showDates") else "",
+                    item.get("description") if _visible(flags, "showDescription") else "",
+                ))
+        elif name == "links":
+            story += section("Links")
+            for link in items:
+                label = link.get("service") or link.get("label")
+                url = link.get("linkUrl") or link.get("url") or ""
+                markup = f'<font name="{styles.label.fontName}">{_text(label)}:</font> ' if label else ""
+                story.append(Paragraph(markup + _text(url), styles.small))
+        elif name == "others":
+            for other in items:
+                story += section(other.get("title") or "")
+                story.append(Paragraph(_text(other.get("content") or other.get("description")), styles.small))
+    return story
+
+
+def _letter_date(value, today):
+    for candidate in (value, today):
+        try:
+            day = date.fromisoformat(str(candidate)[:10])
+            return f"{day.strftime('%B')} {day.day}, {day.year}"
+        except ValueError:
+            continue
+    return str(value)
+
+
+def _cover_letter_story(content, styles, width, template, today):
+    from reportlab.platypus import Paragraph, Spacer
+
+    contact = content.get("contact") or {}
+    shown = contact.get("visibility") or {}
+    visibility = content.get("visibility") or {}
+    gap = styles.body.fontSize * 1.5
+    story = []
+
+    if _visible(shown, "name"):
+        story.append(Paragraph(_text((contact.get("name") or "Your Name").upper()), styles.name))
+    details = [contact.get(key) for key in ("email", "phone", "address") if _visible(shown, key) and contact.get(key)]
+    if details:
+        story.append(Paragraph(_text("    ".join(details)), styles.contact))
+    if template["header_rule"]:
+        story.append(_rule(styles, 2))
+    story.append(Spacer(1, gap))
+
+    if _visible(visibility, "date"):
+        story.append(Paragraph(_text(_letter_date(content.get("date"), today)), styles.body))
+        story.append(Spacer(1, gap * 0.5))
+    if _visible(visibility, "hiringManager"):
+        story.append(Paragraph(_text(content.get("hiringManagerName") or "Hiring Manager"), styles.body))
+    if _visible(visibility, "company") and content.get("company"):
+        story.append(Paragraph(_text(content["company"]), styles.body))
+    story.append(Spacer(1, gap))
+
+    if _visible(visibility, "jobTitle") and content.get("jobTitle"):
+        story.append(Paragraph(_text(f"Application for {content['jobTitle']}".upper()), styles.subject))
+
+    for paragraph in (content.get("body") or "").split("\n\n"):
+        if paragraph.strip():
+            story.append(Paragraph(_text(paragraph.strip("\n")), styles.body))
+            story.append(Spacer(1, styles.body.leading * 0.6))
+    return story
+
+
+def render_document(kind, content, path, today=None):
+    """Lay out a resume ("resume") or cover letter ("cover_letter") as a PDF at `path`"""
+    content = content or {}
+    style = content.get("style") or {}
+    template = TEMPLATES.get(content.get("templateId"), TEMPLATES["default"])
+    styles = _Styles(style)
+    title = content.get("title") or ("Resume" if kind == "resume" else "Cover Letter")
+    document = _document(path, style, title)
+    if kind == "resume":
+        story = _resume_story(content, styles, document.width, template)
+    else:
+        story = _cover_letter_story(content, styles, document.width, template, today or date.today().isoformat())
+    if not story:
+        from reportlab.platypus import Spacer
+
+        story = [Spacer(1, 1)]
+    document.build(story)
+
+
+def _render_to_file(kind, content, path, today):
+    """Worker task: render to a temporary file next to `path`, then move it into place"""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        render_document(kind, content, temporary, today)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return os.path.getsize(path)
+
+
+# === Web worker side ===
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_pdf(kind, content, path, today=None):
+    """
+    Render a document to `path` in the render pool and return the file size.
+    Raises PdfRenderError if rendering fails or takes longer than RENDER_TIMEOUT.
+    """
+    pool = _get_pool()
+    future = pool.submit(_render_to_file, kind, dict(content or {}), str(path), today or date.today().isoformat())
+    try:
+        return future.result(timeout=RENDER_TIMEOUT)
+    except FutureTimeout:
+        _reset_pool(pool)
+        raise PdfRenderError("Rendering the PDF took too long")
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        raise PdfRenderError("The PDF renderer stopped unexpectedly")
+    except ImportError:
+        raise
+    except Exception as e:
+        raise PdfRenderError(f"Could not render the PDF: {e}")
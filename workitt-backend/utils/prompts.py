@@ -15,11 +15,12 @@ User Data Fields:
 - job_title: The position being applied for
 - company: The company name
 - resume_text: The applicant's resume content (if provided)
+- persona: The applicant's details from their saved resume: name, contact details, work experience, skills, certifications (if provided)
 - ai_prompt: Additional instructions from the user (if provided, follow these instructions carefully)
 - body: Existing cover letter text (if provided, use for rewriting/editing)
 
 If ai_prompt is provided, incorporate those specific instructions into your generation.
-If resume_text is provided, use it to personalize the cover letter with relevant experience and skills.
+If resume_text or persona is provided, use it to personalize the cover letter with relevant experience and skills.
 """
 
 REWRITE_PROMPT = """
@@ -123,6 +124,73 @@ Notes:
 - Clean up text (remove weird characters, fix spacing).
 """
 
+RESUME_REMAINDER_PARSER_PROMPT = """
+You are an expert resume parser.
+
+Part of this resume has already been extracted by a rule-based parser. You will receive:
+- parsed_sections: the sections that are already extracted. Do NOT output these again.
+- resume_text: only the parts of the resume that still need to be parsed.
+
+Instructions:
+1. If resume_text is clearly not resume content, return a YAML object with a single key `error` explaining why.
+2. Otherwise extract ONLY the sections present in resume_text into the YAML structure below. Omit every other key.
+3. Ensure the output is valid YAML. Do not include markdown code blocks (```yaml ... ```). Just the raw YAML.
+
+Structure (omit keys you have no data for):
+personalInfo:
+  firstName: "String"
+  lastName: "String"
+  email: "String"
+  phone: "String"
+  address: "String"
+  city: "String"
+  country: "String"
+  linkedIn: "String (URL)"
+  website: "String (URL)"
+summary: "String (Professional Summary)"
+workExperience:
+  - id: "String (generate a unique string id)"
+    title: "String"
+    company: "String"
+    location: "String"
+    startDate: "String (YYYY-MM)"
+    endDate: "String (YYYY-MM or 'Present')"
+    current: Boolean
+    description: "String"
+education:
+  - id: "String (generate a unique string id)"
+    school: "String"
+    degree: "String"
+    fieldOfStudy: "String"
+    location: "String"
+    startDate: "String (YYYY-MM)"
+    endDate: "String (YYYY-MM or 'Present')"
+    current: Boolean
+    description: "String"
+skills:
+  - id: "String (generate a unique string id)"
+    name: "String"
+    level: "String (beginner, intermediate, advanced, expert)"
+certifications:
+  - id: "String (generate a unique string id)"
+    name: "String"
+    authority: "String"
+    licenseNumber: "String"
+    certLink: "String"
+    startDate: "String (YYYY-MM)"
+    endDate: "String (YYYY-MM)"
+    description: "String"
+others:
+  - id: "String (generate a unique string id)"
+    title: "String"
+    content: "String"
+
+Notes:
+- For `level` in skills, estimate based on context if not specified, default to 'intermediate'.
+- For `current` boolean, set to true if the end date is 'Present' or current date.
+- Clean up text (remove weird characters, fix spacing).
+"""
+
 RESUME_TEXT_ENHANCE_PROMPT = """
 You are a professional resume writing assistant.
 
@@ -0,0 +1,332 @@
+# utils/resume_import.py
+"""
+Resume import from other formats.
+
+Maps JSON Resume documents (https://jsonresume.org/schema) and LinkedIn data
+export archives (the zip of CSV files from "Get a copy of your data") to the
+resume content structure of ResumeContentSchema. The mapping only reshapes
+data; the result still has to go through validate_resume_data().
+"""
+import csv
+import io
+import re
+import uuid
+import zipfile
+from utils.resume_preparser import link_service, normalize_date
+
+# LinkedIn archive members read for a resume (matched by file name, case-insensitive)
+LINKEDIN_FILES = (
+    "profile.csv",
+    "email addresses.csv",
+    "phonenumbers.csv",
+    "positions.csv",
+    "education.csv",
+    "skills.csv",
+    "certifications.csv",
+    "languages.csv",
+    "projects.csv",
+)
+MAX_LINKEDIN_MEMBER_SIZE = 5 * 1024 * 1024  # uncompressed bytes per CSV
+
+SKILL_LEVELS = ("beginner", "intermediate", "advanced", "expert")
+
+_ISO_DATE_RE = re.compile(r"(\d{4})(?:-(\d{1,2}))?(?:-\d{1,2})?")
+
+
+class ImportFormatError(ValueError):
+    """The document is not in the format it was imported as"""
+
+
+def _new_id():
+    return str(uuid.uuid4())
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _join(*parts, separator="\n"):
+    return separator.join(part for part in (_text(p) for p in parts) if part)
+
+
+def _list(value):
+    """`value` if it is a list, otherwise an empty one (malformed sections are skipped, not fatal)"""
+    return value if isinstance(value, list) else []
+
+
+def _bullets(items):
+    return "\n".join(f"• {_text(item)}" for item in _list(items) if _text(item))
+
+
+def _split_name(name):
+    first, _, last = _text(name).partition(" ")
+    return first, last.strip()
+
+
+def _iso_month(value):
+    """'2020-03-15', '2020-03' or '2020' -> '2020-03' (year-only dates map to January)"""
+    match = _ISO_DATE_RE.fullmatch(_text(value))
+    if not match:
+        return normalize_date(_text(value)) if _text(value) else ""
+    month = int(match.group(2) or 1)
+    return f"{match.group(1)}-{month:02d}" if 1 <= month <= 12 else ""
+
+
+def _period(start, end, date=_iso_month):
+    start, end = date(start), date(end)
+    return {"startDate": start, "endDate": end or "Present" if start else end, "current": bool(start and not end)}
+
+
+def _skill_level(value):
+    level = _text(value).lower()
+    return level if level in SKILL_LEVELS else "intermediate"
+
+
+def _resume(personal_info, title="", summary="", **sections):
+    content = {
+        "personalInfo": personal_info,
+        "summary": summary,
+        "title": title or "Resume title",
+    }
+    for key in ("workExperience", "education", "skills", "certifications", "links", "others"):
+        content[key] = sections.get(key) or []
+    return content
+
+
+# === JSON Resume ===
+def from_json_resume(document):
+    """Resume content for a JSON Resume document"""
+    if not isinstance(document, dict) or not isinstance(document.get("basics", {}), dict):
+        raise ImportFormatError("Not a JSON Resume document")
+    basics = document.get("basics") or {}
+    location = basics.get("location")
+    if isinstance(location, str):
+        location = {"city": location}
+    elif not isinstance(location, dict):
+        location = {}
+    profiles = [p for p in _list(basics.get("profiles")) if isinstance(p, dict)]
+    first_name, last_name = _split_name(basics.get("name"))
+    linkedin = next((_text(p.get("url")) for p in profiles if _text(p.get("network")).lower() == "linkedin"), "")
+
+    def items(key):
+        return [item for item in _list(document.get(key)) if isinstance(item, dict)]
+
+    work = [
+        {
+            "id": _new_id(),
+            "title": _text(job.get("position")),
+            "company": _text(job.get("name") or job.get("company")),
+            "location": _text(job.get("location")),
+            **_period(job.get("startDate"), job.get("endDate")),
+            "description": _join(job.get("summary"), _bullets(job.get("highlights"))),
+        }
+        for job in items("work")
+    ]
+    education = [
+        {
+            "id": _new_id(),
+            "school": _text(school.get("institution")),
+            "degree": _text(school.get("studyType")),
+            "field": _text(school.get("area")),
+            "location": "",
+            **_period(school.get("startDate"), school.get("endDate")),
+            "description": _join(
+                f"Score: {_text(school.get('score'))}" if _text(school.get("score")) else "",
+                _bullets(school.get("courses")),
+            ),
+        }
+        for school in items("education")
+    ]
+    skills = [
+        {"id": _new_id(), "name": _text(skill.get("name")), "level": _skill_level(skill.get("level"))}
+        for skill in items("skills")
+        if _text(skill.get("name"))
+    ]
+    certifications = [
+        {
+            "id": _new_id(),
+            "name": _text(cert.get("name")),
+            "issuer": _text(cert.get("issuer")),
+            "date": _iso_month(cert.get("date")),
+            "link": _text(cert.get("url")),
+            "description": "",
+        }
+        for cert in items("certificates")
+    ]
+    links = [
+        {"id": _new_id(), "service": _text(p.get("network")) or link_service(_text(p.get("url"))), "linkUrl": _text(p.get("url"))}
+        for p in profiles
+        if _text(p.get("url"))
+    ]
+
+    others = []
+    for key, title in (("projects", "Projects"), ("volunteer", "Volunteering"), ("awards", "Awards"),
+                       ("publications", "Publications")):
+        entries = [
+            _join(
+                _join(entry.get("name") or entry.get("title") or entry.get("position"),
+                      entry.get("organization") or entry.get("awarder") or entry.get("publisher"), separator=" - "),
+                entry.get("description") or entry.get("summary"),
+                _bullets(entry.get("highlights")),
+            )
+            for entry in items(key)
+        ]
+        if any(entries):
+            others.append({"id": _new_id(), "title": title, "content": "\n\n".join(e for e in entries if e)})
+    languages = [
+        _join(language.get("language"), language.get("fluency"), separator=" - ") for language in items("languages")
+    ]
+    if any(languages):
+        others.append({"id": _new_id(), "title": "Languages", "content": "\n".join(l for l in languages if l)})
+    interests = [_text(interest.get("name")) for interest in items("interests")]
+    if any(interests):
+        others.append({"id": _new_id(), "title": "Interests", "content": ", ".join(i for i in interests if i)})
+
+    return _resume(
+        {
+            "firstName": first_name,
+            "lastName": last_name,
+            "title": _text(basics.get("label")),
+            "email": _text(basics.get("email")),
+            "phone": _text(basics.get("phone")),
+            "address": _text(location.get("address")),
+            "city": _text(location.get("city")),
+            "country": _text(location.get("countryCode") or location.get("region")),
+            "postalCode": _text(location.get("postalCode")),
+            "linkedIn": linkedin,
+            "website": _text(basics.get("url") or basics.get("website")),
+        },
+        title=_text(basics.get("label")),
+        summary=_text(basics.get("summary")),
+        workExperience=work,
+        education=education,
+        skills=skills,
+        certifications=certifications,
+        links=links,
+        others=others,
+    )
+
+
+# === LinkedIn data export ===
+def _linkedin_tables(path):
+    """The archive's resume CSVs as {file name: [row dicts]}"""
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        raise ImportFormatError("Not a zip archive")
+    tables = {}
+    with archive:
+        for info in archive.infolist():
+            name = info.filename.rsplit("/", 1)[-1].lower()
+            if name not in LINKEDIN_FILES or name in tables:
+                continue
+            if info.file_size > MAX_LINKEDIN_MEMBER_SIZE:
+                raise ImportFormatError(f"{info.filename} is too large")
+            try:
+                with archive.open(info) as member:
+                    reader = csv.DictReader(io.TextIOWrapper(member, encoding="utf-8-sig", newline=""))
+                    tables[name] = [
+                        {_text(key): _text(value) for key, value in row.items() if key} for row in reader
+                    ]
+            except (UnicodeDecodeError, csv.Error):
+                raise ImportFormatError(f"{info.filename} is not a readable UTF-8 CSV")
+    if "profile.csv" not in tables and "positions.csv" not in tables:
+        raise ImportFormatError("Not a LinkedIn data export (no Profile.csv or Positions.csv)")
+    return tables
+
+
+def _linkedin_date(value):
+    return normalize_date(value) if _text(value) else ""
+
+
+def from_linkedin_archive(path):
+    """Resume content for a LinkedIn data export archive (zip file at `path`)"""
+    tables = _linkedin_tables(path)
+    profile = (tables.get("profile.csv") or [{}])[0]
+    emails = tables.get("email addresses.csv") or []
+    email = next((e for e in emails if e.get("Primary", "").lower() == "yes"), emails[0] if emails else {})
+    phones = tables.get("phonenumbers.csv") or []
+    # "City, Region, Country"
+    places = [part.strip() for part in profile.get("Geo Location", "").split(",") if part.strip()]
+
+    work = [
+        {
+            "id": _new_id(),
+            "title": row.get("Title", ""),
+            "company": row.get("Company Name", ""),
+            "location": row.get("Location", ""),
+            **_period(row.get("Started On"), row.get("Finished On"), _linkedin_date),
+            "description": row.get("Description", ""),
+        }
+        for row in tables.get("positions.csv") or []
+    ]
+    education = [
+        {
+            "id": _new_id(),
+            "school": row.get("School Name", ""),
+            "degree": row.get("Degree Name", ""),
+            "field": "",
+            "location": "",
+            **_period(row.get("Start Date"), row.get("End Date"), _linkedin_date),
+            "description": _join(row.get("Notes"), row.get("Activities")),
+        }
+        for row in tables.get("education.csv") or []
+    ]
+    skills = [
+        {"id": _new_id(), "name": row["Name"], "level": "intermediate"}
+        for row in tables.get("skills.csv") or []
+        if row.get("Name")
+    ]
+    certifications = [
+        {
+            "id": _new_id(),
+            "name": row.get("Name", ""),
+            "issuer": row.get("Authority", ""),
+            "date": _linkedin_date(row.get("Started On")),
+            "link": row.get("Url", ""),
+            "description": _join(f"License: {row['License Number']}" if row.get("License Number") else ""),
+        }
+        for row in tables.get("certifications.csv") or []
+    ]
+    websites = [
+        url.split(":", 1)[1] if re.match(r"\[?\w+\]?:https?://", url) else url
+        for url in re.split(r"[,\s]+", profile.get("Websites", "").strip("[]"))
+        if url
+    ]
+    links = [{"id": _new_id(), "service": link_service(url), "linkUrl": url} for url in websites]
+
+    others = []
+    projects = [
+        _join(row.get("Title"), row.get("Description"), row.get("Url")) for row in tables.get("projects.csv") or []
+    ]
+    if any(projects):
+        others.append({"id": _new_id(), "title": "Projects", "content": "\n\n".join(p for p in projects if p)})
+    languages = [
+        _join(row.get("Name"), row.get("Proficiency"), separator=" - ") for row in tables.get("languages.csv") or []
+    ]
+    if any(languages):
+        others.append({"id": _new_id(), "title": "Languages", "content": "\n".join(l for l in languages if l)})
+
+    return _resume(
+        {
+            "firstName": profile.get("First Name", ""),
+            "lastName": profile.get("Last Name", ""),
+            "title": profile.get("Headline", ""),
+            "email": email.get("Email Address", ""),
+            "phone": phones[0].get("Number", "") if phones else "",
+            "address": profile.get("Address", ""),
+            "city": places[0] if places else "",
+            "country": places[-1] if len(places) > 1 else "",
+            "postalCode": profile.get("Zip Code", ""),
+            "linkedIn": "",
+            "website": websites[0] if websites else "",
+        },
+        title=profile.get("Headline", ""),
+        summary=profile.get("Summary", ""),
+        workExperience=work,
+        education=education,
+        skills=skills,
+        certifications=certifications,
+        links=links,
+        others=others,
+    )
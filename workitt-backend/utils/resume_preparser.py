@@ -0,0 +1,574 @@
+# utils/resume_preparser.py
+"""
+Rule-based resume pre-parser.
+
+Pulls the deterministic parts of a resume (contact details, links, dates and
+section boundaries) out of extracted PDF text. Sections that can be parsed with
+confidence are returned directly in the RESUME_PARSER_PROMPT structure; anything
+ambiguous is collected into a remainder that is sent to the AI parser. When the
+whole document is understood, the model is not called at all.
+"""
+import re
+import uuid
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s,;|<>]+"
+    r"|\b(?:linkedin\.com|github\.com|gitlab\.com|behance\.net|dribbble\.com)/[^\s,;|<>]+",
+    re.IGNORECASE,
+)
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{6,}\d(?![\w/])")
+
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+)
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}[/.]\d{{4}}|\d{{4}}[/.-]\d{{1,2}}|\d{{4}})"
+_PRESENT = r"(?:present|current|now|today|ongoing)"
+DATE_RANGE_RE = re.compile(
+    rf"(?<![\w/])(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|{_PRESENT})(?![\w/])",
+    re.IGNORECASE,
+)
+SINGLE_DATE_RE = re.compile(rf"(?<![\w/])(?P<date>{_DATE})(?![\w/])", re.IGNORECASE)
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+SECTION_HEADINGS = {
+    "summary": (
+        "summary", "professional summary", "career summary", "profile",
+        "professional profile", "about", "about me", "objective", "career objective",
+    ),
+    "workExperience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history",
+    ),
+    "education": (
+        "education", "education and training", "academic background", "academic history",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies",
+        "competencies", "skills and tools", "technologies",
+    ),
+    "certifications": (
+        "certifications", "certification", "certificates", "licenses",
+        "licenses and certifications", "licenses & certifications",
+    ),
+    "links": ("links", "online profiles", "profiles", "social"),
+}
+
+# Headings that are copied verbatim into `others` (title + content)
+OTHER_HEADINGS = (
+    "projects", "languages", "interests", "hobbies", "volunteering", "volunteer experience",
+    "awards", "honors", "honours", "honors and awards", "publications", "achievements",
+    "activities", "references",
+)
+
+TITLE_WORDS = (
+    "engineer", "developer", "manager", "analyst", "designer", "consultant", "intern",
+    "director", "specialist", "lead", "officer", "assistant", "coordinator", "architect",
+    "scientist", "administrator", "technician", "associate", "head", "president",
+    "executive", "accountant", "teacher", "nurse", "representative", "supervisor",
+    "advisor", "founder", "editor", "writer", "researcher", "programmer", "owner",
+    "trainee", "apprentice", "clerk", "agent", "operator", "instructor", "tutor",
+)
+COMPANY_WORDS = (
+    "inc", "ltd", "llc", "llp", "gmbh", "corp", "corporation", "company", "co", "group",
+    "labs", "technologies", "solutions", "systems", "plc", "oy", "ab", "as", "sa", "ag",
+    "bank", "agency", "studio", "partners", "consulting", "services", "limited",
+)
+SCHOOL_WORDS = (
+    "university", "college", "institute", "school", "academy", "polytechnic",
+    "universidad", "université", "universität", "hochschule", "conservatory",
+)
+DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|doctor|diploma|associate|certificate|mba|ph\.?\s?d|"
+    r"b\.?\s?sc|m\.?\s?sc|b\.?\s?eng|m\.?\s?eng|b\.?\s?a|m\.?\s?a|b\.?\s?s|m\.?\s?s|"
+    r"high school|ged)\b",
+    re.IGNORECASE,
+)
+SKILL_LEVELS = ("beginner", "intermediate", "advanced", "expert")
+LOCATION_RE = re.compile(
+    r"^(?:remote|hybrid|on-?site|[A-Z][\w.' -]+,\s*(?:[A-Z]{2}|[A-Z][\w.' -]+))$"
+)
+
+LINK_SERVICES = (
+    ("linkedin.com", "LinkedIn"),
+    ("github.com", "GitHub"),
+    ("gitlab.com", "GitLab"),
+    ("behance.net", "Behance"),
+    ("dribbble.com", "Dribbble"),
+)
+
+_BULLET_RE = re.compile(r"^[\s•·▪◦●○■□➢►\-*–]+")
+_SEPARATOR_RE = re.compile(r"\s+[|•·]\s+|\s+[–—-]\s+|\t+|\s{3,}")
+
+LIST_SECTIONS = ("workExperience", "education", "skills", "certifications", "links", "others")
+PERSONAL_FIELDS = (
+    "firstName", "lastName", "email", "phone", "address", "city", "country", "linkedIn", "website",
+)
+
+
+def _new_id():
+    return str(uuid.uuid4())
+
+
+def _heading_key(line):
+    """Return the normalized heading text if the line looks like a section heading"""
+    if len(line) > 40:
+        return None
+    key = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+    key = re.sub(r"\s+", " ", key)
+    return key or None
+
+
+def _classify_heading(line):
+    key = _heading_key(line)
+    if not key:
+        return None
+    for section, headings in SECTION_HEADINGS.items():
+        if key in headings:
+            return section
+    if key in OTHER_HEADINGS:
+        return "others"
+    return None
+
+
+def _strip_bullet(line):
+    return _BULLET_RE.sub("", line).strip()
+
+
+def _is_bullet(line):
+    match = _BULLET_RE.match(line)
+    return bool(match and match.group(0).strip())
+
+
+def _split_fragments(text):
+    parts = _SEPARATOR_RE.sub(" | ", text).split("|")
+    return [p.strip(" ,–—-") for p in parts if p.strip(" ,–—-")]
+
+
+def _has_word(text, words):
+    tokens = re.findall(r"[a-zà-ÿ]+", text.lower())
+    return any(t in words for t in tokens)
+
+
+def normalize_date(value):
+    """Normalize a resume date to 'YYYY-MM' (year-only dates map to January) or 'Present'"""
+    value = value.strip().rstrip(".")
+    if re.fullmatch(_PRESENT, value, re.IGNORECASE):
+        return "Present"
+    m = re.fullmatch(rf"({_MONTH})\s+(\d{{4}})", value, re.IGNORECASE)
+    if m:
+        month = MONTHS[m.group(1).lower()[:3]]
+        return f"{m.group(2)}-{month:02d}"
+    m = re.fullmatch(r"(\d{1,2})[/.](\d{4})", value)
+    if m and 1 <= int(m.group(1)) <= 12:
+        return f"{m.group(2)}-{int(m.group(1)):02d}"
+    m = re.fullmatch(r"(\d{4})[/.-](\d{1,2})", value)
+    if m and 1 <= int(m.group(2)) <= 12:
+        return f"{m.group(1)}-{int(m.group(2)):02d}"
+    if re.fullmatch(r"\d{4}", value):
+        return f"{value}-01"
+    return ""
+
+
+def link_service(url):
+    lowered = url.lower()
+    for domain, service in LINK_SERVICES:
+        if domain in lowered:
+            return service
+    return "Portfolio"
+
+
+def _split_sections(lines):
+    """Split lines into a preamble and a list of (section, heading, body_lines)"""
+    preamble = []
+    sections = []
+    for line in lines:
+        section = _classify_heading(line)
+        if section:
+            sections.append((section, line.strip().rstrip(":"), []))
+        elif sections:
+            sections[-1][2].append(line)
+        else:
+            preamble.append(line)
+    return preamble, sections
+
+
+def _parse_personal_info(text, preamble):
+    """Extract contact details. Returns (personal_info, confident)"""
+    info = {field: "" for field in PERSONAL_FIELDS}
+
+    email = EMAIL_RE.search(text)
+    if email:
+        info["email"] = email.group(0)
+
+    for url in URL_RE.findall(text):
+        if "linkedin.com" in url.lower():
+            info["linkedIn"] = info["linkedIn"] or url
+        elif not info["website"] and "@" not in url:
+            info["website"] = url
+
+    for match in PHONE_RE.finditer("\n".join(preamble)):
+        candidate = match.group(0).strip()
+        if len(re.sub(r"\D", "", candidate)) >= 7 and not DATE_RANGE_RE.search(candidate):
+            info["phone"] = candidate
+            break
+
+    leftovers = []
+    for line in preamble:
+        remaining = URL_RE.sub(" ", EMAIL_RE.sub(" ", line))
+        if info["phone"]:
+            remaining = remaining.replace(info["phone"], " ")
+        for fragment in _split_fragments(remaining):
+            fragment = re.sub(r"^(?:email|e-mail|phone|tel|mobile|linkedin|web|website)\s*:\s*", "", fragment, flags=re.IGNORECASE)
+            if not fragment or not re.search(r"[A-Za-z]", fragment):
+                continue
+            words = fragment.split()
+            if (
+                not info["firstName"]
+                and 2 <= len(words) <= 4
+                and all(re.fullmatch(r"[A-ZÀ-Þ][\w'’.-]*", w) for w in words)
+                and not re.search(r"\d", fragment)
+            ):
+                info["firstName"] = " ".join(w.capitalize() if w.isupper() else w for w in words[:-1])
+                info["lastName"] = words[-1].capitalize() if words[-1].isupper() else words[-1]
+            elif not info["city"] and LOCATION_RE.match(fragment) and "," in fragment:
+                city, _, country = fragment.partition(",")
+                info["city"] = city.strip()
+                info["country"] = country.strip()
+            else:
+                leftovers.append(fragment)
+
+    # A single short headline (e.g. "Senior Backend Engineer") carries no schema field
+    ambiguous = len(leftovers) > 1 or (leftovers and len(leftovers[0].split()) > 8)
+    confident = bool(info["firstName"] and info["email"]) and not ambiguous
+    return info, confident
+
+
+def _entry_blocks(body, date_re):
+    """
+    Group section lines into entries anchored on lines that contain a date.
+    Each entry has up to two header lines before the date line; everything after
+    it (until the next entry's header) is its description.
+    """
+    anchors = [i for i, line in enumerate(body) if date_re.search(line)]
+    if not anchors:
+        return None
+
+    blocks = []
+    previous_end = 0
+    for n, anchor in enumerate(anchors):
+        start = anchor
+        while (
+            start > previous_end
+            and anchor - start < 2
+            and not _is_bullet(body[start - 1])
+            and len(body[start - 1].split()) <= 10
+            and not body[start - 1].rstrip().endswith(".")
+        ):
+            start -= 1
+        if blocks:
+            blocks[-1]["description"] = body[previous_end:start]
+        elif start > 0:
+            # Lines before the first entry cannot be attributed
+            return None
+        next_anchor = anchors[n + 1] if n + 1 < len(anchors) else len(body)
+        blocks.append({"header": body[start:anchor + 1], "description": body[anchor + 1:next_anchor]})
+        previous_end = anchor + 1
+    return blocks
+
+
+def _header_fragments(header_lines, date_re):
+    fragments = []
+    match = None
+    for line in header_lines:
+        found = date_re.search(line)
+        if found:
+            match = found
+            line = line[:found.start()] + " | " + line[found.end():]
+        line = re.sub(r"\(\s*\|?\s*\)", " ", line)
+        fragments.extend(_split_fragments(line.strip(" |")))
+    return fragments, match
+
+
+def _description(lines):
+    return "\n".join(_strip_bullet(line) for line in lines if _strip_bullet(line))
+
+
+def _parse_experience(body):
+    blocks = _entry_blocks(body, DATE_RANGE_RE)
+    if not blocks:
+        return None
+    items = []
+    for block in blocks:
+        fragments, match = _header_fragments(block["header"], DATE_RANGE_RE)
+        location = ""
+        for fragment in list(fragments):
+            if LOCATION_RE.match(fragment) and not _has_word(fragment, TITLE_WORDS):
+                location = fragment
+                fragments.remove(fragment)
+                break
+
+        title = company = ""
+        if len(fragments) == 1 and " at " in fragments[0]:
+            title, _, company = fragments[0].partition(" at ")
+        elif len(fragments) == 2:
+            first, second = fragments
+            if _has_word(first, TITLE_WORDS) and not _has_word(second, TITLE_WORDS):
+                title, company = first, second
+            elif _has_word(second, TITLE_WORDS) and not _has_word(first, TITLE_WORDS):
+                title, company = second, first
+            elif _has_word(second, COMPANY_WORDS):
+                title, company = first, second
+            elif _has_word(first, COMPANY_WORDS):
+                title, company = second, first
+        if not title or not company:
+            return None
+
+        end = normalize_date(match.group("end"))
+        items.append({
+            "id": _new_id(),
+            "title": title.strip(),
+            "company": company.strip(),
+            "location": location,
+            "startDate": normalize_date(match.group("start")),
+            "endDate": end,
+            "current": end == "Present",
+            "description": _description(block["description"]),
+        })
+    return items
+
+
+def _split_degree(text):
+    """Split 'BSc in Computer Science' into ('BSc', 'Computer Science')"""
+    for separator in (" in ", ", ", " - "):
+        if separator in text:
+            degree, _, field = text.rpartition(separator)
+            if DEGREE_RE.search(degree):
+                return degree.strip(), field.strip()
+    return text.strip(), ""
+
+
+def _parse_education(body):
+    education_date_re = re.compile(f"{DATE_RANGE_RE.pattern}|{SINGLE_DATE_RE.pattern}", re.IGNORECASE)
+    blocks = _entry_blocks(body, education_date_re)
+    if not blocks:
+        return None
+    items = []
+    for block in blocks:
+        header = []
+        start = end = ""
+        for line in block["header"]:
+            match = DATE_RANGE_RE.search(line)
+            if match:
+                start, end = normalize_date(match.group("start")), normalize_date(match.group("end"))
+                line = line[:match.start()] + " | " + line[match.end():]
+            else:
+                match = SINGLE_DATE_RE.search(line)
+                if match:
+                    end = normalize_date(match.group("date"))
+                    line = line[:match.start()] + " | " + line[match.end():]
+            header.extend(_split_fragments(re.sub(r"\(\s*\|?\s*\)", " ", line).strip(" |")))
+
+        school = degree = field = location = ""
+        for fragment in header:
+            if not school and _has_word(fragment, SCHOOL_WORDS) and not DEGREE_RE.search(fragment):
+                school = fragment
+            elif not degree and DEGREE_RE.search(fragment):
+                degree, field = _split_degree(fragment)
+            elif not location and LOCATION_RE.match(fragment):
+                location = fragment
+            else:
+                return None
+        if not school or not degree:
+            return None
+
+        items.append({
+            "id": _new_id(),
+            "school": school,
+            "degree": degree,
+            "fieldOfStudy": field,
+            "location": location,
+            "startDate": start,
+            "endDate": end,
+            "current": end == "Present",
+            "description": _description(block["description"]),
+        })
+    return items
+
+
+def _parse_skills(body):
+    items = []
+    for line in body:
+        line = _strip_bullet(line)
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        for name in re.split(r"[,;|•·]", line):
+            name = name.strip(" .")
+            if not name:
+                continue
+            level = "intermediate"
+            m = re.fullmatch(r"(.+?)\s*\((\w+)\)", name)
+            if m and m.group(2).lower() in SKILL_LEVELS:
+                name, level = m.group(1).strip(), m.group(2).lower()
+            if len(name.split()) > 5 or len(name) > 60:
+                return None
+            items.append({"id": _new_id(), "name": name, "level": level})
+    return items or None
+
+
+def _parse_certifications(body):
+    items = []
+    for line in body:
+        line = _strip_bullet(line)
+        if not line:
+            continue
+        if len(line.split()) > 15:
+            return None
+        cert_link = ""
+        url = URL_RE.search(line)
+        if url:
+            cert_link = url.group(0)
+            line = line.replace(cert_link, " ")
+        start = ""
+        match = SINGLE_DATE_RE.search(line)
+        if match:
+            start = normalize_date(match.group("date"))
+            line = line[:match.start()] + " | " + line[match.end():]
+        fragments = _split_fragments(re.sub(r"\(\s*\|?\s*\)", " ", line).strip(" |"))
+        if not fragments or len(fragments) > 2:
+            return None
+        items.append({
+            "id": _new_id(),
+            "name": fragments[0],
+            "authority": fragments[1] if len(fragments) > 1 else "",
+            "licenseNumber": "",
+            "certLink": cert_link,
+            "startDate": start,
+            "endDate": "",
+            "description": "",
+        })
+    return items or None
+
+
+def _parse_links(text):
+    links = []
+    seen = set()
+    for url in URL_RE.findall(text):
+        url = url.rstrip(".)")
+        if url.lower() in seen:
+            continue
+        seen.add(url.lower())
+        links.append({"id": _new_id(), "service": link_service(url), "linkUrl": url})
+    return links
+
+
+def empty_resume():
+    """Skeleton in the RESUME_PARSER_PROMPT structure"""
+    data = {"personalInfo": {field: "" for field in PERSONAL_FIELDS}, "summary": ""}
+    for key in LIST_SECTIONS:
+        data[key] = []
+    return data
+
+
+def preparse_resume(text):
+    """
+    Parse the deterministic parts of a resume.
+
+    Returns a dict with:
+        data: partial resume in the RESUME_PARSER_PROMPT structure
+        parsed_sections: names of the sections already parsed
+        remainder: text the AI still needs to parse ("" if none)
+        complete: True when the model does not need to be called
+    """
+    lines = [re.sub(r"[ \t ]+", " ", line).strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    preamble, sections = _split_sections(lines)
+
+    data = empty_resume()
+    parsed = set()
+    remainder = []
+
+    personal_info, personal_confident = _parse_personal_info(text, preamble)
+    data["personalInfo"] = personal_info
+    if personal_confident:
+        parsed.add("personalInfo")
+    elif preamble:
+        remainder.append("\n".join(preamble))
+
+    data["links"] = _parse_links(text)
+    if data["links"]:
+        parsed.add("links")
+
+    parsers = {
+        "workExperience": _parse_experience,
+        "education": _parse_education,
+        "skills": _parse_skills,
+        "certifications": _parse_certifications,
+    }
+    for section, heading, body in sections:
+        if section == "summary":
+            if body:
+                data["summary"] = " ".join(body)
+                parsed.add("summary")
+        elif section == "others":
+            if body:
+                data["others"].append({"id": _new_id(), "title": heading.title(), "content": "\n".join(body)})
+                parsed.add("others")
+        elif section == "links":
+            # URLs are collected from the whole document above
+            continue
+        else:
+            items = parsers[section](body) if body else []
+            if items is None:
+                remainder.append("\n".join([heading] + body))
+                continue
+            data[section].extend(items)
+            if items:
+                parsed.add(section)
+
+    has_body = bool(parsed & {"workExperience", "education"})
+    complete = not remainder and "personalInfo" in parsed and has_body
+    return {
+        "data": data,
+        "parsed_sections": sorted(parsed),
+        "remainder": "\n\n".join(remainder).strip(),
+        "complete": complete,
+    }
+
+
+def merge_parsed_resume(preparsed, ai_parsed):
+    """Fill the gaps in a pre-parsed resume with the AI's output for the remainder"""
+    merged = empty_resume()
+    merged.update(preparsed)
+    if not isinstance(ai_parsed, dict):
+        return merged
+
+    ai_personal = ai_parsed.get("personalInfo") or {}
+    if isinstance(ai_personal, dict):
+        personal = dict(merged["personalInfo"])
+        for field, value in ai_personal.items():
+            if value and not personal.get(field):
+                personal[field] = value
+        merged["personalInfo"] = personal
+
+    if not merged.get("summary") and ai_parsed.get("summary"):
+        merged["summary"] = ai_parsed["summary"]
+
+    for key in LIST_SECTIONS:
+        ai_items = ai_parsed.get(key) or []
+        if not isinstance(ai_items, list):
+            continue
+        if key == "links":
+            known = {link.get("linkUrl", "").lower() for link in merged["links"]}
+            merged["links"] = merged["links"] + [
+                link for link in ai_items
+                if isinstance(link, dict) and (link.get("linkUrl") or "").lower() not in known
+            ]
+        elif key == "others" or not merged.get(key):
+            merged[key] = list(merged.get(key) or []) + ai_items
+    return merged
@@ -1,5 +1,6 @@
 # utils/resume_validation.py
 from marshmallow import Schema, fields, validate, ValidationError, EXCLUDE, RAISE
+from utils.fast_validation import CompiledSchema
 
 class PersonalInfoSchema(Schema):
     class Meta:
@@ -130,9 +131,92 @@ class ResumeContentSchema(Schema):
     title = fields.Str(validate=validate.Length(max=200), allow_none=True)
     templateId = fields.Str(validate=validate.Length(max=100), allow_none=True)
 
+_compiled_resume_schema = CompiledSchema(ResumeContentSchema)
+
+RESUME_LIST_SECTIONS = ("workExperience", "education", "skills", "certifications", "links", "others")
+DEFAULT_SECTION_ORDER = ("summary",) + RESUME_LIST_SECTIONS
+
 def validate_resume_data(data):
     """
     Validate resume content data and return cleaned data or raise ValidationError
     """
+    return _compiled_resume_schema.load(data)
+
+def normalize_resume_content(content, profile=None):
+    """
+    Resume content with every top-level key the editor expects, missing ones
+    filled with defaults (personalInfo, summary and title from the profile's
+    columns when a profile is given). Present keys keep their values, as the
+    same objects, so callers can still tell which sections changed.
+
+    Content is normalized once, when it is written; reads return it as stored.
+    """
+    def column(name):
+        return (getattr(profile, name, None) if profile is not None else None) or ""
+
+    normalized = dict(content or {})
+    if "personalInfo" not in normalized:
+        normalized["personalInfo"] = {
+            "firstName": column("first_name"),
+            "lastName": column("last_name"),
+            "email": column("profile_email"),
+            "phone": column("phone"),
+            "address": column("address"),
+            "city": column("city"),
+            "country": column("country"),
+            "linkedIn": "",
+            "website": "",
+        }
+    normalized.setdefault("summary", column("summary"))
+    normalized.setdefault("title", column("job_sector") or "Resume title")
+    normalized.setdefault("templateId", "modern")
+    for key in RESUME_LIST_SECTIONS:
+        normalized.setdefault(key, [])
+    normalized.setdefault("sectionOrder", list(DEFAULT_SECTION_ORDER))
+    return normalized
+
+def validate_resume_changes(original, patched):
+    """
+    Validate only the parts of `patched` that are not already in `original`.
+
+    `original` is stored (already validated) resume content and `patched` the
+    result of utils.json_patch.apply_patch on it. Top-level sections that are
+    still the same object as in `original` are skipped, and in item lists only
+    the items that are new objects (added or edited) are validated against the
+    item schema. Returns the patched content with the changed parts replaced by
+    their cleaned values, or raises ValidationError.
+    """
     schema = ResumeContentSchema()
-    return schema.load(data)
+    cleaned = dict(patched)
+    errors = {}
+    for key, value in patched.items():
+        if key in original and original[key] is value:
+            continue
+        field = schema.fields.get(key)
+        if field is None:
+            errors[key] = ["Unknown field."]
+            continue
+        if (
+            isinstance(field, fields.List)
+            and isinstance(field.inner, fields.Nested)
+            and isinstance(value, list)
+            and isinstance(original.get(key), list)
+        ):
+            known = {id(item) for item in original[key]}
+            items = list(value)
+            for index, item in enumerate(items):
+                if id(item) in known:
+                    continue
+                try:
+                    items[index] = field.inner.schema.load(item)
+                except ValidationError as err:
+                    errors.setdefault(key, {})[index] = err.messages
+            cleaned[key] = items
+        else:
+            try:
+                cleaned[key] = schema.load({key: value})[key]
+            except ValidationError as err:
+                errors.update(err.messages)
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
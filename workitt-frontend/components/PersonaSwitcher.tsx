@@ -28,10 +28,18 @@ const PersonaSwitcher: React.FC<PersonaSwitcherProps> = ({ currentProfileId, onP
 
     const fetchPersonas = async () => {
         try {
-            const response = await axios.get(`${API_URL}/api/profiles`, {
-                withCredentials: true
-            });
-            setPersonas(response.data.profiles || []);
+            // The list is paged; follow next_cursor until every persona is loaded
+            const loaded: Persona[] = [];
+            let cursor: string | null = null;
+            do {
+                const response = await axios.get(`${API_URL}/api/profiles`, {
+                    params: cursor ? { cursor } : {},
+                    withCredentials: true
+                });
+                loaded.push(...(response.data.profiles || []));
+                cursor = response.data.next_cursor || null;
+            } while (cursor);
+            setPersonas(loaded);
         } catch (err) {
             console.error('Failed to fetch personas:', err);
         }
@@ -171,15 +171,25 @@ const CoverLetterEditorContent: React.FC = () => {
     const [isLoading, setIsLoading] = useState(false);
     const [isGenerating, setIsGenerating] = useState(false);
     const [isSaving, setIsSaving] = useState(false);
+    // ETag of the loaded revision; sent as If-Match so a stale tab cannot overwrite a newer save
+    const etagRef = React.useRef<string | null>(null);
 
     // --- Data Fetching ---
 
     const fetchProfiles = async () => {
         try {
-            const response = await axios.get(`${API_URL}/api/profiles`, {
-                withCredentials: true
-            });
-            setProfiles(response.data.profiles || []);
+            // The list is paged; follow next_cursor until every profile is loaded
+            const loaded: Profile[] = [];
+            let cursor: string | null = null;
+            do {
+                const response = await axios.get(`${API_URL}/api/profiles`, {
+                    params: cursor ? { cursor } : {},
+                    withCredentials: true
+                });
+                loaded.push(...(response.data.profiles || []));
+                cursor = response.data.next_cursor || null;
+            } while (cursor);
+            setProfiles(loaded);
         } catch (err) {
             console.error('Failed to fetch profiles', err);
         }
@@ -193,6 +203,7 @@ const CoverLetterEditorContent: React.FC = () => {
                 { withCredentials: true }
             );
 
+            etagRef.current = response.headers['etag'] || null;
             const letter = response.data.cover_letter;
             // The backend now returns the full validated object in content
             // Fallback to old structure if needed for migration, but primarily use new structure
@@ -398,28 +409,6 @@ const CoverLetterEditorContent: React.FC = () => {
                 payload.current_text = editorState.body;
             }
 
-            let userPayload = '';
-            if (selectedProfileId) {
-                const profile = profiles.find(p => p.id === selectedProfileId);
-                if (profile) {
-                    userPayload = JSON.stringify(profile);
-                }
-            }
-
-            // Fetch full persona data if persona is selected
-            let personaData = null;
-            if (selectedProfileId && activeMethod === 'persona') {
-                try {
-                    const personaResponse = await axios.get(
-                        `${API_URL}/api/profile/switch/${selectedProfileId}`,
-                        { withCredentials: true }
-                    );
-                    personaData = personaResponse.data.profile;
-                } catch (err) {
-                    console.error('Failed to fetch persona data', err);
-                }
-            }
-
             const response = await axios.post(
                 `${API_URL}/api/cover_letter`,
                 {
@@ -429,19 +418,10 @@ const CoverLetterEditorContent: React.FC = () => {
                     resume_text: pastedResumeText || '',
                     ai_prompt: aiPrompt || '',
                     body: editorState.body || '',
-                    // Include persona data if available
-                    ...(personaData && {
-                        profile_id: personaData.id,
-                        first_name: personaData.first_name,
-                        last_name: personaData.last_name,
-                        profile_email: personaData.profile_email,
-                        phone: personaData.phone,
-                        address: personaData.address,
-                        work_experience: personaData.work_experience,
-                        skills: personaData.skills,
-                        certifications: personaData.certifications
+                    // The server builds the persona from the saved resume
+                    ...(selectedProfileId && activeMethod === 'persona' && {
+                        profile_id: selectedProfileId
                     }),
-                    user_payload: userPayload,
                     tone: editorState.tone,
                     length: editorState.length,
                     instruction: type === 'rewrite' || type === 'shorten' ? payload.instruction : undefined,
@@ -568,11 +548,15 @@ const CoverLetterEditorContent: React.FC = () => {
             };
 
             if (isEditing) {
-                await axios.put(
+                const response = await axios.put(
                     `${API_URL}/api/cover-letters/${coverId}`,
                     payload,
-                    { withCredentials: true }
+                    {
+                        withCredentials: true,
+                        headers: etagRef.current ? { 'If-Match': etagRef.current } : {}
+                    }
                 );
+                etagRef.current = response.headers['etag'] || null;
             } else {
                 const response = await axios.post(
                     `${API_URL}/api/cover-letters`,
@@ -585,9 +569,9 @@ const CoverLetterEditorContent: React.FC = () => {
             }
             setEditorState(prev => ({ ...prev, autoSavedAt: new Date() }));
             showToast('Saved successfully', 'success');
-        } catch (err) {
+        } catch (err: any) {
             console.error('Save failed', err);
-            showToast('Failed to save', 'error');
+            showToast(err.response?.status === 409 ? err.response.data.error : 'Failed to save', 'error');
         } finally {
             setIsSaving(false);
         }
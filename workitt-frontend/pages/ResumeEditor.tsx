@@ -458,6 +458,8 @@ const ResumeEditor: React.FC = () => {
 
     const [isLoading, setIsLoading] = useState(false);
     const [isSaving, setIsSaving] = useState(false);
+    // ETag of the loaded revision; sent as If-Match so a stale tab cannot overwrite a newer save
+    const etagRef = React.useRef<string | null>(null);
     const [notification, setNotification] = useState<{ type: 'success' | 'error'; message: string } | null>(null);
 
     useEffect(() => {
@@ -474,6 +476,7 @@ const ResumeEditor: React.FC = () => {
                 { withCredentials: true }
             );
 
+            etagRef.current = response.headers['etag'] || null;
             const resume = response.data.resume;
             const content = resume.content || {};
 
@@ -528,11 +531,15 @@ const ResumeEditor: React.FC = () => {
             };
 
             if (isEditing) {
-                await axios.put(
+                const response = await axios.put(
                     `${API_URL}/api/resumes/${resumeId}`,
                     payload,
-                    { withCredentials: true }
+                    {
+                        withCredentials: true,
+                        headers: etagRef.current ? { 'If-Match': etagRef.current } : {}
+                    }
                 );
+                etagRef.current = response.headers['etag'] || null;
                 setNotification({ type: 'success', message: 'Resume saved successfully!' });
             } else {
                 const response = await axios.post(
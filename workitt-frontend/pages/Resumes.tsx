@@ -31,10 +31,18 @@ const Resumes: React.FC = () => {
 
   const fetchResumes = async () => {
     try {
-      const response = await axios.get(`${API_URL}/api/resumes`, {
-        withCredentials: true,
-      });
-      setResumes(response.data.resumes || []);
+      // The list is paged; follow next_cursor until every resume is loaded
+      const loaded: Resume[] = [];
+      let cursor: string | null = null;
+      do {
+        const response = await axios.get(`${API_URL}/api/resumes`, {
+          params: cursor ? { cursor } : {},
+          withCredentials: true,
+        });
+        loaded.push(...(response.data.resumes || []));
+        cursor = response.data.next_cursor || null;
+      } while (cursor);
+      setResumes(loaded);
     } catch (err: any) {
       console.error("Failed to fetch resumes:", err);
       if (err.response?.status === 401 || err.response?.status === 403) {